@@ -0,0 +1,178 @@
+import re
+
+# Single-pass streaming parser for the findings in the Appendix of cpython_report.md (and of
+# cpython_report.curated.md, the hand-curated findings it's rendered from, in the same format).
+#
+# iter_findings() consumes the report as an iterable of lines (an open file works) and
+# yields one record per "#### N- [issue](url) - title" entry as soon as the entry ends,
+# so memory stays constant no matter how large the report is. Each record is a dict:
+#
+#   {"finding": 3, "issue": 126221, "url": "...", "title": "...",
+#    "date_filed": "31/10/2024", "date_closed": "31/10/2024", "kind": "Segmentation Fault",
+#    "configuration": "JIT", "versions": ["3.13", "3.14"], "status": "Closed-Completed",
+#    "prs": [{"number": 126222, "url": "...", "authors": ["Fidget-Spinner"]}],
+#    "mres": ["import sre_constants\n..."], "backtraces": ["#0  _PyEval_EvalFrameDefault ..."],
+#    "notes": ["This issue was closed in favor of ..."], "line": 729, "parsing_issues": []}
+
+APPENDIX_HEADING = re.compile(r"^##\s+(?:[\d.]+\s*)?Ap+endix\b", re.IGNORECASE)  # Also matches "Apendix"
+FINDINGS_HEADING = re.compile(r"^###\s+(?:[\d.]+\s*)?Findings\b", re.IGNORECASE)
+FINDING_HEADING = re.compile(r"^####\s+(\d+)-\s+\[(\d+)\]\(([^)]*)\)\s*-\s*(.*?)\s*$")
+FIELD_LINE = re.compile(r"^-\s*([A-Za-z][A-Za-z ()]*?)\s*:\s*(.*?)\s*$")
+PR_ITEM_LINE = re.compile(r"^\s+-\s+(.*?)\s*$")
+PR_ENTRY = re.compile(r"^(?:\[(\d+)\]\((https?://[^)]+)\))?\s*\((@[^)]+)\)")
+# Scaffolding around the backtrace block, not part of any note
+LAYOUT_LINES = {"<details><summary>Backtrace/error message:</summary>", "<p>", "</p>", "</details>", "----------"}
+
+FIELD_KEYS = {
+    "issue number": "issue_number",
+    "date filed": "date_filed",
+    "date filled": "date_filed",  # Typo used in a few entries
+    "date closed": "date_closed",
+    "kind": "kind",
+    "configuration": "configuration",
+    "python versions": "versions",
+    "status": "status",
+    "prs (author)": "prs",
+}
+
+# Parser states
+BEFORE_APPENDIX, BEFORE_FINDINGS, IN_FINDINGS, IN_CODE = range(4)
+
+
+def _new_finding(match, line_number):
+    return {
+        "finding": int(match.group(1)),
+        "issue": int(match.group(2)),
+        "url": match.group(3),
+        "title": match.group(4),
+        "date_filed": "",
+        "date_closed": "",
+        "kind": "",
+        "configuration": "",
+        "versions": [],
+        "status": "",
+        "prs": [],
+        "mres": [],
+        "backtraces": [],
+        "notes": [],  # Free-text paragraphs, e.g. why an issue was closed
+        "line": line_number,
+        "parsing_issues": [],
+    }
+
+
+def _parse_pr_item(finding, text, line_number):
+    if text.startswith("None"):  # "None" or "None yet"
+        return
+    match = PR_ENTRY.match(text)
+    if not match:
+        finding["parsing_issues"].append(
+            f"WARNING: Line under 'PRs (author):' did not match expected PR-author pattern "
+            f"(and not 'None yet'): '- {text}' (Line ~{line_number})")
+        return
+    authors = [author.strip().lstrip('@') for author in match.group(3).split(',') if author.strip().lstrip('@')]
+    if not authors:
+        finding["parsing_issues"].append(
+            f"WARNING: Parsed empty author list from group '({match.group(3)})' in PR line: '- {text}' "
+            f"(Line ~{line_number})")
+    finding["prs"].append({
+        "number": int(match.group(1)) if match.group(1) else None,
+        "url": match.group(2) or "",
+        "authors": authors,
+    })
+
+
+def iter_findings(lines):
+    """
+    Yields one record per finding of the Appendix, reading `lines` exactly once.
+
+    Only the finding being parsed (and the code block being read) is kept in memory.
+    """
+    state = BEFORE_APPENDIX
+    finding = None
+    in_prs = False
+    in_note = False
+    code_language = None
+    code_lines = None
+
+    for line_number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+
+        if state == IN_CODE:
+            if line.startswith("```"):
+                block = "\n".join(code_lines)
+                if finding is not None and block.strip():
+                    finding["mres" if code_language == "python" else "backtraces"].append(block)
+                state = IN_FINDINGS
+                code_lines = None
+            else:
+                code_lines.append(line)
+            continue
+
+        if state == BEFORE_APPENDIX:
+            if APPENDIX_HEADING.match(line):
+                state = BEFORE_FINDINGS
+            continue
+
+        if line.startswith("#"):
+            if state == BEFORE_FINDINGS:
+                if FINDINGS_HEADING.match(line):
+                    state = IN_FINDINGS
+                continue
+            match = FINDING_HEADING.match(line)
+            if match:
+                if finding is not None:
+                    yield finding
+                finding = _new_finding(match, line_number)
+                in_prs = in_note = False
+                continue
+            if line.startswith("## ") or line.startswith("### "):  # Next section: the findings are over
+                break
+            continue
+
+        if state != IN_FINDINGS or finding is None:
+            continue
+
+        if line.startswith("```"):
+            state = IN_CODE
+            code_language = line[3:].strip().lower()
+            code_lines = []
+            in_prs = in_note = False
+            continue
+
+        if line.startswith("-") and not line.startswith("----------"):
+            in_note = False
+            match = FIELD_LINE.match(line)
+            key = FIELD_KEYS.get(match.group(1).lower()) if match else None
+            in_prs = key == "prs"
+            if key == "versions":
+                finding["versions"] = [version.strip() for version in re.split(r"[;,]", match.group(2))
+                                       if version.strip()]
+            elif key and key not in ("prs", "issue_number"):
+                finding[key] = match.group(2)
+            continue
+
+        if in_prs:
+            match = PR_ITEM_LINE.match(line)
+            if match:
+                _parse_pr_item(finding, match.group(1), line_number)
+                continue
+            if line.strip():
+                in_prs = False
+
+        text = line.strip()
+        if not text or text in LAYOUT_LINES:
+            in_note = False
+        elif in_note:
+            finding["notes"][-1] += "\n" + text
+        else:
+            finding["notes"].append(text)
+            in_note = True
+
+    if finding is not None:
+        yield finding
+
+
+def iter_findings_from_file(path):
+    """Streams the findings of a report file without reading it into memory."""
+    with open(path, 'r', encoding='utf-8') as f:
+        yield from iter_findings(f)
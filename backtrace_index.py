@@ -0,0 +1,307 @@
+import re
+import os
+import sys
+import time
+import hashlib
+import sqlite3
+import argparse
+from collections import namedtuple
+
+from appendix_parser import iter_findings_from_file
+
+# Backtrace parsing and a crash-signature index for finding duplicate crashes.
+#
+# parse_backtrace() turns gdb backtraces ("#0  0x... in func (args) at file.c:123"),
+# AddressSanitizer stacks ("#0 0x... in func /path/file.c:123:4") and, when no stack is
+# present, assertion and "Fatal Python error" lines into normalized frames. A crash
+# signature is a hash of the top SIGNATURE_DEPTH frames that are not generic interpreter
+# plumbing (eval loop, vectorcall helpers, run_* functions, libc abort machinery...).
+#
+# CrashIndex keeps an on-disk SQLite inverted index from signature and from function name
+# to issue numbers, so "which known issues share this crash site" is a couple of indexed
+# lookups instead of a scan over every report.
+
+REPORT_FILE = "cpython_report.md"
+ISSUES_CSV_FILE = "cpython_fusil_issues.csv"
+INDEX_FILE = "crash_index.sqlite3"
+SIGNATURE_DEPTH = 3
+
+Frame = namedtuple("Frame", ["function", "file", "line"])
+
+_GDB_FRAME = re.compile(
+    r"^\s*#(?P<number>\d+)\s+(?:(?:0x[0-9a-fA-F]+)\s+in\s+)?(?P<function>[A-Za-z_$?][\w$.?:~<>]*)"
+)
+_AT_FILE_LINE = re.compile(r"\)\s+at\s+(?P<file>[^\s:]+):(?P<line>\d+)")
+_ASAN_FILE_LINE = re.compile(r"^\s*#\d+\s+0x[0-9a-fA-F]+\s+in\s+\S+\s+(?P<file>/\S+?):(?P<line>\d+)(?::\d+)?\s*$")
+_FROM_LIBRARY = re.compile(r"\bfrom\s+(?P<file>\S+)")
+_ASSERTION = re.compile(r"(?P<file>[\w./-]+\.[ch]):(?P<line>\d+):\s+(?P<function>\w+):\s+Assertion\b")
+_FATAL_ERROR = re.compile(r"Fatal Python error:\s+(?P<function>\w+):")
+
+# Interpreter and libc frames that appear in most crashes and say nothing about the crash site
+GENERIC_FUNCTIONS = {
+    "??", "main", "_start", "abort", "raise", "pthread_kill", "gsignal", "__assert_fail",
+    "__assert_fail_base", "__libc_start_main", "__libc_start_call_main", "__restore_rt",
+    "_PyEval_EvalFrameDefault", "_PyEval_EvalFrame", "_PyEval_Vector", "PyEval_EvalCode",
+    "_PyFunction_Vectorcall", "PyObject_Vectorcall", "_PyObject_VectorcallTstate", "PyObject_Call",
+    "_PyObject_Call", "_PyObject_MakeTpCall", "PyObject_CallOneArg", "_PyObject_Call_Prepend",
+    "run_eval_code_obj", "run_mod", "pyrun_file", "Py_RunMain", "Py_BytesMain", "Py_Main",
+    "fatal_error", "fatal_error_exit", "_Py_FatalErrorFunc", "_Py_FatalErrorFormat",
+    "_PyObject_AssertFailed", "faulthandler_fatal_error", "thread_run", "pythread_wrapper",
+    "start_thread", "clone", "clone3",
+}
+GENERIC_PREFIXES = (
+    "_PyRun_", "PyRun_", "pymain_", "cfunction_vectorcall_", "method_vectorcall_", "cfunction_call",
+    "__pthread_kill", "__GI_", "__libc_", "_PyEval_Eval", "slot_tp_", "vectorcall_",
+)
+
+
+def _normalize_file(path):
+    """Strips build-tree prefixes so the same source file matches across machines."""
+    if not path:
+        return ""
+    path = path.replace("\\", "/")
+    for marker in ("/Modules/", "/Objects/", "/Python/", "/Include/", "/Parser/", "/Lib/"):
+        position = path.rfind(marker)
+        if position != -1:
+            return path[position + 1:]
+    if path.startswith("./"):
+        path = path[2:]
+    if ".so" in path:  # Shared libraries: keep only the library name
+        return os.path.basename(path)
+    return path
+
+
+def _frame_chunks(lines):
+    """Groups a frame's first line with the indented continuation lines gdb wraps it onto."""
+    chunk = None
+    for line in lines:
+        if _GDB_FRAME.match(line):
+            if chunk:
+                yield chunk
+            chunk = [line]
+        elif chunk is not None and line[:1] in (" ", "\t") and line.strip():
+            chunk.append(line)
+        else:
+            if chunk:
+                yield chunk
+            chunk = None
+    if chunk:
+        yield chunk
+
+
+def parse_backtrace(text):
+    """
+    Extracts normalized frames from a backtrace or error message.
+
+    Accepts raw text or the '\\n'-escaped body snippets of the CSV exports. Falls back to
+    the location of an assertion or a "Fatal Python error" when there is no stack.
+    """
+    if "\\n" in text and "\n" not in text:
+        text = text.replace("\\n", "\n")
+    lines = text.splitlines()
+    frames = []
+    for chunk in _frame_chunks(lines):
+        match = _GDB_FRAME.match(chunk[0])
+        joined = " ".join(part.strip() for part in chunk)
+        location = _AT_FILE_LINE.search(joined) or _ASAN_FILE_LINE.match(chunk[0])
+        if location:
+            file, line = location.group("file"), int(location.group("line"))
+        else:
+            library = _FROM_LIBRARY.search(joined)
+            file, line = (library.group("file") if library else ""), None
+        frames.append(Frame(match.group("function"), _normalize_file(file), line))
+    if frames:
+        return frames
+
+    for regex in (_ASSERTION, _FATAL_ERROR):
+        match = regex.search(text)
+        if match:
+            groups = match.groupdict()
+            return [Frame(groups["function"], _normalize_file(groups.get("file")),
+                          int(groups["line"]) if groups.get("line") else None)]
+    return []
+
+
+def is_generic(frame):
+    return frame.function in GENERIC_FUNCTIONS or frame.function.startswith(GENERIC_PREFIXES)
+
+
+def signature_frames(frames, depth=SIGNATURE_DEPTH):
+    """Top `depth` non-generic frames; if every frame is generic, the top ones are used as-is."""
+    specific = [frame for frame in frames if not is_generic(frame)]
+    return (specific or frames)[:depth]
+
+
+def crash_signature(frames, depth=SIGNATURE_DEPTH):
+    """Stable short hash of the crash site. Line numbers are left out, as they drift between builds."""
+    top = signature_frames(frames, depth)
+    if not top:
+        return None
+    key = "|".join(f"{frame.function}@{os.path.basename(frame.file)}" for frame in top)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class CrashIndex:
+    """
+    On-disk inverted index: crash signature -> issues and function name -> issues.
+
+    Both directions are SQLite primary keys, so lookups stay sub-millisecond with
+    thousands of indexed crashes, and new issues can be added without a rebuild.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS crashes (
+                issue INTEGER NOT NULL,
+                signature TEXT NOT NULL,
+                top_frames TEXT NOT NULL,
+                PRIMARY KEY (signature, issue)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS crashes_by_issue ON crashes (issue);
+            CREATE TABLE IF NOT EXISTS frames (
+                function TEXT NOT NULL,
+                issue INTEGER NOT NULL,
+                PRIMARY KEY (function, issue)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS frames_by_issue ON frames (issue);
+        """)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, issue, backtrace_text):
+        """Indexes one backtrace of an issue; returns its signature (None if nothing was parsed)."""
+        frames = parse_backtrace(backtrace_text)
+        signature = crash_signature(frames)
+        if signature is None:
+            return None
+        top = signature_frames(frames)
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO crashes (issue, signature, top_frames) VALUES (?, ?, ?)",
+                (issue, signature, " | ".join(frame.function for frame in top)),
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO frames (function, issue) VALUES (?, ?)",
+                [(frame.function, issue) for frame in frames if not is_generic(frame)],
+            )
+        return signature
+
+    def remove(self, issue):
+        with self.connection:
+            self.connection.execute("DELETE FROM crashes WHERE issue = ?", (issue,))
+            self.connection.execute("DELETE FROM frames WHERE issue = ?", (issue,))
+
+    def issues_with_signature(self, signature):
+        rows = self.connection.execute("SELECT issue FROM crashes WHERE signature = ? ORDER BY issue", (signature,))
+        return [issue for (issue,) in rows]
+
+    def issues_with_function(self, function):
+        rows = self.connection.execute("SELECT issue FROM frames WHERE function = ? ORDER BY issue", (function,))
+        return [issue for (issue,) in rows]
+
+    def lookup(self, backtrace_text, limit=10):
+        """
+        Known issues sharing the crash site of a new backtrace.
+
+        Returns (signature, exact_matches, similar) where `similar` lists
+        (issue, shared_function_count) for issues sharing any specific frame.
+        """
+        frames = parse_backtrace(backtrace_text)
+        signature = crash_signature(frames)
+        exact = self.issues_with_signature(signature) if signature else []
+        functions = sorted({frame.function for frame in frames if not is_generic(frame)})
+        similar = []
+        if functions:
+            placeholders = ",".join("?" * len(functions))
+            similar = self.connection.execute(
+                f"SELECT issue, COUNT(*) AS shared FROM frames WHERE function IN ({placeholders}) "
+                f"GROUP BY issue ORDER BY shared DESC, issue LIMIT ?",
+                (*functions, limit),
+            ).fetchall()
+        return signature, exact, similar
+
+    def stats(self):
+        crashes = self.connection.execute("SELECT COUNT(*), COUNT(DISTINCT signature) FROM crashes").fetchone()
+        functions = self.connection.execute("SELECT COUNT(DISTINCT function) FROM frames").fetchone()[0]
+        return {"crashes": crashes[0], "signatures": crashes[1], "functions": functions}
+
+
+def report_backtraces(findings):
+    """Yields (issue number, backtrace text) for each backtrace block of appendix findings."""
+    for finding in findings:
+        for backtrace in finding["backtraces"]:
+            yield finding["issue"], backtrace
+
+
+def csv_backtraces(csv_path):
+    """Yields (issue number, body snippet) for issues of a collector CSV."""
+    import csv
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            body = row.get("Body Snippet (MRE/Backtrace hint)") or ""
+            if body:
+                yield int(row["Issue #"]), body
+
+
+def build_index(index_path=INDEX_FILE, report_file=REPORT_FILE, csv_files=(ISSUES_CSV_FILE,)):
+    """(Re)indexes every backtrace found in the report and CSVs."""
+    with CrashIndex(index_path) as index:
+        indexed_issues = set()
+        sources = []
+        if os.path.exists(report_file):
+            sources.append(report_backtraces(iter_findings_from_file(report_file)))
+        sources.extend(csv_backtraces(path) for path in csv_files if os.path.exists(path))
+        for source in sources:
+            for issue, text in source:
+                if issue not in indexed_issues:  # Drop stale entries once per issue, then add all blocks
+                    index.remove(issue)
+                    indexed_issues.add(issue)
+                index.add(issue, text)
+        stats = index.stats()
+    print(f"Indexed {stats['crashes']} crashes from {len(indexed_issues)} issues into '{index_path}': "
+          f"{stats['signatures']} distinct signatures, {stats['functions']} distinct functions.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crash-signature index over fusil backtraces.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Index the backtraces in the report and CSVs.")
+    build_parser.add_argument("--report", default=REPORT_FILE)
+    build_parser.add_argument("--csv", nargs="*", default=[ISSUES_CSV_FILE])
+    lookup_parser = subparsers.add_parser("lookup", help="Find known issues sharing a backtrace's crash site.")
+    lookup_parser.add_argument("backtrace_file", nargs="?", help="File with the backtrace (default: stdin).")
+    parser.add_argument("--index", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_index(args.index, args.report, args.csv)
+    else:
+        if args.backtrace_file:
+            with open(args.backtrace_file, 'r', encoding='utf-8') as f:
+                backtrace_text = f.read()
+        else:
+            backtrace_text = sys.stdin.read()
+        with CrashIndex(args.index) as crash_index:
+            start = time.perf_counter()
+            signature, exact, similar = crash_index.lookup(backtrace_text)
+            elapsed = time.perf_counter() - start
+        frames = parse_backtrace(backtrace_text)
+        print(f"Crash site: {' | '.join(frame.function for frame in signature_frames(frames)) or 'not found'}")
+        print(f"Signature: {signature}")
+        print(f"Issues with the same signature: {', '.join(map(str, exact)) or 'none'}")
+        if similar:
+            print("Issues sharing frames:")
+            for issue, shared in similar:
+                print(f"  {issue}: {shared} shared function(s)")
+        print(f"Lookup took {elapsed * 1000:.3f} ms")
@@ -0,0 +1,73 @@
+import os
+import re
+import sys
+import argparse
+import resource
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appendix_parser import FINDING_HEADING, iter_findings_from_file
+
+# Throughput and memory of the streaming appendix parser on a synthetically inflated report:
+# the findings of cpython_report.md are repeated (with renumbered headings) until the file
+# reaches the requested size. Peak traced memory must stay flat as the report grows.
+
+REPORT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cpython_report.md")
+
+
+def split_report(report_path):
+    """Returns (text before the first finding, text of all findings)."""
+    with open(report_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    first_finding = re.search(r"^#### ", content, re.MULTILINE).start()
+    return content[:first_finding], content[first_finding:]
+
+
+def write_inflated_report(path, target_mb):
+    head, findings = split_report(REPORT_FILE)
+    finding_count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(head)
+        while f.tell() < target_mb * 1024 * 1024:
+            for line in findings.splitlines(keepends=True):
+                match = FINDING_HEADING.match(line)
+                if match:
+                    finding_count += 1
+                    line = f"#### {finding_count}- {line[match.end(1) + 1:].lstrip()}"
+                f.write(line)
+    return finding_count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the streaming appendix parser.")
+    parser.add_argument("--sizes-mb", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    print(f"{'size MB':>8} {'findings':>9} {'parse s':>8} {'MB/s':>7} {'findings/s':>11} {'peak traced KB':>15}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(tmp_dir, f"report_{size_mb}mb.md")
+            expected = write_inflated_report(path, size_mb)
+            actual_mb = os.path.getsize(path) / 1024 / 1024
+
+            start = time.perf_counter()
+            parsed = sum(1 for _ in iter_findings_from_file(path))
+            elapsed = time.perf_counter() - start
+
+            # Separate pass for memory, tracemalloc slows parsing down several times
+            tracemalloc.start()
+            for _ in iter_findings_from_file(path):
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            assert parsed == expected, (parsed, expected)
+            print(f"{actual_mb:>8.0f} {parsed:>9} {elapsed:>8.2f} {actual_mb / elapsed:>7.1f} "
+                  f"{parsed / elapsed:>11.0f} {peak / 1024:>15.0f}")
+            os.remove(path)
+
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\nProcess max RSS: {max_rss_mb:.0f} MB (includes writing the inflated reports)")
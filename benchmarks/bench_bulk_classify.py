@@ -0,0 +1,43 @@
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from bulk_classify import OUTPUT_COLUMNS, classify_dataframe, classify_dataframe_rowwise
+from bench_classifier import make_synthetic_issues
+
+# Vectorized DataFrame classification against calling classify() row by row.
+# Both must produce identical Guessed Kind / Versions / Configurations columns.
+
+
+def make_issue_dataframe(count, seed=0):
+    issues = make_synthetic_issues(count, seed)
+    return pd.DataFrame({
+        "Title": [title for title, _, _ in issues],
+        "Labels": [";".join(labels) for _, labels, _ in issues],
+        "Body": [body for _, _, body in issues],
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark bulk DataFrame classification.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'row-wise ms':>12} {'vectorized ms':>14} {'speedup':>8}  identical")
+    for count in args.issues:
+        df_issues = make_issue_dataframe(count)
+        vectorized = classify_dataframe(df_issues)
+        rowwise = classify_dataframe_rowwise(df_issues)
+        identical = vectorized[OUTPUT_COLUMNS].equals(rowwise[OUTPUT_COLUMNS])
+
+        rowwise_time = min(timeit.repeat(lambda: classify_dataframe_rowwise(df_issues), number=1,
+                                         repeat=args.repeat))
+        vectorized_time = min(timeit.repeat(lambda: classify_dataframe(df_issues), number=1, repeat=args.repeat))
+        print(f"{count:>8} {rowwise_time * 1000:>12.1f} {vectorized_time * 1000:>14.1f} "
+              f"{rowwise_time / vectorized_time:>7.1f}x  {identical}")
@@ -0,0 +1,90 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gather_issue_data
+from fake_github_server import FakeGitHubServer, make_synthetic_issues
+
+# Collecting several campaigns with one collector run each (a new client, authentication
+# and connection pool every time, and issues matching several queries fetched again) against
+# one --campaigns run through a shared client and scheduler, on the local fake GitHub server.
+
+CAMPAIGNS = [
+    {"name": "cpython", "repo": "python/cpython", "author": "devdanzin", "keyword": "fusil"},
+    {"name": "cpython-crashes", "repo": "python/cpython", "author": "devdanzin", "keyword": "crash"},
+    {"name": "cpython-other-reporter", "repo": "python/cpython", "author": "fusil-bot", "keyword": "fusil"},
+    {"name": "pypy", "repo": "pypy/pypy", "author": "devdanzin", "keyword": "fusil"},
+]
+
+
+def make_issues(count):
+    return (make_synthetic_issues(count, seed=1)
+            + make_synthetic_issues(count // 2, seed=2, first_number=130000, author="fusil-bot")
+            + make_synthetic_issues(count // 2, seed=3, first_number=5000, repo_name="pypy/pypy"))
+
+
+def read_urls(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row["HTML URL"]: row for row in csv.DictReader(f)}
+
+
+def separate_runs(tmp_dir, workers):
+    """One collector run per campaign, as before --campaigns."""
+    rows = {}
+    for campaign in CAMPAIGNS:
+        gather_issue_data.REPO_NAME = campaign["repo"]
+        gather_issue_data.AUTHOR = campaign["author"]
+        gather_issue_data.SEARCH_KEYWORD = campaign["keyword"]
+        output_file = os.path.join(tmp_dir, f"{campaign['name']}.csv")
+        gather_issue_data.fetch_github_issues(workers=workers, output_csv_file=output_file,
+                                              core_rate=10000, search_rate=10000)
+        rows.update(read_urls(output_file))
+    return rows
+
+
+def combined_run(tmp_dir, workers):
+    output_file = os.path.join(tmp_dir, "combined.csv")
+    gather_issue_data.collect_campaigns(CAMPAIGNS, workers=workers, output_file=output_file,
+                                        core_rate=10000, search_rate=10000)
+    return read_urls(output_file)
+
+
+def measure(server, run, *args):
+    requests_before, connections_before = server.request_count, server.connection_count
+    start = time.perf_counter()
+    rows = run(*args)
+    return (time.perf_counter() - start, server.request_count - requests_before,
+            server.connection_count - connections_before, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-campaign runs against one --campaigns run.")
+    parser.add_argument("--issues", type=int, default=60, help="Issues of the main campaign.")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    gather_issue_data.GITHUB_TOKEN = gather_issue_data.GITHUB_TOKEN or "dummy-token"
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            FakeGitHubServer(make_issues(args.issues), latency=args.latency) as server:
+        gather_issue_data.GITHUB_API_URL = server.url
+        separate = measure(server, separate_runs, tmp_dir, args.workers)
+        combined = measure(server, combined_run, tmp_dir, args.workers)
+
+    separate_rows, combined_rows = separate[3], combined[3]
+    same_rows = separate_rows.keys() == combined_rows.keys() and all(
+        separate_rows[url][field] == combined_rows[url][field]
+        for url in separate_rows for field in gather_issue_data.FIELDNAMES)
+    tagged = sum(";" in row["Campaigns"] for row in combined_rows.values())
+
+    print(f"\n--- {len(CAMPAIGNS)} campaigns, {len(combined_rows)} distinct issues "
+          f"({tagged} in several campaigns), {args.latency * 1000:.0f} ms latency ---")
+    print(f"{'mode':<24} {'seconds':>8} {'requests':>9} {'connections':>12}")
+    print(f"{'one run per campaign':<24} {separate[0]:>8.2f} {separate[1]:>9} {separate[2]:>12}")
+    print(f"{'--campaigns':<24} {combined[0]:>8.2f} {combined[1]:>9} {combined[2]:>12}")
+    print(f"Same issues and fields: {same_rows}")
@@ -0,0 +1,69 @@
+import os
+import sys
+import argparse
+import subprocess
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from chart_builder import FIGURES, ChartBuilder
+from issue_dataset import SCHEMA, build_dataset, row_hash
+
+# Drawing every chart with one cold Python process per figure (as separate scripts would),
+# against the chart builder: a full build in one process, a full build in a worker pool, a
+# no-op rebuild and a rebuild after one issue is closed.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def timed_build(output_dir, dataset_file, cache_file, workers, full=False):
+    builder = ChartBuilder(output_dir=output_dir, dataset_file=dataset_file, cache_file=cache_file, workers=workers,
+                           full=full)
+    start = time.perf_counter()
+    builder.build()
+    return time.perf_counter() - start, len(builder.drawn)
+
+
+def cold_scripts(output_dir, dataset_file):
+    start = time.perf_counter()
+    for figure in FIGURES:
+        code = ("import chart_builder; chart_builder.build_charts("
+                f"{output_dir!r}, {dataset_file!r}, {os.path.join(output_dir, 'cold.json')!r}, 1, [{figure['file']!r}], True)")
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the chart builder.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dataset_file = os.path.join(tmp_dir, "issues.arrow")
+        cache_file = os.path.join(tmp_dir, "charts.cache.json")
+        table = build_dataset(dataset_file, os.path.join(ROOT, "cpython_fusil_issues.csv"),
+                              os.path.join(ROOT, "cpython_fusil_report.csv"), os.path.join(ROOT, "cpython_report.curated.md"))
+
+        cold_time = cold_scripts(tmp_dir, dataset_file)
+        serial_time, drawn = timed_build(tmp_dir, dataset_file, cache_file, 1, full=True)
+        pool_time, _ = timed_build(tmp_dir, dataset_file, cache_file, args.workers, full=True)
+        noop_time, noop_drawn = timed_build(tmp_dir, dataset_file, cache_file, args.workers)
+
+        # Close one open issue, as a sync from GitHub would
+        rows = table.to_pylist()
+        changed = next(row for row in rows if row["Status"] == "open")
+        changed.update({"Status": "closed", "Report Status": "Closed-Completed", "Closed Date": changed["Date Filed"]})
+        changed["Row Hash"] = row_hash(changed)
+        feather.write_feather(pa.Table.from_pylist(rows, schema=SCHEMA), dataset_file, compression="uncompressed")
+        change_time, change_drawn = timed_build(tmp_dir, dataset_file, cache_file, args.workers)
+
+    print(f"{'build':<32} {'ms':>8} {'figures drawn':>14}")
+    print(f"{'one cold process per figure':<32} {cold_time * 1000:>8.0f} {len(FIGURES):>14}")
+    print(f"{'full, one process':<32} {serial_time * 1000:>8.0f} {drawn:>14}")
+    print(f"{f'full, {args.workers} workers':<32} {pool_time * 1000:>8.0f} {drawn:>14}")
+    print(f"{'no-op':<32} {noop_time * 1000:>8.0f} {noop_drawn:>14}")
+    print(f"{'one issue closed':<32} {change_time * 1000:>8.0f} {change_drawn:>14}")
@@ -0,0 +1,113 @@
+import os
+import sys
+import random
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from issue_classifier import classify
+
+# Per-issue cost of the compiled classifier against the original guess_* helpers
+# (reproduced below as they were in gather_issue_data.py), over synthetic issues.
+# Also checks that both agree on every issue when no body text is given.
+
+
+def legacy_guess_kind_from_labels_title(labels, title):
+    title_lower = title.lower()
+    label_set = {label.lower() for label in labels}
+    if any(k in title_lower for k in ["segfault", "segmentation fault", "crash"]) or \
+            any(k in label_set for k in ["crash", "segfault"]):
+        return "Segfault/Crash"
+    if "assertionerror" in title_lower or "abort" in title_lower or "assert" in title_lower or \
+            any(k in label_set for k in ["assertionerror", "abort"]):
+        return "Abort/AssertionError"
+    if "systemerror" in title_lower or "system error" in title_lower or \
+            "systemerror" in label_set:
+        return "SystemError"
+    if "fatal python error" in title_lower or "fatal error" in title_lower or \
+            any(k in label_set for k in ["fatal-error"]):
+        return "Fatal Python Error"
+    return ""
+
+
+def legacy_guess_versions_from_labels(labels):
+    versions = set()
+    for label in labels:
+        label_lower = label.lower()
+        if label_lower.startswith("version-") or label_lower.startswith("python-"):
+            ver = label_lower.replace("version-", "").replace("python-", "")
+            versions.add(ver)
+        elif "3." in label_lower:
+            parts = label_lower.split(".")
+            if len(parts) > 1 and parts[0] == "3" and parts[1].isdigit():
+                versions.add(f"{parts[0]}.{parts[1]}")
+    return ";".join(sorted(list(versions))) if versions else ""
+
+
+def legacy_guess_configurations_from_labels(labels):
+    configs = set()
+    label_set = {label.lower() for label in labels}
+    if "free-threading" in label_set or "freethreading" in label_set:
+        configs.add("Free-threaded")
+    if "debug-build" in label_set or "debug" in label_set:
+        configs.add("Debug Build")
+    if "asan" in label_set or "addresssanitizer" in label_set:
+        configs.add("ASAN")
+    if "jit" in label_set:
+        configs.add("JIT")
+    return ";".join(sorted(list(configs))) if configs else ""
+
+
+def legacy_classify(title, labels):
+    return (legacy_guess_kind_from_labels_title(labels, title),
+            legacy_guess_versions_from_labels(labels),
+            legacy_guess_configurations_from_labels(labels))
+
+
+TITLE_WORDS = ["`_tkinter.create`", "segfaults", "Segmentation Fault in", "crash", "Assertion failure",
+               "aborts", "`SystemError` caused by", "Fatal Python error", "fatal error", "with invalid",
+               "argument", "is not thread safe", "in free-threading build", "on JIT", "`gc.collect()`",
+               "AssertionError", "system error", "leaks", "hangs"]
+LABELS = ["type-crash", "type-bug", "crash", "segfault", "abort", "AssertionError", "SystemError",
+          "fatal-error", "3.12", "3.13", "3.14", "version-3.11", "Python-3.10", "3.x", "3.13.1",
+          "free-threading", "FreeThreading", "debug", "debug-build", "ASAN", "AddressSanitizer", "JIT",
+          "topic-JIT", "extension-modules", "interpreter-core"]
+BODY_LINES = ["# Crash report", "### What happened?", "```python", "import gc; gc.collect()", "```",
+              "Fatal Python error: _PyObject_AssertFailed", "Segmentation fault (core dumped)",
+              "python: Objects/object.c:123: func: Assertion `x' failed.", "Aborted",
+              "SystemError: <built-in function create> returned a result with an exception set",
+              "#0  0x00005555557a9bac in _PyEval_EvalFrameDefault ()"]
+
+
+def make_synthetic_issues(count, seed=0):
+    rng = random.Random(seed)
+    return [(" ".join(rng.sample(TITLE_WORDS, rng.randint(2, 6))),
+             rng.sample(LABELS, rng.randint(0, 6)),
+             "\\n".join(rng.sample(BODY_LINES, rng.randint(3, 8))))
+            for _ in range(count)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the issue classifier.")
+    parser.add_argument("--issues", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    issues = make_synthetic_issues(args.issues)
+
+    mismatches = [(title, labels) for title, labels, _ in issues
+                  if tuple(classify(title, labels)) != legacy_classify(title, labels)]
+    print(f"Checked {len(issues)} synthetic issues: {len(mismatches)} differ from the legacy helpers.")
+    for title, labels in mismatches[:10]:
+        print(f"  {title!r} {labels!r}: {tuple(classify(title, labels))} != {legacy_classify(title, labels)}")
+
+    timings = {
+        "legacy guess_* (title+labels)": lambda: [legacy_classify(t, l) for t, l, _ in issues],
+        "classify (title+labels)": lambda: [classify(t, l) for t, l, _ in issues],
+        "classify (title+labels+body)": lambda: [classify(t, l, b) for t, l, b in issues],
+    }
+    print(f"\n--- Classification cost, {len(issues)} issues, best of {args.repeat} ---")
+    for name, func in timings.items():
+        best = min(timeit.repeat(func, number=1, repeat=args.repeat))
+        print(f"{name:<32} {best * 1000:8.2f} ms total {best / len(issues) * 1e6:8.2f} us/issue")
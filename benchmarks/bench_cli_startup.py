@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fusil_report import COMMANDS
+
+# Startup cost of each fusil_report.py subcommand, from `python -X importtime`: the time
+# spent importing modules (the sum of the self times it reports), how many modules were
+# imported and which heavy dependencies among them, plus the wall time of the process.
+#
+# `COMMAND --help` only imports the command's script. The answered questions run for real:
+# `summary issues.open` from an up to date report summary and `pr-authors` from an up to
+# date PR graph, against computing the statistics from the dataset with issue_stats.py.
+
+HEAVY_MODULES = ("pandas", "pyarrow", "numpy", "matplotlib", "github")
+QUESTIONS = [
+    ("summary issues.open", [sys.executable, "fusil_report.py", "summary", "issues.open"]),
+    ("pr-authors", [sys.executable, "fusil_report.py", "pr-authors"]),
+    ("issue_stats.py", [sys.executable, "issue_stats.py", "--output", "-"]),
+]
+
+
+def import_times(stderr):
+    """(total import seconds, module count, heavy top-level packages imported) from -X importtime output."""
+    total_us, modules, heavy = 0, 0, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        total_us += int(self_us)
+        modules += 1
+        package = name.strip().split(".")[0]
+        if package in HEAVY_MODULES:
+            heavy.add(package)
+    return total_us / 1e6, modules, heavy
+
+
+def measure(command, repeat):
+    walls, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process = subprocess.run([command[0], "-X", "importtime"] + command[1:], cwd=ROOT, capture_output=True,
+                                 text=True)
+        walls.append(time.perf_counter() - start)
+        if process.returncode:
+            raise RuntimeError(f"{' '.join(command[1:])} failed:\n{process.stderr[-2000:]}")
+        result = import_times(process.stderr)
+    return (statistics.median(walls),) + result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the startup of the fusil_report.py subcommands.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per command; the median wall time is shown.")
+    args = parser.parse_args()
+
+    subprocess.run([sys.executable, "fusil_report.py", "summary"], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)  # Brings the summary up to date
+    subprocess.run([sys.executable, "fusil_report.py", "pr-graph", "update"], cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL)  # And the PR graph
+    runs = [(f"{name} --help", [sys.executable, "fusil_report.py", name, "--help"]) for name in COMMANDS]
+    runs += QUESTIONS
+
+    print(f"\n--- Startup, -X importtime (median wall of {args.repeat} runs) ---")
+    print(f"{'command':<26} {'wall ms':>8} {'import ms':>10} {'modules':>8}  heavy imports")
+    for name, command in runs:
+        wall, imports, modules, heavy = measure(command, args.repeat)
+        print(f"{name:<26} {wall * 1000:>8.0f} {imports * 1000:>10.0f} {modules:>8}  {', '.join(sorted(heavy)) or '-'}")
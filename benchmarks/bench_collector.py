@@ -0,0 +1,130 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gather_issue_data
+from fake_github_server import FakeGitHubServer, make_synthetic_issues
+from http_fixtures import FIXTURE_EXTENSION, RecordingProxy, ReplayServer, parse_quota
+
+# End-to-end collector benchmark that runs offline: each size is recorded once from the
+# fake GitHub server through RecordingProxy into a fixture file (kept in --fixtures-dir),
+# then every backend is replayed from it, measuring throughput, API requests and the peak of
+# Python allocations (tracemalloc, in a second run so it doesn't slow the timed one).
+# --quota makes the replay server emulate rate limits instead of replaying the recorded
+# ones. An emulated GraphQL quota starts used up (as if by another client of the token), so
+# the GraphQL run goes through the scheduler's retry of RATE_LIMITED errors.
+#
+# --save writes the results to a JSON file; --compare reads one back and exits with status 1
+# if a later run needs more requests, or is more than --tolerance slower or bigger.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def run_collector(url, backend, workers, output_file):
+    gather_issue_data.GITHUB_TOKEN = "dummy-token"
+    gather_issue_data.GITHUB_API_URL = url
+    gather_issue_data.fetch_github_issues(workers=workers, output_csv_file=output_file, backend=backend,
+                                          core_rate=10000, search_rate=10000, graphql_rate=10000)
+
+
+def fixture_for(count, fixtures_dir, workers):
+    """Fixture with the traffic of every backend for `count` synthetic issues, recorded if missing."""
+    path = os.path.join(fixtures_dir, f"collector_{count}{FIXTURE_EXTENSION}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(fixtures_dir, exist_ok=True)
+    print(f"Recording {path}...")
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            FakeGitHubServer(make_synthetic_issues(count)) as upstream, \
+            RecordingProxy(upstream.url, path + ".tmp") as proxy:
+        for backend in gather_issue_data.BACKENDS:
+            run_collector(proxy.url, backend, workers, os.path.join(tmp_dir, f"{backend}.csv"))
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def replay(fixture, backend, workers, latency, trace_memory, quotas=None):
+    with tempfile.TemporaryDirectory() as tmp_dir, ReplayServer(fixture, latency=latency, quotas=quotas) as server:
+        if "graphql" in server.quotas:
+            server.used["graphql"] = server.quotas["graphql"][0]
+        output_file = os.path.join(tmp_dir, f"{backend}.csv")
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        run_collector(server.url, backend, workers, output_file)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        tracemalloc.stop()
+        if server.missing:
+            raise RuntimeError(f"{len(server.missing)} requests missing from {fixture}, e.g. {server.missing[0]}; "
+                               f"delete the fixture to record it again")
+        with open(output_file, encoding="utf-8") as f:
+            rows = sum(1 for _ in f) - 1
+        return {"seconds": elapsed, "requests": server.request_count, "rows": rows, "peak_bytes": peak,
+                "rate_limited": server.rate_limited_count}
+
+
+def regressions(results, baseline, tolerance):
+    found = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        if result["requests"] > before["requests"]:
+            found.append(f"{name}: {before['requests']} -> {result['requests']} requests")
+        for metric in ("seconds", "peak_bytes"):
+            if result[metric] and before.get(metric) and result[metric] > before[metric] * (1 + tolerance):
+                found.append(f"{name}: {metric} {before[metric]:.4g} -> {result[metric]:.4g}")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline collector benchmark on recorded fixtures.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[50, 500, 5000])
+    parser.add_argument("--backends", nargs="+", choices=gather_issue_data.BACKENDS,
+                        default=list(gather_issue_data.BACKENDS))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Replay latency per request, in seconds.")
+    parser.add_argument("--fixtures-dir", default=FIXTURES_DIR)
+    parser.add_argument("--quota", type=parse_quota, action="append", default=[], metavar="RESOURCE=LIMIT[/SECONDS]",
+                        help="Emulate a rate-limit quota in the replay server (repeatable), e.g. graphql=4/2.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs.")
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Baseline JSON file from --save to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown/growth (default: 25%%).")
+    args = parser.parse_args()
+
+    results = {}
+    for count in args.issues:
+        fixture = fixture_for(count, args.fixtures_dir, args.workers)
+        for backend in args.backends:
+            result = replay(fixture, backend, args.workers, args.latency, trace_memory=False, quotas=dict(args.quota))
+            if not args.no_memory:
+                result["peak_bytes"] = replay(fixture, backend, args.workers, args.latency, trace_memory=True,
+                                              quotas=dict(args.quota))["peak_bytes"]
+            results[f"{backend}/{count}"] = result
+
+    print(f"\n--- Collector on replayed fixtures ({args.workers} workers, {args.latency * 1000:.0f} ms latency) ---")
+    print(f"{'run':>14} {'rows':>6} {'seconds':>8} {'issues/s':>9} {'requests':>9} {'limited':>8} {'peak MB':>8}")
+    for name, result in results.items():
+        peak = f"{result['peak_bytes'] / 2 ** 20:.1f}" if result["peak_bytes"] else "-"
+        print(f"{name:>14} {result['rows']:>6} {result['seconds']:>8.2f} {result['rows'] / result['seconds']:>9.0f} "
+              f"{result['requests']:>9} {result['rate_limited']:>8} {peak:>8}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved the results to '{args.save}'")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        print(f"\n{len(found)} regressions against '{args.compare}'")
+        for line in found:
+            print(f"  {line}")
+        sys.exit(1 if found else 0)
@@ -0,0 +1,71 @@
+import os
+import sys
+import random
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtrace_index import CrashIndex, crash_signature, parse_backtrace
+
+# Lookup latency of the crash-signature index with thousands of synthetic crashes indexed.
+
+GENERIC_TAIL = [
+    "_PyObject_VectorcallTstate (tstate=0x555555cbbc70, callable=0x7ffff7aba630) at ./Include/internal/pycore_call.h:167",
+    "PyObject_Vectorcall (callable=callable@entry=0x7ffff7aba630) at Objects/call.c:327",
+    "_PyEval_EvalFrameDefault (tstate=0x555555cbbc70, frame=0x7ffff7fb0020) at Python/generated_cases.c.h:813",
+    "_PyEval_Vector (tstate=tstate@entry=0x555555cbbc70, func=0x7ffff7a033d0) at Python/ceval.c:1807",
+    "PyEval_EvalCode (co=co@entry=0x7ffff7a58630) at Python/ceval.c:597",
+    "run_eval_code_obj (tstate=0x555555cbbc70, co=0x7ffff7a58630) at Python/pythonrun.c:1337",
+]
+MODULES = ["Modules/_tkinter.c", "Modules/_lsprof.c", "Python/tracemalloc.c", "Objects/unicodeobject.c",
+           "Modules/_ctypes/_ctypes.c", "Python/gc_free_threading.c", "Modules/_io/textio.c"]
+
+
+def make_backtrace(rng, function_pool):
+    depth = rng.randint(1, 4)
+    frames = [f"{rng.choice(function_pool)} (self=0x7ffff7a91050, args=<optimized out>) "
+              f"at {rng.choice(MODULES)}:{rng.randint(10, 5000)}" for _ in range(depth)]
+    lines = []
+    for number, frame in enumerate(frames + GENERIC_TAIL):
+        address = "" if number == 0 else f"0x{rng.getrandbits(48):012x} in "
+        lines.append(f"#{number}  {address}{frame}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark crash index lookups.")
+    parser.add_argument("--crashes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    function_pool = [f"func_{n}" for n in range(3000)]
+    print(f"{'crashes':>8} {'index s':>8} {'lookup ms (mean)':>17} {'lookup ms (p99)':>16} {'hit rate':>9}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in args.crashes:
+            backtraces = [make_backtrace(rng, function_pool) for _ in range(count)]
+            index_path = os.path.join(tmp_dir, f"index_{count}.sqlite3")
+            start = time.perf_counter()
+            with CrashIndex(index_path) as index:
+                for issue, text in enumerate(backtraces):
+                    index.add(issue, text)
+            index_time = time.perf_counter() - start
+
+            queries = [rng.choice(backtraces) for _ in range(args.lookups)]
+            timings = []
+            hits = 0
+            with CrashIndex(index_path) as index:
+                for text in queries:
+                    start = time.perf_counter()
+                    signature, exact, similar = index.lookup(text)
+                    timings.append(time.perf_counter() - start)
+                    hits += bool(exact)
+            timings.sort()
+            mean_ms = sum(timings) / len(timings) * 1000
+            p99_ms = timings[int(len(timings) * 0.99)] * 1000
+            print(f"{count:>8} {index_time:>8.2f} {mean_ms:>17.3f} {p99_ms:>16.3f} {hits / len(queries):>8.0%}")
+
+    sample = parse_backtrace(backtraces[0])
+    print(f"\nSample signature {crash_signature(sample)} from frames {[frame.function for frame in sample[:4]]}")
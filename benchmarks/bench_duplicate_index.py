@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplicate_index import DuplicateIndex, issue_fields, minhash, shingles, similarity
+
+# Near-duplicate lookups with thousands of synthetic issues indexed: LSH lookups against a
+# scan comparing the candidate with every stored signature, how many of the scan's top 5
+# with a similarity of at least --threshold the LSH lookup finds, how often it finds the issue a query was derived from, and the
+# cost of adding a few issues against rebuilding the index.
+#
+# The fake server's issues share one template (every pair looks like a duplicate), so the
+# issues here are random crash reports over a vocabulary of modules, functions and errors.
+
+
+
+def vocabulary(size, seed, prefix=""):
+    """Letter-only words: the index masks digits, so "func1" and "func2" would be the same word."""
+    rng = random.Random(seed)
+    return sorted({prefix + "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 9)))
+                   for _ in range(size)})
+
+
+MODULES = vocabulary(300, 1, prefix="_")
+FUNCTIONS = vocabulary(2000, 2)
+ERRORS = ["Assertion", "Segmentation fault", "Fatal Python error", "SystemError", "Abort", "use after free"]
+WORDS = vocabulary(5000, 3)
+
+
+def make_issue(rng):
+    module, function = rng.choice(MODULES), rng.choice(FUNCTIONS)
+    title = f"{rng.choice(ERRORS)} in `{module}.{function}` {' '.join(rng.sample(WORDS, 3))}"
+    calls = "\n".join(f"{module}.{rng.choice(FUNCTIONS)}({rng.choice(WORDS)})" for _ in range(rng.randint(2, 6)))
+    body = (f"# Crash report\n\n{' '.join(rng.sample(WORDS, 20))}\n```python\nimport {module}\n{calls}\n```\n"
+            f"```\n{rng.choice(ERRORS)}: {' '.join(rng.sample(WORDS, 6))}\n```\n")
+    return title, body
+
+
+def near_duplicate(rng, title, body):
+    """A report of the same crash: about a fifth of its words replaced."""
+    def mutate(text):
+        return " ".join(rng.choice(WORDS) if rng.random() < 0.2 else word for word in text.split(" "))
+    return mutate(title), mutate(body)
+
+
+def brute_force(index, signature, limit):
+    rows = index.connection.execute("SELECT issue, signature FROM issues").fetchall()
+    scores = [(issue, similarity(signature, np.frombuffer(stored, dtype=np.uint32))) for issue, stored in rows]
+    scores.sort(key=lambda score: (-score[1], score[0]))
+    return scores[:limit]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the near-duplicate index.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--added", type=int, default=20, help="Issues added incrementally after the build.")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Scan matches below this similarity are unrelated, LSH may miss them.")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.issues:
+        rng = random.Random(count)
+        issues = [(number, *make_issue(rng)) for number in range(1, count + args.added + 1)]
+        existing, added = issues[:count], issues[count:]
+        originals = rng.sample(existing, args.queries)
+        queries = [(number, *near_duplicate(rng, title, body)) for number, title, body in originals]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with DuplicateIndex(os.path.join(tmp_dir, "index.sqlite3")) as index:
+                start = time.perf_counter()
+                index.add_many(existing)
+                build_time = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for issue in added:
+                    index.add(*issue)
+                add_time = (time.perf_counter() - start) / len(added)
+
+                lsh_times, scan_times, found, relevant, originals_found = [], [], 0, 0, 0
+                for original, title, body in queries:
+                    signature = minhash(shingles(issue_fields(title, body)))
+                    start = time.perf_counter()
+                    matches = index.similar(title, body, args.k)
+                    lsh_times.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    expected = brute_force(index, signature, args.k)
+                    scan_times.append(time.perf_counter() - start)
+                    expected = {issue for issue, score in expected if score >= args.threshold}
+                    found += len({issue for issue, _, _ in matches} & expected)
+                    relevant += len(expected)
+                    originals_found += any(issue == original for issue, _, _ in matches)
+                index_size = os.path.getsize(os.path.join(tmp_dir, "index.sqlite3"))
+        results.append((count, build_time, add_time, statistics.median(lsh_times), statistics.median(scan_times),
+                        found / relevant if relevant else 1.0, originals_found / len(queries), index_size))
+
+    print(f"\n--- Near-duplicate index, median of {args.queries} top-{args.k} queries "
+          f"(recall of matches >= {args.threshold}) ---")
+    print(f"{'issues':>7} {'build s':>8} {'add ms':>7} {'LSH ms':>7} {'scan ms':>8} {'speedup':>8} "
+          f"{'recall':>7} {'found':>6} {'MB':>6}")
+    for count, build_time, add_time, lsh_time, scan_time, recall, original, index_size in results:
+        print(f"{count:>7} {build_time:>8.2f} {add_time * 1000:>7.2f} {lsh_time * 1000:>7.2f} "
+              f"{scan_time * 1000:>8.2f} {scan_time / lsh_time:>7.1f}x {recall:>7.1%} {original:>6.0%} {index_size / 2 ** 20:>6.1f}")
@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import filecmp
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gather_issue_data
+from fake_github_server import FakeGitHubServer, make_synthetic_issues
+
+# REST (one timeline request per issue) against GraphQL (pages of issues with their
+# cross-referenced PRs) on the local fake GitHub server. Both must write identical CSVs.
+
+
+def run_collector(server_url, backend, workers, output_csv_file):
+    gather_issue_data.GITHUB_TOKEN = gather_issue_data.GITHUB_TOKEN or "dummy-token"
+    gather_issue_data.GITHUB_API_URL = server_url
+    start = time.perf_counter()
+    gather_issue_data.fetch_github_issues(workers=workers, output_csv_file=output_csv_file, backend=backend,
+                                          core_rate=10000, search_rate=10000, graphql_rate=10000)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the REST and GraphQL collector backends.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[50, 500])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=8, help="Timeline workers of the REST backend.")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.issues:
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                FakeGitHubServer(make_synthetic_issues(count), latency=args.latency) as server:
+            row = [count]
+            for backend in gather_issue_data.BACKENDS:
+                output_csv_file = os.path.join(tmp_dir, f"{backend}.csv")
+                requests_before = server.request_count
+                elapsed = run_collector(server.url, backend, args.workers, output_csv_file)
+                row.extend([elapsed, server.request_count - requests_before])
+            row.append(filecmp.cmp(os.path.join(tmp_dir, "rest.csv"), os.path.join(tmp_dir, "graphql.csv"),
+                                   shallow=False))
+            results.append(row)
+
+    print(f"\n--- REST ({args.workers} workers) vs GraphQL, {args.latency * 1000:.0f} ms latency ---")
+    print(f"{'issues':>7} {'REST s':>8} {'requests':>9} {'GraphQL s':>10} {'requests':>9} {'fewer':>7}  identical CSV")
+    for count, rest_time, rest_requests, graphql_time, graphql_requests, same in results:
+        print(f"{count:>7} {rest_time:>8.2f} {rest_requests:>9} {graphql_time:>10.2f} {graphql_requests:>9} "
+              f"{rest_requests / graphql_requests:>6.1f}x  {same}")
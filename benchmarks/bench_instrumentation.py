@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import instrumentation
+
+# Cost of the always-on instrumentation: a stage() block and a step of a traced() pipeline,
+# against the same work without them. The pipeline scripts open a handful of stages per run
+# and one traced step per issue, so this is what a collector run pays per issue and stage.
+
+
+def bare_pipeline(count):
+    return sum(row for row in (item * 2 for item in range(count)))
+
+
+def traced_pipeline(count):
+    items = instrumentation.traced("produce", range(count))
+    rows = instrumentation.traced("transform", (item * 2 for item in items))
+    with instrumentation.stage("consume"):
+        return sum(rows)
+
+
+def bare_blocks(count):
+    total = 0
+    for item in range(count):
+        total += item
+    return total
+
+
+def stage_blocks(count):
+    total = 0
+    for item in range(count):
+        with instrumentation.stage("block"):
+            total += item
+    return total
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the overhead of the instrumentation layer.")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"\n--- Instrumentation overhead, {args.items} items, best of {args.repeat} ---")
+    # (name, bare, instrumented, instrumented operations per item, operation)
+    cases = [("traced() pipeline", bare_pipeline, traced_pipeline, 2, "traced step"),
+             ("stage() blocks", bare_blocks, stage_blocks, 1, "stage")]
+    for name, bare, instrumented, operations, operation in cases:
+        bare_time = best_of(args.repeat, bare, args.items)
+        instrumented_time = best_of(args.repeat, instrumented, args.items)
+        overhead = (instrumented_time - bare_time) / (args.items * operations) * 1e6
+        print(f"{name:<18} bare {bare_time:.3f}s, instrumented {instrumented_time:.3f}s: "
+              f"{overhead:.2f} us per {operation}")
@@ -0,0 +1,56 @@
+import os
+import sys
+import argparse
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from issue_dataset import COLLECTOR_CSV_FILE, build_dataset, load_issues
+
+# Cold-load cost of the columnar dataset against parsing the CSV and coercing its dates,
+# for the columns calculate_placeholders.py uses. The shipped issues are repeated (with
+# fresh issue numbers) to reach the requested sizes.
+
+PROJECTED_COLUMNS = ['Issue #', 'Title', 'Date Filed', 'Closed Date', 'Status', 'Guessed Kind']
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def inflate_csv(path, count):
+    df_issues = pd.read_csv(os.path.join(ROOT, COLLECTOR_CSV_FILE), dtype=str, keep_default_na=False)
+    repeats = -(-count // len(df_issues))
+    inflated = pd.concat([df_issues] * repeats, ignore_index=True).iloc[:count]
+    inflated['Issue #'] = range(1, count + 1)
+    inflated.to_csv(path, index=False)
+
+
+def load_csv(path):
+    df_issues = pd.read_csv(path)
+    df_issues['Date Filed'] = pd.to_datetime(df_issues['Date Filed'], format='%Y-%m-%d', errors='coerce')
+    df_issues['Closed Date'] = pd.to_datetime(df_issues['Closed Date'], format='%Y-%m-%d', errors='coerce')
+    return df_issues
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark loading the issue dataset against the CSV.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'CSV KB':>8} {'dataset KB':>11} {'CSV ms':>8} {'dataset ms':>11} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for count in args.issues:
+            csv_path = os.path.join(tmp_dir, f"issues_{count}.csv")
+            dataset_path = os.path.join(tmp_dir, f"issues_{count}.arrow")
+            inflate_csv(csv_path, count)
+            build_dataset(dataset_path, collector_csv=csv_path, report_csv="", curated_file="")
+
+            csv_time = min(timeit.repeat(lambda: load_csv(csv_path)[PROJECTED_COLUMNS], number=1,
+                                         repeat=args.repeat))
+            dataset_time = min(timeit.repeat(
+                lambda: load_issues(PROJECTED_COLUMNS, dataset_file=dataset_path, rebuild_if_stale=False),
+                number=1, repeat=args.repeat))
+            print(f"{count:>8} {os.path.getsize(csv_path) / 1024:>8.0f} {os.path.getsize(dataset_path) / 1024:>11.0f} "
+                  f"{csv_time * 1000:>8.1f} {dataset_time * 1000:>11.1f} {csv_time / dataset_time:>7.1f}x")
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from issue_search import IssueSearchIndex, index_row
+
+# Full-text queries over tens of thousands of synthetic crash reports: building the index,
+# re-indexing changed issues, and the median latency of typical queries against a substring
+# scan of every issue's text held in memory (a best case for grepping the report and CSVs).
+
+MODULES = [f"_{name}" for name in ("interpreters", "json", "lsprof", "tkinter", "io", "sre", "ctypes", "pickle",
+                                    "asyncio", "decimal", "datetime", "curses", "sqlite3", "ssl", "zoneinfo")]
+KINDS = ["Segmentation Fault", "Abort", "SystemError", "Fatal Python error", "Memory leak"]
+CONFIGURATIONS = ["Release", "Debug", "JIT", "Free-Threaded", "ASAN"]
+VERSIONS = ["3.12", "3.13", "3.14", "3.15"]
+START = datetime(2024, 10, 1)
+QUERIES = [  # (label, search() keyword arguments)
+    ("rare function", {"text": "Objects_func_0042"}),
+    ("module.function", {"text": "_interpreters.exec"}),
+    ("every issue", {"text": "_PyEval_EvalFrameDefault"}),
+    ("prefix", {"text": "Objects_func_00*"}),
+    ("text + filters", {"text": "_ctypes", "kind": "Abort", "version": "3.14", "since": "2025-01-01"}),
+    ("filters only", {"configuration": "JIT", "status": "open"}),
+]
+
+
+def make_row(rng, number, functions):
+    module = rng.choice(MODULES)
+    crash_functions = rng.sample(functions, 4)
+    frames = "\n".join(f"#{depth}  0x{rng.getrandbits(48):012x} in {function} (self=0x{rng.getrandbits(48):x}) "
+                       f"at Objects/{function.split('_')[0].lower()}.c:{rng.randint(1, 5000)}"
+                       for depth, function in enumerate(crash_functions + ["_PyEval_EvalFrameDefault"]))
+    mre = f"import {module}\n{module}.{rng.choice(['exec', 'loads', 'create', 'dumps'])}({rng.random()!r})"
+    filed = START + timedelta(days=rng.randint(0, 400))
+    closed = filed + timedelta(days=rng.randint(0, 60)) if rng.random() < 0.8 else None
+    return {
+        "Issue #": number, "Title": f"{rng.choice(KINDS)} in `{module}` from `{crash_functions[0]}`",
+        "HTML URL": f"https://github.com/python/cpython/issues/{number}", "Date Filed": filed, "Closed Date": closed,
+        "Status": "closed" if closed else "open", "Report Status": "Closed-Completed" if closed else "Open",
+        "Kind": rng.choice(KINDS), "Configuration": rng.choice(CONFIGURATIONS),
+        "Guessed Kind": None, "Python Versions": rng.sample(VERSIONS, rng.randint(1, 3)),
+        "Guessed CPython Versions": [], "Body Snippet (MRE/Backtrace hint)": f"# Crash report\n```python\n{mre}\n```",
+        "MREs": [mre], "Backtraces": [frames], "Notes": [], "Row Hash": f"{number}-{rng.random()}",
+    }
+
+
+def scan(texts, term):
+    """Issues whose text contains `term`, the way grep finds them."""
+    return [issue for issue, text in texts if term in text]
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the full-text issue search index.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--changed", type=int, default=100, help="Issues re-indexed incrementally after the build.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.issues:
+        rng = random.Random(count)
+        functions = [f"{prefix}_func_{number:04d}" for prefix in ("Objects", "Modules", "Python")
+                     for number in range(count // 10 + 10)]
+        rows = [make_row(rng, number, functions) for number in range(1, count + 1)]
+        texts = [(row["Issue #"], "\n".join(index_row(row)[2])) for row in rows]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "index.sqlite3")
+            with IssueSearchIndex(path) as index:
+                start = time.perf_counter()
+                index.add_many(rows)
+                build_time = time.perf_counter() - start
+                changed = [make_row(rng, row["Issue #"], functions) for row in rng.sample(rows, args.changed)]
+                start = time.perf_counter()
+                index.add_many(changed)
+                update_time = (time.perf_counter() - start) / len(changed)
+                size = os.path.getsize(path) + os.path.getsize(path + "-wal")
+
+                print(f"\n--- {count} issues: build {build_time:.2f}s, {size / 2 ** 20:.1f} MB, "
+                      f"re-indexing one issue {update_time * 1000:.2f} ms ---")
+                print(f"{'query':<18} {'FTS ms':>8} {'scan ms':>8} {'speedup':>8}")
+                for label, query in QUERIES:
+                    search_time, _ = timed(lambda: index.search(**query), args.repeat)
+                    term = query.get("text", "").rstrip("*")
+                    if term:
+                        scan_time, _ = timed(lambda: scan(texts, term), max(1, args.repeat // 4))
+                        print(f"{label:<18} {search_time * 1000:>8.2f} {scan_time * 1000:>8.2f} "
+                              f"{scan_time / search_time:>7.0f}x")
+                    else:
+                        print(f"{label:<18} {search_time * 1000:>8.2f} {'-':>8} {'-':>8}")
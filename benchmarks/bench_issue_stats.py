@@ -0,0 +1,108 @@
+import os
+import sys
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from issue_dataset import PR_TYPE
+from issue_stats import compute_statistics
+
+# One-pass statistics over a synthetic dataset against the previous approach of
+# calculate_placeholders.py: one filter (with Status.str.lower()) per statistic.
+
+STATUSES = ["open", "closed", "Closed"]
+REPORT_STATUSES = ["Open", "Closed-Completed", "Closed-Not-Planned"]
+KINDS = ["Abort", "Segmentation Fault"]
+GUESSED_KINDS = ["Segfault/Crash", "Abort/AssertionError", "SystemError", "Fatal Python Error"]
+CONFIGURATIONS = ["Debug", "Release", "release", "Free-Threaded", "JIT"]
+AUTHORS = [f"author{n}" for n in range(200)]
+
+
+def _categorical(rng, values, count, missing=0.05):
+    codes = rng.integers(0, len(values), count)
+    codes[rng.random(count) < missing] = -1
+    return pd.Categorical.from_codes(codes, categories=pd.Index(values).unique()) if len(set(values)) == len(values) \
+        else pd.Categorical(np.array(values + [None], dtype=object)[codes])
+
+
+def make_issue_table(count, seed=0):
+    rng = np.random.default_rng(seed)
+    filed = pd.Timestamp("2024-10-31") + pd.to_timedelta(rng.integers(0, 200, count), unit="D")
+    closed = filed + pd.to_timedelta(rng.integers(0, 120, count), unit="D")
+    status = _categorical(rng, STATUSES, count, missing=0)
+    closed = closed.where(np.asarray(status).astype(str) != "open")
+
+    pr_counts = rng.integers(0, 4, count)
+    pr_numbers = rng.integers(100000, 100000 + count, int(pr_counts.sum()))
+    author_counts = rng.integers(1, 3, len(pr_numbers))
+    author_values = np.array(AUTHORS, dtype=object)[rng.integers(0, len(AUTHORS), int(author_counts.sum()))]
+    authors = pa.ListArray.from_arrays(np.concatenate([[0], np.cumsum(author_counts)]).astype(np.int32),
+                                       pa.array(author_values, type=pa.string()))
+    urls = pa.array([f"https://github.com/python/cpython/pull/{number}" for number in pr_numbers.tolist()])
+    pr_structs = pa.StructArray.from_arrays(
+        [pa.array(pr_numbers), urls, authors, pa.array([""] * len(pr_numbers)),
+         pa.array([None] * len(pr_numbers), type=PR_TYPE.field("created").type)], fields=list(PR_TYPE))
+    prs = pa.ListArray.from_arrays(np.concatenate([[0], np.cumsum(pr_counts)]).astype(np.int32), pr_structs)
+
+    df_issues = pd.DataFrame({
+        "Date Filed": filed,
+        "Closed Date": closed,
+        "Status": status,
+        "Report Status": _categorical(rng, REPORT_STATUSES, count),
+        "Kind": _categorical(rng, KINDS, count),
+        "Configuration": _categorical(rng, CONFIGURATIONS, count),
+        "Guessed Kind": _categorical(rng, GUESSED_KINDS, count, missing=0.1),
+    })
+    table = pa.Table.from_pandas(df_issues, preserve_index=False)
+    return table.append_column("PRs", prs)
+
+
+def multi_pass_statistics(df_issues):
+    """Roughly what calculate_placeholders.py did: one pass per statistic."""
+    statistics = {
+        "open": df_issues[df_issues['Status'].str.lower() == 'open'].shape[0],
+        "closed": df_issues[df_issues['Status'].str.lower() == 'closed'].shape[0],
+        "by_guessed_kind": df_issues['Guessed Kind'].astype(object).fillna('Unknown').value_counts(),
+        "by_kind": df_issues['Kind'].astype(object).fillna('Unknown').value_counts(),
+        "by_configuration": df_issues['Configuration'].astype(object).fillna('Unknown').value_counts(),
+        "by_report_status": df_issues['Report Status'].astype(object).fillna('Unknown').value_counts(),
+    }
+    closed = df_issues[(df_issues['Status'].str.lower() == 'closed') & df_issues['Date Filed'].notna()
+                       & df_issues['Closed Date'].notna()].copy()
+    closed['Days Open Calc'] = (closed['Closed Date'] - closed['Date Filed']).dt.days
+    valid_days_open = closed['Days Open Calc'].dropna()
+    statistics["mean"] = valid_days_open.mean()
+    statistics["median"] = valid_days_open.median()
+    statistics["percentiles"] = valid_days_open.quantile([0.25, 0.75, 0.9])
+    prs = df_issues['PRs'].explode().dropna()
+    statistics["prs"] = len(prs)
+    statistics["authors"] = pd.Series([author for pr in prs for author in pr['authors']]).value_counts()
+    return statistics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the one-pass report statistics.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'multi-pass ms':>14} {'one-pass ms':>12} {'speedup':>8}  same counts")
+    for count in args.issues:
+        table = make_issue_table(count)
+        df_issues = table.to_pandas()
+        one_pass = compute_statistics(table)
+        multi_pass = multi_pass_statistics(df_issues)
+        same = (one_pass["issues"]["open"] == multi_pass["open"]
+                and one_pass["issues"]["closed"] == multi_pass["closed"]
+                and one_pass["prs"]["total"] == multi_pass["prs"]
+                and one_pass["days_to_close"]["median"] == multi_pass["median"]
+                and one_pass["by_kind"] == multi_pass["by_kind"].to_dict())
+
+        multi_time = min(timeit.repeat(lambda: multi_pass_statistics(df_issues), number=1, repeat=args.repeat))
+        one_time = min(timeit.repeat(lambda: compute_statistics(table), number=1, repeat=args.repeat))
+        print(f"{count:>8} {multi_time * 1000:>14.1f} {one_time * 1000:>12.1f} {multi_time / one_time:>7.1f}x  {same}")
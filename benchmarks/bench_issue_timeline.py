@@ -0,0 +1,106 @@
+import os
+import sys
+import copy
+import argparse
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from issue_timeline import PERIODS, Backlog, bucket_counts, day_numbers, row_hash_fingerprints
+
+# Created/closed/open counts of a synthetic multi-year history: bucket_counts() against
+# pandas resample(), and keeping a Backlog up to date after appending or closing issues
+# against rebuilding it. The incremental sync diffs the 'Row Hash' column (an Arrow array,
+# as read from the dataset) and passes only the changed rows, like update_backlog().
+
+FREQUENCIES = {"day": "D", "week": "W-SUN", "month": "MS"}
+
+
+def make_issues(count, years=5, seed=0):
+    rng = np.random.default_rng(seed)
+    filed = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 365 * years, count), unit="D")
+    closed = pd.Series(filed + pd.to_timedelta(rng.integers(0, 200, count), unit="D"))
+    closed[rng.random(count) < 0.2] = pd.NaT
+    return with_row_hashes(pd.DataFrame({"Issue #": np.arange(count) + 100000, "Date Filed": filed,
+                                         "Closed Date": closed}))
+
+
+def with_row_hashes(df_issues):
+    """Adds a stand-in for the dataset's 'Row Hash' column: a 40 hex digit digest of the other columns."""
+    hashes = pd.util.hash_pandas_object(df_issues[["Issue #", "Date Filed", "Closed Date"]], index=False)
+    return df_issues.assign(**{"Row Hash": [f"{value:016x}".ljust(40, "0") for value in hashes]})
+
+
+def resample_counts(df_issues, period):
+    """The same counts with pandas resample()."""
+    frequency = FREQUENCIES[period]
+    created = df_issues.set_index("Date Filed").resample(frequency)["Issue #"].count()
+    closed = df_issues.dropna(subset=["Closed Date"]).set_index("Closed Date").resample(frequency)["Issue #"].count()
+    counts = pd.concat([created.rename("Created"), closed.rename("Closed")], axis=1).fillna(0).astype(int)
+    counts["Open"] = counts["Created"].cumsum() - counts["Closed"].cumsum()
+    return counts
+
+
+def best(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the issue time buckets.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--updated", type=int, default=1000, help="Issues appended or closed per refresh.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'issues':>8} {'period':>6} {'resample ms':>12} {'bincount ms':>12} {'speedup':>8}  same")
+    for count in args.issues:
+        df_issues = make_issues(count)
+        for period in PERIODS:
+            same = (bucket_counts(df_issues, period)[["Created", "Closed", "Open"]].to_numpy().sum(axis=0)
+                    == resample_counts(df_issues, period).to_numpy().sum(axis=0)).all()
+            resample_time = best(lambda: resample_counts(df_issues, period), args.repeat)
+            bincount_time = best(lambda: bucket_counts(df_issues, period), args.repeat)
+            print(f"{count:>8} {period:>6} {resample_time * 1000:>12.1f} {bincount_time * 1000:>12.1f} "
+                  f"{resample_time / bincount_time:>7.1f}x  {same}")
+
+    print(f"\n{'issues':>8} {'refresh':<28} {'rebuild ms':>11} {'incremental ms':>15} {'speedup':>8}")
+    for count in args.issues:
+        df_issues = make_issues(count + args.updated)
+        df_old, df_new = df_issues.iloc[:count], df_issues.iloc[count:]
+        backlog = Backlog()
+        backlog.sync(df_old)
+        new_days = [day_numbers(df_new[column]) for column in ("Date Filed", "Closed Date")]
+        new_fingerprints = row_hash_fingerprints(df_new["Row Hash"].to_numpy())
+
+        def append():
+            refreshed = copy.deepcopy(backlog)
+            refreshed.append(df_new["Issue #"].to_numpy(), *new_days, new_fingerprints)
+            return refreshed
+
+        # Close some open issues, and sync the rows whose hash changed
+        df_closed = df_issues.copy()
+        still_open = df_closed.index[df_closed["Closed Date"].isna()][:args.updated]
+        df_closed.loc[still_open, "Closed Date"] = pd.Timestamp("2025-06-01")
+        df_closed = with_row_hashes(df_closed)
+        closed_hashes = pa.chunked_array([pa.array(df_closed["Row Hash"], pa.string())])
+        full = Backlog()
+        full.sync(df_issues)
+
+        def sync():
+            refreshed = copy.deepcopy(full)
+            changed, removed = refreshed.changes(df_closed["Issue #"].to_numpy(), closed_hashes)
+            refreshed.sync(df_closed.iloc[np.searchsorted(df_closed["Issue #"].to_numpy(), changed)], removed)
+            return refreshed
+
+        assert append().counts("week").equals(bucket_counts(df_issues, "week"))
+        assert sync().counts("week").equals(bucket_counts(df_closed, "week"))
+        for label, incremental, df_final in ((f"append {args.updated} issues", append, df_issues),
+                                             (f"sync, {args.updated} issues closed", sync, df_closed)):
+            rebuild_time = best(lambda: Backlog().sync(df_final), args.repeat)
+            incremental_time = best(incremental, args.repeat)
+            print(f"{count:>8} {label:<28} {rebuild_time * 1000:>11.1f} {incremental_time * 1000:>15.1f} "
+                  f"{rebuild_time / incremental_time:>7.1f}x")
@@ -0,0 +1,135 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pr_graph import PRGraph, pr_key
+
+# Questions about PR authors answered from the PR graph against recounting them from the
+# raw 'Linked PRs' and 'Linked PRs Created' cells of every issue, the way the PR scripts
+# did: per-author counts, the top contributors, the issues of one PR and the days from
+# filing to first PR. Also times building the graph, linking one new PR and relinking
+# changed issues, and checks that the graph's counts match the recount afterwards.
+
+AUTHORS = [f"dev{index:03d}" for index in range(300)]
+START = datetime(2024, 10, 1)
+
+
+def make_issue(rng, number, next_pr):
+    """(issue, filed, prs) with PR authors drawn from a skewed distribution, as in the real campaign."""
+    filed = START + timedelta(days=rng.randint(0, 400))
+    prs = []
+    for _ in range(rng.choice([0, 0, 1, 1, 1, 2, 3])):
+        if rng.random() < 0.1 and next_pr[0] > 1:  # A PR shared with another issue
+            pr_number = rng.randrange(1, next_pr[0])
+        else:
+            pr_number = next_pr[0]
+            next_pr[0] += 1
+        pr_rng = random.Random(pr_number)  # Same author and date whichever issue lists the PR
+        prs.append({"number": pr_number, "url": f"https://github.com/python/cpython/pull/{pr_number}",
+                    "authors": [AUTHORS[min(int(pr_rng.paretovariate(1.2)) - 1, len(AUTHORS) - 1)]],
+                    "status": pr_rng.choice(["closed", "open"]),
+                    "created": START + timedelta(days=pr_number % 400 + pr_rng.randint(0, 30))})
+    return number, filed, prs
+
+
+def linked_prs_columns(issues):
+    """The collector CSV's ('Linked PRs', 'Linked PRs Created') cells of the issues."""
+    return {number: (" | ".join(f"{pr['url']};{pr['authors'][0]};{pr['status']}" for pr in prs),
+                     " | ".join(f"{pr['created']:%Y-%m-%d}" for pr in prs))
+            for number, _, prs in issues}
+
+
+def recount(cells):
+    """Per-author PR and issue counts from the raw strings."""
+    pr_authors, issue_authors = {}, {}
+    for number, (cell, _) in cells.items():
+        for pr_info in cell.split(" | ") if cell else []:
+            url, author, _ = pr_info.split(";")
+            pr_authors.setdefault(author, set()).add(url)
+            issue_authors.setdefault(author, set()).add(number)
+    return (Counter({author: len(prs) for author, prs in pr_authors.items()}),
+            Counter({author: len(issues) for author, issues in issue_authors.items()}))
+
+
+def recount_first_pr(cells, filed):
+    days = []
+    for number, (_, created) in cells.items():
+        dates = [datetime.strptime(date, "%Y-%m-%d") for date in created.split(" | ") if created]
+        if dates:
+            days.append((min(dates) - filed[number]).days)
+    return statistics.median(days)
+
+
+def issues_of_pr_scan(cells, url):
+    return [number for number, (cell, _) in cells.items() if url + ";" in cell]
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the issue/PR/author graph.")
+    parser.add_argument("--issues", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--changed", type=int, default=100, help="Issues relinked incrementally after the build.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for count in args.issues:
+        rng = random.Random(count)
+        next_pr = [1]
+        issues = [make_issue(rng, number, next_pr) for number in range(1, count + 1)]
+        cells = linked_prs_columns(issues)
+        filed = {number: date for number, date, _ in issues}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "pr_graph.sqlite3")
+            with PRGraph(path) as graph:
+                build_time, _ = timed(lambda: graph.link_issues((*issue, "") for issue in issues), 1)
+
+                changed = [make_issue(rng, number, next_pr) for number in rng.sample(range(1, count + 1), args.changed)]
+                relink_time, _ = timed(lambda: graph.link_issues((*issue, "") for issue in changed), 1)
+                new_pr = {"number": next_pr[0], "url": "https://github.com/python/cpython/pull/new",
+                          "authors": [AUTHORS[0]], "status": "open", "created": START}
+                link_time, _ = timed(lambda: graph.link_pr(1, new_pr), 1)
+                for number, date, prs in changed:
+                    issues[number - 1] = (number, date, prs)
+                issues[0][2].append(new_pr)
+                cells = linked_prs_columns(issues)
+
+                pr_counts, issue_counts = recount(cells)
+                pr_statistics = graph.statistics()
+                consistent = (pr_statistics["prs_per_author"] == dict(pr_counts)
+                              and pr_statistics["issues_per_author"] == dict(issue_counts))
+                print(f"\n--- {count} issues, {pr_statistics['unique']} PRs, {pr_statistics['authors']} authors: "
+                      f"build {build_time:.2f}s, relink one issue {relink_time / len(changed) * 1000:.2f} ms, "
+                      f"link one PR {link_time * 1000:.2f} ms, matches the recount: {consistent} ---")
+
+                shared_pr = max(issues, key=lambda issue: len(issue[2]))[2][0]
+                queries = [
+                    ("author counts", lambda: graph.author(AUTHORS[1]), lambda: recount(cells)[0][AUTHORS[1]]),
+                    ("top 10 by issues", lambda: graph.top_authors("issues"),
+                     lambda: recount(cells)[1].most_common(10)),
+                    ("issues of a PR", lambda: graph.issues_of_pr(pr_key(shared_pr)),
+                     lambda: issues_of_pr_scan(cells, shared_pr["url"])),
+                    ("median first PR", lambda: graph.first_pr_statistics()["median"],
+                     lambda: recount_first_pr(cells, filed)),
+                ]
+                print(f"{'question':<18} {'graph ms':>9} {'recount ms':>11} {'speedup':>8}")
+                for label, from_graph, from_text in queries:
+                    graph_time, _ = timed(from_graph, args.repeat)
+                    text_time, _ = timed(from_text, max(1, args.repeat // 4))
+                    print(f"{label:<18} {graph_time * 1000:>9.3f} {text_time * 1000:>11.2f} "
+                          f"{text_time / graph_time:>7.0f}x")
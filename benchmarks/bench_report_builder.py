@@ -0,0 +1,81 @@
+import os
+import sys
+import argparse
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from issue_dataset import SCHEMA, build_dataset, row_hash
+from report_builder import ReportBuilder
+
+# Full report rebuild against incremental rebuilds (nothing changed, one issue closed) for
+# datasets made by repeating the shipped findings with fresh issue numbers.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def inflate_dataset(source_file, path, count):
+    rows = feather.read_table(source_file).to_pylist()
+    inflated = []
+    for number in range(count):
+        row = dict(rows[number % len(rows)])
+        row["Issue #"] = 200000 + number
+        row["Finding"] = number + 1
+        row["Row Hash"] = row_hash(row)
+        inflated.append(row)
+    write_rows(path, inflated)
+    return inflated
+
+
+def write_rows(path, rows):
+    feather.write_feather(pa.Table.from_pylist(rows, schema=SCHEMA), path, compression="uncompressed")
+
+
+def timed_build(template_file, output_file, dataset_file, cache_file):
+    builder = ReportBuilder(template_file, output_file, dataset_file, cache_file)
+    start = time.perf_counter()
+    builder.build()
+    return time.perf_counter() - start, builder.rendered_units
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark incremental report rendering.")
+    parser.add_argument("--findings", type=int, nargs="+", default=[52, 1000, 5000])
+    args = parser.parse_args()
+
+    template_file = os.path.join(ROOT, "cpython_report.template.md")
+    print(f"{'findings':>8} {'full ms':>8} {'no-op ms':>9} {'one change ms':>14} {'speedup':>8} {'units redrawn':>14}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source_file = os.path.join(tmp_dir, "source.arrow")
+        build_dataset(source_file, os.path.join(ROOT, "cpython_fusil_issues.csv"),
+                      os.path.join(ROOT, "cpython_fusil_report.csv"), os.path.join(ROOT, "cpython_report.curated.md"))
+        for count in args.findings:
+            dataset_file = os.path.join(tmp_dir, f"issues_{count}.arrow")
+            output_file = os.path.join(tmp_dir, f"report_{count}.md")
+            cache_file = output_file + ".build.json"
+            rows = inflate_dataset(source_file, dataset_file, count)
+
+            full_time, _ = timed_build(template_file, output_file, dataset_file, cache_file)
+            noop_time, _ = timed_build(template_file, output_file, dataset_file, cache_file)
+
+            # Close one open issue, as a sync from GitHub would
+            changed = next(row for row in rows if row["Status"] == "open")
+            changed.update({"Status": "closed", "Report Status": "Closed-Completed",
+                            "Closed Date": changed["Date Filed"]})
+            changed["Row Hash"] = row_hash(changed)
+            write_rows(dataset_file, rows)
+            change_time, redrawn = timed_build(template_file, output_file, dataset_file, cache_file)
+
+            with open(output_file, 'r', encoding='utf-8') as f:
+                incremental_report = f.read()
+            os.remove(cache_file)
+            timed_build(template_file, output_file, dataset_file, cache_file)
+            with open(output_file, 'r', encoding='utf-8') as f:
+                assert f.read() == incremental_report, "incremental and full builds differ"
+
+            print(f"{count:>8} {full_time * 1000:>8.1f} {noop_time * 1000:>9.1f} {change_time * 1000:>14.1f} "
+                  f"{full_time / change_time:>7.1f}x {redrawn:>14}")
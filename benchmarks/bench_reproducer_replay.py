@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reproducer_replay import ResultCache, clean_reproducer, replay
+
+# Replaying synthetic reproducers (one of each outcome the harness tells apart, slow ones
+# included) with the running interpreter: wall time with 1 worker and with --workers, and
+# again from the result cache. The outcomes are checked against the expected ones.
+
+REPRODUCERS = [  # (expected outcome, source)
+    ("clean exit", "import json\njson.dumps(list(range(1000)))\n"),
+    ("segfault", "import ctypes\nctypes.string_at(0)\n"),
+    ("abort", "import os\nos.abort()\n"),
+    ("SystemError", "raise SystemError('error return without exception set')\n"),
+    ("exception", "import _io\n_io.BytesIO().getbuffer().release(1)\n"),
+    ("clean exit", "import time\ntime.sleep(0.3)\n"),  # A slow reproducer: threads racing for a while
+    ("timeout", "while True:\n    pass\n"),
+    ("abort", clean_reproducer('$ ./python -c "import os; os.abort()"')),  # A shell one-liner, as filed
+    ("unrunnable", "print('never closed'\n"),
+]
+
+
+def make_reproducers(count):
+    """[(issue, expected outcome, source)]; a comment makes every source (and its cache key) distinct."""
+    reproducers = []
+    for number in range(count):
+        expected, source = REPRODUCERS[number % len(REPRODUCERS)]
+        reproducers.append((number, expected, source + f"# {number}\n"))
+    return reproducers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the reproducer replay harness.")
+    parser.add_argument("--reproducers", type=int, default=28)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--timeout", type=float, default=2.0,
+                        help="Too short and slow reproducers time out when the workers outnumber the CPUs.")
+    args = parser.parse_args()
+
+    reproducers = make_reproducers(args.reproducers)
+    builds = [("python", os.path.realpath(sys.executable))]
+    print(f"\n--- {len(reproducers)} reproducers, timeout {args.timeout:g}s, {os.cpu_count()} CPUs ---")
+    print(f"{'workers':>8} {'cache':>6} {'runs':>5} {'seconds':>8}  outcomes")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_file = os.path.join(tmp_dir, "results.cache.json")
+            for cache_state in ("cold", "warm"):
+                start = time.perf_counter()
+                results, runs = replay(reproducers, builds, workers, args.timeout, cache=ResultCache(cache_file))
+                elapsed = time.perf_counter() - start
+                wrong = [(issue, expected, results[issue, "python"]["outcome"]) for issue, expected, _ in reproducers
+                         if results[issue, "python"]["outcome"] != expected]
+                if wrong:
+                    raise RuntimeError(f"unexpected outcomes (issue, expected, got): {wrong}")
+                outcomes = Counter(result["outcome"] for result in results.values())
+                print(f"{workers:>8} {cache_state:>6} {runs:>5} {elapsed:>8.3f}  "
+                      f"{', '.join(f'{outcome} {count}' for outcome, count in sorted(outcomes.items()))}")
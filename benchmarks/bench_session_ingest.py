@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtrace_index import parse_backtrace
+from issue_classifier import classify
+from session_ingest import _ERROR_MESSAGE, SOURCE_FILE, ingest, scan_session, write_triage
+
+# Ingesting synthetic fusil session trees: a first run scanning every session (serially and
+# in a process pool), a rerun with nothing changed (the walk alone), a rerun after a few
+# sessions changed, and the time to read and regex every log whole, as a baseline for the
+# mmap scan. Each tree has ten instance directories of sessions made of a source.py and a
+# stdout with a few KB of output (one in a hundred several hundred KB) ending in a crash.
+
+CRASHES = [  # (session name words, crash output); {n} differs between hits of the same crash
+    ("gc-assertion-abort", "python: Objects/{file}.c:{line}: {function}: Assertion `op->ob_refcnt > 0' failed.\n"
+                           "Fatal Python error: Aborted\n\nCurrent thread 0x00007f{n:08x} (most recent call first):\n"
+                           "  File \"/tmp/source.py\", line {line} in func_{n}\n"),
+    ("systemerror", "Traceback (most recent call last):\n  File \"/tmp/source.py\", line {line}\n"
+                    "SystemError: <built-in function {function}> returned NULL without setting an exception\n"),
+    ("asan", "=={n}==ERROR: AddressSanitizer: heap-use-after-free on address 0x60200000{n:04x}\n"
+             "    #0 0x55555{n:06x} in {function} /src/cpython/Objects/{file}.c:{line}:5\n"
+             "    #1 0x55555{n:06x} in {function}_impl /src/cpython/Objects/{file}.c:{line}:12\n"
+             "    #2 0x55555{n:06x} in _PyEval_EvalFrameDefault /src/cpython/Python/ceval.c:1000:7\n"),
+    ("segfault", "Fatal Python error: Segmentation fault\n\nCurrent thread 0x00007f{n:08x} (most recent call first):\n"
+                 "  File \"/tmp/source.py\", line {line} in func_{n}\n"),
+]
+FUNCTIONS = [(f"{prefix}_{name}", prefix) for prefix in ("dict", "list", "unicode", "bytes", "set", "type")
+             for name in ("resize", "ass_slice", "richcompare", "dealloc", "repr", "hash", "iter", "getattro")]
+FILLER = "fuzzing call {n}: <function {function} at 0x7f{n:08x}> raised TypeError('bad argument type')\n"
+
+
+def make_session(path, rng, number, crash):
+    function, file = rng.choice(FUNCTIONS)
+    os.makedirs(path)
+    with open(os.path.join(path, SOURCE_FILE), 'w') as f:
+        f.write(f"import {file}\n" + "obj = None\n" * 200)
+    lines = rng.choice([50, 100, 200]) if rng.random() > 0.01 else 5000
+    with open(os.path.join(path, "stdout"), 'w') as f:
+        f.write("".join(FILLER.format(n=n, function=function) for n in range(lines)))
+        f.write(crash.format(n=number, function=function, file=file, line=rng.randint(100, 5000) // 100 * 100))
+
+
+def make_tree(root, count, seed):
+    rng = random.Random(seed)
+    paths = []
+    for number in range(count):
+        words, crash = rng.choice(CRASHES)
+        path = os.path.join(root, f"python-{number % 10}", f"{words}-{number}")
+        make_session(path, rng, number, crash)
+        paths.append(path)
+    return paths
+
+
+def read_whole(paths):
+    """The same extraction as scan_session(), run on every log read whole instead of on a mmap window."""
+    for path in paths:
+        with open(os.path.join(path, "stdout"), encoding="utf-8") as f:
+            text = f.read()
+        _ERROR_MESSAGE.search(text)
+        parse_backtrace(text)
+        classify(os.path.basename(path).replace("-", " "), [], text)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion of fusil session directories.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--changed", type=float, default=0.01, help="Share of sessions changed before a rerun.")
+    args = parser.parse_args()
+
+    for count in args.sessions:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            root = os.path.join(tmp_dir, "fusil")
+            paths = make_tree(root, count, seed=count)
+            size = sum(os.path.getsize(os.path.join(path, "stdout")) for path in paths)
+            print(f"\n--- {count} sessions, {size / 2 ** 20:.0f} MB of logs, {args.workers} workers ---")
+            for workers in sorted({1, args.workers}):
+                state = os.path.join(tmp_dir, f"state-{workers}.sqlite3")
+                seconds, (_, scanned, _) = timed(ingest, [root], state, workers)
+                print(f"first run, {workers} workers:{'':<6} {seconds:>7.2f}s  {count / seconds:>8.0f} sessions/s")
+            seconds, (_, scanned, _) = timed(ingest, [root], state, args.workers)
+            print(f"rerun, nothing changed:{'':<4} {seconds:>7.2f}s  ({scanned} scanned)")
+            rng = random.Random(0)
+            for path in rng.sample(paths, int(count * args.changed)):
+                with open(os.path.join(path, "stdout"), 'a') as f:
+                    f.write("Segmentation fault\n")
+            seconds, (_, scanned, _) = timed(ingest, [root], state, args.workers)
+            print(f"rerun, {args.changed:.0%} changed:{'':<9} {seconds:>7.2f}s  ({scanned} scanned)")
+            seconds, _ = timed(lambda: [scan_session(path) for path in paths])
+            print(f"mmap scan of every session: {seconds:>7.2f}s")
+            seconds, _ = timed(read_whole, paths)
+            print(f"same, reading logs whole:   {seconds:>7.2f}s")
+            rows = write_triage(state, os.path.join(tmp_dir, "triage.csv"), crash_index_file=None)
+            print(f"{len(rows)} buckets, the largest with {rows[0]['Hits']} hits: "
+                  f"{rows[0]['Top Frames'] or rows[0]['Error Message']}")
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import filecmp
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gather_issue_data
+from fake_github_server import FakeGitHubServer, make_synthetic_issues
+
+# Compares serial and concurrent timeline fetching against the local fake GitHub server.
+# Each response is delayed by --latency seconds, so the run time is dominated by round-trips
+# just like against api.github.com. The CSVs written by both modes must be byte-identical.
+
+
+def run_collector(server_url, workers, output_csv_file):
+    gather_issue_data.GITHUB_TOKEN = gather_issue_data.GITHUB_TOKEN or "dummy-token"
+    gather_issue_data.GITHUB_API_URL = server_url
+    start = time.perf_counter()
+    # Lift the request scheduler's pacing so only latency and concurrency are measured
+    gather_issue_data.fetch_github_issues(workers=workers, output_csv_file=output_csv_file,
+                                          core_rate=10000, search_rate=10000)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serial vs concurrent timeline fetching.")
+    parser.add_argument("--issues", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    issues = make_synthetic_issues(args.issues)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir, FakeGitHubServer(issues, latency=args.latency) as server:
+        reference_csv = None
+        for workers in args.workers:
+            output_csv_file = os.path.join(tmp_dir, f"issues_{workers}.csv")
+            requests_before = server.request_count
+            elapsed = run_collector(server.url, workers, output_csv_file)
+            same_output = True
+            if reference_csv is None:
+                reference_csv = output_csv_file
+            else:
+                same_output = filecmp.cmp(reference_csv, output_csv_file, shallow=False)
+            results.append((workers, elapsed, server.request_count - requests_before, same_output))
+
+    baseline = results[0][1]
+    print(f"\n--- Timeline fetching: {args.issues} issues, {args.latency * 1000:.0f} ms latency ---")
+    print(f"{'workers':>8} {'seconds':>9} {'requests':>9} {'speedup':>8}  identical CSV")
+    for workers, elapsed, request_count, same_output in results:
+        print(f"{workers:>8} {elapsed:>9.2f} {request_count:>9} {baseline / elapsed:>7.1f}x  {same_output}")
@@ -0,0 +1,153 @@
+import re
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from issue_classifier import KIND_RULES, classify, label_facts
+
+# Vectorized version of issue_classifier.classify() for whole DataFrames of issues.
+# Titles and bodies are matched with one `.str.contains` per kind. Labels are split,
+# exploded and turned into categorical codes; each distinct label is analysed once through
+# label_facts(), and the per-label results are gathered with numpy indexing and reduced per
+# row (min for the kind, bitmasks for the version and configuration sets). The output is
+# identical to calling classify() row by row (see classify_dataframe_rowwise() and the
+# benchmark).
+
+TITLE_COLUMN = "Title"
+LABELS_COLUMN = "Labels"
+BODY_COLUMNS = ["Body", "Body Snippet (MRE/Backtrace hint)"]  # First one present is used
+OUTPUT_COLUMNS = ["Guessed Kind", "Guessed CPython Versions", "Guessed Configurations"]
+NO_KIND = len(KIND_RULES)
+KIND_NAMES = np.array([rule["kind"] for rule in KIND_RULES] + [""], dtype=object)
+
+
+def split_labels(labels):
+    """The label list a 'Labels' cell stands for: ';'-separated, empty or missing means none."""
+    return labels.split(";") if isinstance(labels, str) and labels else []
+
+
+def _body_column(df):
+    for column in BODY_COLUMNS:
+        if column in df.columns:
+            return column
+    return None
+
+
+def _text_kind(texts, source):
+    """Best (lowest) kind index whose `source` rules match each text, NO_KIND if none."""
+    result = np.full(len(texts), NO_KIND, dtype=np.int64)
+    # Lowest priority first, so higher-priority kinds overwrite it
+    for index in reversed(range(len(KIND_RULES))):
+        patterns = KIND_RULES[index][source]
+        if source == "title":
+            patterns = [re.escape(keyword) for keyword in patterns]
+        mask = texts.str.contains("|".join(patterns), regex=True).to_numpy(dtype=bool)
+        result[mask] = index
+    return result
+
+
+def _join_label_values(rows, label_codes, value_per_label, row_count):
+    """
+    ';'-joins the sorted distinct values contributed by each row's labels.
+
+    `rows` and `label_codes` describe the exploded (row, label) pairs, `value_per_label` is
+    the value (or None) of each distinct label. Each row's set of values is encoded as a
+    bitmask over the few distinct values, so the string joining happens once per distinct
+    combination instead of once per row.
+    """
+    joined = np.full(row_count, "", dtype=object)
+    vocabulary = sorted({value for value in value_per_label if value is not None})
+    if not vocabulary:
+        return joined
+    if len(vocabulary) > 62:  # Too many distinct values for an int64 bitmask
+        values = np.array(list(value_per_label) + [None], dtype=object)[label_codes]
+        distinct = pd.DataFrame({"row": rows, "value": values}).dropna().drop_duplicates()
+        per_row = distinct.sort_values(["row", "value"]).groupby("row")["value"].agg(";".join)
+        joined[per_row.index.to_numpy()] = per_row.to_numpy()
+        return joined
+
+    position = {value: index for index, value in enumerate(vocabulary)}
+    # The extra trailing 0 is for label code -1 (a row without labels)
+    bit_per_label = np.array([0 if value is None else 1 << position[value] for value in value_per_label] + [0],
+                             dtype=np.int64)
+    masks = np.zeros(row_count, dtype=np.int64)
+    np.bitwise_or.at(masks, rows, bit_per_label[label_codes])
+    unique_masks, inverse = np.unique(masks, return_inverse=True)
+    combinations = np.array(
+        [";".join(value for index, value in enumerate(vocabulary) if mask >> index & 1)
+         for mask in unique_masks.tolist()],
+        dtype=object,
+    )
+    return combinations[inverse.reshape(-1)]
+
+
+def classify_dataframe(df, title_column=TITLE_COLUMN, labels_column=LABELS_COLUMN, body_column=None):
+    """
+    Returns a copy of `df` with 'Guessed Kind', 'Guessed CPython Versions' and
+    'Guessed Configurations' filled from its title, labels and (optional) body columns.
+    """
+    body_column = body_column or _body_column(df)
+    row_count = len(df)
+    titles = df[title_column].fillna("").astype(str).str.lower().reset_index(drop=True)
+
+    # Labels: one entry per (issue, label), as integer codes into the distinct labels, so each
+    # distinct label is analysed only once. An empty 'Labels' cell explodes to the label "",
+    # which contributes nothing, exactly like an empty label list.
+    exploded = df[labels_column].fillna("").astype(str).reset_index(drop=True).str.split(";").explode()
+    rows = exploded.index.to_numpy()
+    labels = pd.Categorical(exploded.to_numpy(dtype=object))
+    label_codes = labels.codes
+    facts = [label_facts(label) for label in labels.categories]
+
+    kind_per_label = np.array([fact[0] for fact in facts] + [NO_KIND], dtype=np.int64)
+    label_kind = np.full(row_count, NO_KIND, dtype=np.int64)
+    np.minimum.at(label_kind, rows, kind_per_label[label_codes])
+
+    kind = np.minimum(_text_kind(titles, "title"), label_kind)
+
+    # Body rules only decide issues that title and labels left unclassified
+    if body_column is not None:
+        undecided = np.flatnonzero(kind == NO_KIND)
+        if len(undecided):
+            bodies = df[body_column].iloc[undecided].fillna("").astype(str).str.lower().str.replace(
+                "\\n", "\n", regex=False)  # Unescape CSV snippets, as classify() does
+            kind[undecided] = _text_kind(bodies.reset_index(drop=True), "body")
+
+    result = df.copy()
+    result["Guessed Kind"] = KIND_NAMES[kind]
+    result["Guessed CPython Versions"] = _join_label_values(
+        rows, label_codes, [fact[1] for fact in facts], row_count)
+    result["Guessed Configurations"] = _join_label_values(
+        rows, label_codes, [fact[2] for fact in facts], row_count)
+    return result
+
+
+def classify_dataframe_rowwise(df, title_column=TITLE_COLUMN, labels_column=LABELS_COLUMN, body_column=None):
+    """Reference implementation calling the scalar classify() on every row."""
+    body_column = body_column or _body_column(df)
+    bodies = df[body_column].fillna("") if body_column else [""] * len(df)
+    rows = [
+        classify(title if isinstance(title, str) else "", split_labels(labels), body)
+        for title, labels, body in zip(df[title_column], df[labels_column], bodies)
+    ]
+    result = df.copy()
+    for position, column in enumerate(OUTPUT_COLUMNS):
+        result[column] = [row[position] for row in rows]
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run the issue classifier over a CSV export of issues.")
+    parser.add_argument("input_csv", help="CSV with Title and Labels columns (and optionally a body column).")
+    parser.add_argument("--output", help="Where to write the reclassified CSV (default: overwrite input).")
+    parser.add_argument("--sep", default=",", help="Field separator of the input CSV (default: ',').")
+    args = parser.parse_args()
+
+    df_issues = pd.read_csv(args.input_csv, sep=args.sep, dtype=str, keep_default_na=False)
+    df_classified = classify_dataframe(df_issues)
+    changed = (df_classified[OUTPUT_COLUMNS] != df_issues.reindex(columns=OUTPUT_COLUMNS).fillna("")).any(axis=1)
+    output_path = args.output or args.input_csv
+    df_classified.to_csv(output_path, sep=args.sep, index=False)
+    print(f"Classified {len(df_classified)} issues ({int(changed.sum())} changed), saved to '{output_path}'")
+    print(df_classified["Guessed Kind"].replace("", "Unknown").value_counts())
@@ -0,0 +1,272 @@
+import os
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from issue_dataset import DATASET_FILE, load_issues
+from issue_stats import STATISTICS_COLUMNS, compute_statistics
+from issue_timeline import bucket_counts
+
+# Builds every chart of the report from the issue dataset.
+#
+# Figures are declared in FIGURES: the output file, the chart type ("bar" or "pie"), its
+# titles and style, and a `data` function that reduces the dataset to what gets drawn
+# (labels, bar series, line series or pie values). The data functions run in this process
+# over a single load of the dataset; the drawing happens in a pool of worker processes that
+# import matplotlib (Agg backend) once each, instead of once per script.
+#
+# Each figure's hash covers its spec and its reduced data, and the build cache keeps the hash
+# of every file drawn. A rebuild only redraws the figures whose hash changed (or whose file is
+# missing): closing an issue redraws the status and closed-issue charts, but not the ones
+# about kinds or configurations.
+
+CACHE_FILE = "charts.cache.json"
+CHART_COLUMNS = ['Date Filed', 'Closed Date']
+# Bump when the drawing code changes, to redraw every figure
+RENDERER_VERSION = 1
+
+
+def week_tick_labels(df_counts):
+    """"W44\n'24" for each week of bucket_counts(..., "week"), with the week's ISO year."""
+    return [f"W{label[6:]}\n'{label[2:4]}" for label in df_counts['Label']]
+
+
+def _ints(values):
+    return [int(value) for value in values]
+
+
+def created_by_week(df_issues, statistics):
+    weeks = bucket_counts(df_issues, "week")
+    return {"labels": week_tick_labels(weeks), "series": {"Issues": _ints(weeks['Created'])}}
+
+
+def closed_by_week(df_issues, statistics):
+    weeks = bucket_counts(df_issues, "week")
+    return {"labels": week_tick_labels(weeks), "series": {"Closed Issues": _ints(weeks['Closed'])}}
+
+
+def created_and_closed_by_week(df_issues, statistics):
+    weeks = bucket_counts(df_issues, "week")
+    return {"labels": week_tick_labels(weeks),
+            "series": {"Issues Created": _ints(weeks['Created']), "Issues Closed": _ints(weeks['Closed'])}}
+
+
+def days_to_close_histogram(df_issues, statistics, bin_width=5):
+    closed = df_issues[(df_issues['Status'] == 'closed') & df_issues['Date Filed'].notna()
+                       & df_issues['Closed Date'].notna()]
+    days = (closed['Closed Date'] - closed['Date Filed']).dt.days.to_numpy()
+    counts = np.bincount(days // bin_width) if len(days) else np.array([], dtype=int)
+    return {"labels": [str(start * bin_width) for start in range(len(counts))],
+            "series": {"Number of Issues": _ints(counts)}}
+
+
+def filed_per_day(df_issues, statistics, window=4):
+    days = bucket_counts(df_issues, "day")
+    days = days[days['Period'] <= df_issues['Date Filed'].max()]  # Up to the last filing
+    average = days['Created'].rolling(window).mean()
+    return {"labels": list(days['Label']),
+            "series": {"Number of Issues": _ints(days['Created'])},
+            "lines": {f"{window}-day average": [None if pd.isna(value) else round(float(value), 4)
+                                                for value in average]}}
+
+
+def _counts(key):
+    def counts(df_issues, statistics):
+        ordered = sorted(statistics[key].items(), key=lambda item: -item[1])
+        return {"labels": [label for label, _ in ordered], "values": [count for _, count in ordered]}
+    counts.__name__ = f"counts_{key}"
+    return counts
+
+
+FIGURES = [
+    {"file": "issues_by_week.png", "chart": "bar", "data": created_by_week,
+     "title": "Issues by Week Number", "xlabel": "Week Number", "ylabel": "Issues",
+     "colors": ["#ed7d31"], "figsize": (10.5, 6.5), "tick_fontsize": 8},
+    {"file": "closed_issues_by_week.png", "chart": "bar", "data": closed_by_week,
+     "title": "Closed Issues versus Week Number", "xlabel": "Week Number", "ylabel": "Closed Issues",
+     "colors": ["#4285f4"], "figsize": (8.5, 5.2), "tick_fontsize": 7, "legend": False},
+    {"file": "issues_created_closed_by_week.png", "chart": "bar", "data": created_and_closed_by_week,
+     "title": "Issues Created and Closed per Week", "xlabel": "Week Number", "ylabel": "Issues",
+     "colors": ["#4285f4", "#ea4335"], "figsize": (10, 6.1), "tick_fontsize": 8},
+    {"file": "issues_created_closed_per_week_plot.png", "chart": "bar", "data": created_and_closed_by_week,
+     "title": "Issues Created and Closed per Week", "xlabel": "Week Number (Year)", "ylabel": "Number of Issues",
+     "colors": ["royalblue", "salmon"], "figsize": (14, 7), "integer_ticks": True},
+    {"file": "days_to_close_issue.png", "chart": "bar", "data": days_to_close_histogram,
+     "title": "Days to Close an Issue", "xlabel": "Days to Close", "ylabel": "Number of Issues",
+     "colors": ["#4285f4"], "figsize": (9, 5.5), "rotation": 90, "legend": False, "bar_width": 1.0},
+    {"file": "issues_filed_per_day.png", "chart": "bar", "data": filed_per_day,
+     "title": "Number of Issues Filed per Date", "xlabel": "Date Filed", "ylabel": "Number of Issues",
+     "colors": ["#999999"], "line_colors": ["blue"], "figsize": (9, 5.5), "rotation": 90, "tick_step": 6},
+    {"file": "issues_by_status.png", "chart": "pie", "data": _counts("by_status"),
+     "title": "Issues by Status", "colors": ["#6d9eeb", "red"], "figsize": (8.5, 5.2)},
+    {"file": "issues_per_status.png", "chart": "pie", "data": _counts("by_report_status"),
+     "title": "Issues per Status", "colors": ["#ea4335", "#4285f4", "#fbbc04", "#34a853"], "figsize": (6, 3.7)},
+    {"file": "issues_per_kind.png", "chart": "pie", "data": _counts("by_kind"),
+     "title": "Issues per Kind", "colors": ["#ea4335", "#4285f4", "#fbbc04", "#34a853"], "figsize": (6, 3.7)},
+    {"file": "issues_per_configuration.png", "chart": "pie", "data": _counts("by_configuration"),
+     "title": "Issues per Configuration", "colors": ["#4285f4", "#ea4335", "#fbbc04", "#34a853", "#ff6d01"],
+     "figsize": (6, 3.7)},
+]
+
+
+def figure_spec(figure):
+    """The declaration of a figure without its data function, as sent to the workers."""
+    return {key: value for key, value in figure.items() if key != "data"}
+
+
+def figure_hash(figure, data):
+    spec = dict(figure_spec(figure), data=figure["data"].__name__)
+    payload = json.dumps([RENDERER_VERSION, spec, data], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401  Imported once per worker, not once per figure
+
+
+def render_figure(spec, data, path):
+    """Draws one figure to `path` (run in a worker process)."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=spec.get("figsize", (10, 6)))
+    colors = spec.get("colors")
+    if spec["chart"] == "pie":
+        values = data["values"]
+        total = sum(values)
+        ax.pie(values, colors=colors[:len(values)] if colors else None, startangle=90, counterclock=False,
+               autopct=lambda pct: f"{round(pct * total / 100)} ({pct:.1f}%)",
+               textprops={"fontweight": "bold"})
+        ax.legend(data["labels"], loc="center left", bbox_to_anchor=(1, 0.5), frameon=False)
+        ax.axis("equal")
+    else:
+        labels = data["labels"]
+        index = np.arange(len(labels))
+        series = data["series"]
+        width = spec.get("bar_width", 0.7) / len(series)
+        for number, (label, values) in enumerate(series.items()):
+            offset = (number - (len(series) - 1) / 2) * width
+            ax.bar(index + offset, values, width, label=label, color=colors[number] if colors else None,
+                   edgecolor="black", linewidth=0.5)
+        for number, (label, values) in enumerate(data.get("lines", {}).items()):
+            line_colors = spec.get("line_colors")
+            ax.plot(index, [np.nan if value is None else value for value in values], label=label,
+                    color=line_colors[number] if line_colors else None, linewidth=2)
+        step = spec.get("tick_step", 1)
+        ax.set_xticks(index[::step])
+        # Two-line week labels ("W44\n'24") stay horizontal: rotated, they overlap
+        ax.set_xticklabels(labels[::step], rotation=spec.get("rotation", 0), fontsize=spec.get("tick_fontsize"),
+                           ha="right" if spec.get("rotation", 0) == 45 else "center")
+        ax.set_xlabel(spec.get("xlabel", ""), fontweight="bold")
+        ax.set_ylabel(spec.get("ylabel", ""), fontweight="bold")
+        ax.set_ylim(bottom=0)
+        if spec.get("integer_ticks"):
+            top = max([10] + [max(values, default=0) for values in series.values()])
+            ax.set_yticks(np.arange(0, top + 1, 1))
+            ax.set_ylim(top=top + 0.5)
+        ax.grid(axis="y", color="#dddddd")
+        ax.set_axisbelow(True)
+        for side in ("top", "right"):
+            ax.spines[side].set_visible(False)
+        if spec.get("legend", True):
+            ax.legend(loc="upper center", ncol=len(series) + len(data.get("lines", {})), frameon=False)
+    ax.set_title(spec.get("title", ""), fontsize=14, fontweight="bold")
+    fig.tight_layout()
+    tmp_file = path + ".tmp"
+    fig.savefig(tmp_file, format="png")
+    plt.close(fig)
+    os.replace(tmp_file, path)
+    return path
+
+
+class ChartBuilder:
+    """Draws the figures whose data or spec changed since the last build."""
+
+    def __init__(self, figures=None, output_dir=".", dataset_file=DATASET_FILE, cache_file=CACHE_FILE,
+                 workers=None, full=False):
+        self.figures = FIGURES if figures is None else figures
+        self.full = full  # Redraw self.figures even if unchanged; other figures keep their cache entries
+        self.output_dir = output_dir
+        self.dataset_file = dataset_file
+        self.cache_file = cache_file
+        self.workers = workers
+        self.drawn = []
+        self.skipped = []
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self, hashes):
+        tmp_file = self.cache_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(hashes, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.cache_file)
+
+    def build(self):
+        """Draws the figures that need it; returns the paths drawn."""
+        df_issues = load_issues(columns=sorted(set(CHART_COLUMNS + STATISTICS_COLUMNS)), dataset_file=self.dataset_file)
+        statistics = compute_statistics(df_issues)
+        df_issues['Status'] = df_issues['Status'].astype(object).str.lower()
+
+        previous = self._load_cache()
+        hashes = dict(previous)  # Keeps the figures not built this time
+        if self.full:
+            previous = {}
+        pending = []  # (spec, data, path)
+        with instrumentation.stage("chart data"):
+            for figure in self.figures:
+                data = figure["data"](df_issues, statistics)
+                path = os.path.join(self.output_dir, figure["file"])
+                hashes[figure["file"]] = figure_hash(figure, data)
+                if previous.get(figure["file"]) == hashes[figure["file"]] and os.path.exists(path):
+                    self.skipped.append(path)
+                else:
+                    pending.append((figure_spec(figure), data, path))
+
+        workers = min(len(pending), self.workers or os.cpu_count() or 1)
+        with instrumentation.stage("draw"):  # Worker processes show in children_peak_rss_kb
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+                    self.drawn = list(executor.map(render_figure, *zip(*pending)))
+            else:  # Not worth starting a pool
+                self.drawn = [render_figure(*arguments) for arguments in pending]
+            instrumentation.count(figures=len(self.drawn))
+        self._save_cache(hashes)
+        return self.drawn
+
+
+def build_charts(output_dir=".", dataset_file=DATASET_FILE, cache_file=CACHE_FILE, workers=None, only=None, full=False):
+    figures = [figure for figure in FIGURES if not only or figure["file"] in only]
+    builder = ChartBuilder(figures, output_dir, dataset_file, cache_file, workers, full)
+    builder.build()
+    return builder
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Draw the report's charts from the issue dataset.")
+    parser.add_argument("files", nargs="*", help="Only draw these figures (default: all).")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--dataset", default=DATASET_FILE)
+    parser.add_argument("--cache", default=CACHE_FILE)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU).")
+    parser.add_argument("--full", action="store_true", help="Ignore the cache and redraw the figures.")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.session(args, "chart_builder"):
+        chart_builder = build_charts(args.output_dir, args.dataset, args.cache, args.workers, args.files, args.full)
+    for drawn_file in chart_builder.drawn:
+        print(f"Drew '{drawn_file}'")
+    print(f"{len(chart_builder.drawn)} figures drawn, {len(chart_builder.skipped)} unchanged.")
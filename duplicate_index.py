@@ -0,0 +1,312 @@
+import re
+import os
+import sys
+import csv
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import argparse
+
+import numpy as np
+
+# Near-duplicate detection over issue titles, reproducers and error messages.
+#
+# Fusil finds the same bug through many doors: "`_lsprof.Profiler._creturn_callback()`
+# segfaults" and its `_ccall_callback` twin, or one "SystemError: ... returned a result with
+# an exception set" per function. Each issue is turned into a set of shingles (single words
+# and pairs of consecutive words) of its title, of the first code block of its body (the MRE)
+# and of its error lines, with addresses and numbers masked and punctuation and common words
+# left out. Identifiers are split at underscores and dots, so names that share most of their
+# parts still share shingles.
+#
+# A MinHash signature (NUM_PERMUTATIONS minimums of random hash permutations) estimates
+# the Jaccard similarity of two shingle sets: the fraction of equal positions. DuplicateIndex
+# keeps the signatures in SQLite with locality-sensitive hashing on top: a signature is cut
+# into BANDS bands, each hashed to a bucket, and issues sharing any bucket are the candidates
+# of a lookup. Known near-duplicates in our issues score 0.12-0.4 while unrelated pairs score
+# around 0.02, so the bands are tuned low: with 64 bands of 2 rows, a pair at 0.2 shares a
+# bucket 93% of the time and a pair at 0.02 only 2.5%. A query reads those few candidates
+# instead of comparing against every issue. Adding issues only writes their own rows, and
+# issues whose title and body didn't change are skipped.
+
+ISSUES_CSV_FILE = "cpython_fusil_issues.csv"
+INDEX_FILE = "duplicate_index.sqlite3"
+BODY_COLUMN = "Body Snippet (MRE/Backtrace hint)"
+NUM_PERMUTATIONS = 128
+BANDS = 64  # NUM_PERMUTATIONS / BANDS rows per band
+SHINGLE_SIZE = 2  # Shingles of 1 to SHINGLE_SIZE consecutive words
+COMMON_WORDS = frozenset("a an the in on of to with from for by and or is are when calling called call using "
+                         "build builds".split())
+INDEX_VERSION = 1  # Bump when shingling changes, so stored signatures are rebuilt
+TOP_K = 5
+
+_CODE_BLOCK = re.compile(r"```[\w+-]*\n(?P<code>.*?)(?:```|\Z)", re.S)
+_ERROR_LINE = re.compile(r"\b\w*(?:Error|Exception)\b:.*|Fatal Python error:.*|\bAssertion\b.*|"
+                         r"Segmentation fault.*|AddressSanitizer:.*")
+_MASKS = [
+    (re.compile(r"0x[0-9a-fA-F]+"), " addr "),
+    (re.compile(r"\d+"), " 0 "),
+    (re.compile(r"^\s*(?:>>>|\.\.\.|%|\$)\s?", re.M), ""),  # Interpreter and shell prompts
+]
+_WORD = re.compile(r"[a-z]+|0")
+
+_PRIME = 4294967291  # Largest prime below 2 ** 32: every hash value fits in uint32
+
+
+def _permutation_parameters(count=NUM_PERMUTATIONS):
+    """(a, b) of the hash permutations h(x) = (a * x + b) mod _PRIME, stable across runs and numpy versions."""
+    digests = [hashlib.sha1(f"minhash:{number}".encode()).digest() for number in range(count)]
+    a = np.array([int.from_bytes(digest[:4], "little") % (_PRIME - 1) + 1 for digest in digests], dtype=np.uint64)
+    b = np.array([int.from_bytes(digest[4:8], "little") % _PRIME for digest in digests], dtype=np.uint64)
+    return a[:, None], b[:, None]
+
+
+_A, _B = _permutation_parameters()
+
+
+def _unescape(text):
+    # CSV body snippets store newlines as '\n'
+    return text.replace("\\n", "\n") if "\\n" in text and "\n" not in text else text
+
+
+def words(text):
+    """Lowercase words of a text, with addresses and numbers masked and common words dropped."""
+    text = text.lower()
+    for regex, replacement in _MASKS:
+        text = regex.sub(replacement, text)
+    return [word for word in _WORD.findall(text) if word not in COMMON_WORDS]
+
+
+def issue_fields(title, body=""):
+    """The parts of an issue that are compared: {"title", "code", "error"} texts."""
+    body = _unescape(body or "")
+    code = _CODE_BLOCK.search(body)
+    errors = [match.group(0) for match in _ERROR_LINE.finditer(body)]
+    return {"title": title or "", "code": code.group("code") if code else "", "error": "\n".join(errors)}
+
+
+def shingles(fields):
+    """Set of 'field|word...' shingles of an issue's fields."""
+    result = set()
+    for field, text in fields.items():
+        field_words = words(text)
+        for size in range(1, SHINGLE_SIZE + 1):
+            for start in range(len(field_words) - size + 1):
+                result.add(f"{field}|{' '.join(field_words[start:start + size])}")
+    return result
+
+
+def minhash(shingle_set):
+    """MinHash signature (uint32 array of NUM_PERMUTATIONS) of a set of shingles."""
+    if not shingle_set:
+        return np.full(NUM_PERMUTATIONS, _PRIME, dtype=np.uint32)
+    values = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingle_set),
+                         dtype=np.uint64, count=len(shingle_set))
+    # a, b, x < 2 ** 32, so a * x + b fits in uint64
+    return ((_A * values + _B) % _PRIME).min(axis=1).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+def band_buckets(signature, bands=BANDS):
+    """One 63-bit bucket key per band of a signature."""
+    rows = len(signature) // bands
+    return [int.from_bytes(hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(),
+                                           digest_size=8).digest(), "little", signed=True)
+            for band in range(bands)]
+
+
+def content_hash(fields):
+    return hashlib.sha1(json.dumps(fields, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class DuplicateIndex:
+    """
+    On-disk MinHash/LSH index of issues.
+
+    Bucket lookups are SQLite primary-key reads, so similar() answers in about a millisecond
+    with thousands of issues, and add() only writes the rows of the issue it changes.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS issues (
+                issue INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                issue INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, issue)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS buckets_by_issue ON buckets (issue);
+        """)
+        parameters = json.dumps({"version": INDEX_VERSION, "permutations": NUM_PERMUTATIONS, "bands": BANDS})
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'parameters'").fetchone()
+        if stored is None or stored[0] != parameters:
+            with self.connection:  # Signatures from other parameters can't be compared: start over
+                self.connection.execute("DELETE FROM issues")
+                self.connection.execute("DELETE FROM buckets")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('parameters', ?)",
+                                        (parameters,))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _add(self, issue, title, body):
+        fields = issue_fields(title, body)
+        digest = content_hash(fields)
+        stored = self.connection.execute("SELECT content_hash FROM issues WHERE issue = ?", (issue,)).fetchone()
+        if stored is not None and stored[0] == digest:
+            return False
+        signature = minhash(shingles(fields))
+        self.connection.execute("DELETE FROM buckets WHERE issue = ?", (issue,))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO issues (issue, title, content_hash, signature) VALUES (?, ?, ?, ?)",
+            (issue, title, digest, signature.tobytes()),
+        )
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO buckets (band, bucket, issue) VALUES (?, ?, ?)",
+            [(band, bucket, issue) for band, bucket in enumerate(band_buckets(signature))],
+        )
+        return True
+
+    def add(self, issue, title, body=""):
+        """Indexes or updates one issue; returns False if it was already indexed unchanged."""
+        with self.connection:
+            return self._add(issue, title, body)
+
+    def add_many(self, issues):
+        """Indexes (issue, title, body) tuples in one transaction; returns how many were new or changed."""
+        with self.connection:
+            return sum(self._add(issue, title, body) for issue, title, body in issues)
+
+    def remove(self, issue):
+        with self.connection:
+            self.connection.execute("DELETE FROM issues WHERE issue = ?", (issue,))
+            self.connection.execute("DELETE FROM buckets WHERE issue = ?", (issue,))
+
+    def signature_of(self, issue):
+        row = self.connection.execute("SELECT signature FROM issues WHERE issue = ?", (issue,)).fetchone()
+        return np.frombuffer(row[0], dtype=np.uint32) if row else None
+
+    def similar_to_signature(self, signature, limit=TOP_K, exclude=None, min_similarity=0.0):
+        """[(issue, title, similarity)] of the most similar indexed issues among the LSH candidates."""
+        keys = [value for band_bucket in enumerate(band_buckets(signature)) for value in band_bucket]
+        rows = self.connection.execute(
+            f"WITH keys (band, bucket) AS (VALUES {','.join(['(?, ?)'] * BANDS)}) "
+            f"SELECT DISTINCT issues.issue, issues.title, issues.signature FROM keys "
+            f"JOIN buckets ON buckets.band = keys.band AND buckets.bucket = keys.bucket "
+            f"JOIN issues ON issues.issue = buckets.issue",
+            keys,
+        ).fetchall()
+        matches = []
+        for issue, title, stored in rows:
+            if issue == exclude:
+                continue
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= min_similarity:
+                matches.append((issue, title, score))
+        matches.sort(key=lambda match: (-match[2], match[0]))
+        return matches[:limit]
+
+    def similar(self, title, body="", limit=TOP_K, exclude=None, min_similarity=0.0):
+        """Most similar indexed issues to a new candidate (title and body text)."""
+        return self.similar_to_signature(minhash(shingles(issue_fields(title, body))), limit, exclude,
+                                         min_similarity)
+
+    def similar_to_issue(self, issue, limit=TOP_K, min_similarity=0.0):
+        """Most similar indexed issues to an indexed one."""
+        signature = self.signature_of(issue)
+        if signature is None:
+            raise KeyError(f"Issue #{issue} is not in the index")
+        return self.similar_to_signature(signature, limit, issue, min_similarity)
+
+    def stats(self):
+        issues = self.connection.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+        buckets = self.connection.execute("SELECT COUNT(DISTINCT band || ':' || bucket) FROM buckets").fetchone()[0]
+        return {"issues": issues, "buckets": buckets}
+
+
+def csv_issues(csv_path):
+    """Yields (issue number, title, body snippet) for the issues of a collector CSV."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield int(row["Issue #"]), row["Title"], row.get(BODY_COLUMN) or ""
+
+
+def update_index(index_path=INDEX_FILE, csv_files=(ISSUES_CSV_FILE,)):
+    """Adds new and changed issues of the CSVs to the index."""
+    with DuplicateIndex(index_path) as index:
+        seen = changed = 0
+        for path in csv_files:
+            if os.path.exists(path):
+                issues = list(csv_issues(path))
+                seen += len(issues)
+                changed += index.add_many(issues)
+        stats = index.stats()
+    print(f"Indexed {changed} new or changed issues of {seen} into '{index_path}' "
+          f"({stats['issues']} issues, {stats['buckets']} buckets).")
+
+
+def print_matches(matches):
+    if not matches:
+        print("No similar issues found.")
+    for issue, title, score in matches:
+        print(f"  {score:5.0%}  #{issue}: {title}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Near-duplicate detection over fusil issues (MinHash/LSH).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="Add new and changed issues of the CSVs to the index.")
+    update_parser.add_argument("--csv", nargs="*", default=[ISSUES_CSV_FILE])
+    query_parser = subparsers.add_parser("query", help="Find indexed issues similar to a new one.")
+    query_parser.add_argument("--title", help="Title of the candidate issue.")
+    query_parser.add_argument("body_file", nargs="?", help="File with the candidate's body (default: stdin).")
+    query_parser.add_argument("--issue", type=int, help="Compare an indexed issue instead of a new candidate.")
+    query_parser.add_argument("-k", "--top", type=int, default=TOP_K, help=f"Matches to show (default: {TOP_K}).")
+    query_parser.add_argument("--min-similarity", type=float, default=0.0)
+    parser.add_argument("--index", default=INDEX_FILE)
+    args = parser.parse_args()
+
+    if args.command == "update":
+        update_index(args.index, args.csv)
+    else:
+        if args.issue is None and args.title is None:
+            query_parser.error("give the candidate's --title (and body), or --issue")
+        with DuplicateIndex(args.index) as duplicate_index:
+            if args.issue is not None:
+                start = time.perf_counter()
+                similar_issues = duplicate_index.similar_to_issue(args.issue, args.top, args.min_similarity)
+            else:
+                if args.body_file:
+                    with open(args.body_file, 'r', encoding='utf-8') as f:
+                        candidate_body = f.read()
+                else:
+                    candidate_body = "" if sys.stdin.isatty() else sys.stdin.read()
+                start = time.perf_counter()
+                similar_issues = duplicate_index.similar(args.title, candidate_body, args.top,
+                                                         min_similarity=args.min_similarity)
+            elapsed = time.perf_counter() - start
+        print_matches(similar_issues)
+        print(f"Lookup took {elapsed * 1000:.3f} ms")
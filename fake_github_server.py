@@ -0,0 +1,338 @@
+import hashlib
+import json
+import random
+import re
+import socket
+import threading
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+# Minimal stand-in for the parts of the GitHub REST API that gather_issue_data.py uses:
+# /user, /rate_limit, /search/issues and /repos/{owner}/{repo}/issues/{number}/timeline.
+# Every response can be delayed by a fixed latency to simulate network round-trips.
+# Timelines carry ETags and honour If-None-Match, and search understands `updated:>=`,
+# so incremental syncs can be exercised too. Search also filters on `repo:`, `author:` and
+# free-text keywords, so issues of several repositories and reporters can be served at once.
+# POST /graphql answers the two queries of github_graphql.py (SearchIssues and IssueTimeline)
+# from the same issues, so both collector backends can be compared on identical data.
+
+REPO_NAME = "python/cpython"
+KIND_TITLES = [
+    "`{mod}.{func}()` segfaults",
+    "Assertion failure in `{mod}.{func}` on debug build",
+    "`SystemError` caused by `{mod}.{func}()` with invalid argument",
+    "Fatal Python error in `{mod}.{func}` under free-threading",
+    "`{mod}.{func}` is not thread safe",
+]
+MODULES = ["_tkinter", "_lsprof", "sre_constants", "_interpreters", "gc", "curses", "tracemalloc", "grp",
+           "_ctypes", "_json", "_io", "itertools", "_testcapi", "_pickle", "array"]
+FUNCS = ["create", "_creturn_callback", "_makecodes", "napms", "collect", "getgrall", "dumps", "loads",
+         "batched", "from_buffer", "take_gil", "set_trace"]
+LABEL_POOL = ["type-crash", "type-bug", "extension-modules", "interpreter-core", "topic-free-threading",
+              "topic-JIT", "topic-subinterpreters", "3.12", "3.13", "3.14"]
+PR_AUTHORS = ["ZeroIntensity", "sobolevn", "picnixz", "vstinner", "colesbury", "serhiy-storchaka", "devdanzin"]
+
+
+def make_synthetic_issues(count, seed=0, first_number=126219, repo_name=REPO_NAME, author="devdanzin"):
+    """Builds `count` deterministic fake issues (GitHub issue JSON) with a few cross-referenced PRs each."""
+    rng = random.Random(seed)
+    issues = []
+    pr_number = first_number + 10 * count
+    for index in range(count):
+        number = first_number + index
+        title = rng.choice(KIND_TITLES).format(mod=rng.choice(MODULES), func=rng.choice(FUNCS))
+        closed = rng.random() < 0.8
+        created = f"2024-{10 + index * 3 // max(count, 1):02d}-{1 + index % 28:02d}T12:00:00Z"
+        labels = sorted(set(rng.sample(LABEL_POOL, rng.randint(1, 4))))
+        body = "\n".join([
+            "# Crash report", "", "### What happened?", "",
+            f"It's possible to crash Python by calling `{title}`:", "```python",
+            "import " + title.split("`")[1].split(".")[0] if "`" in title else "import sys",
+            "```", "", "Backtrace:", "```shell",
+            "#0  0x00005555557a9bac in _PyEval_EvalFrameDefault () at Python/generated_cases.c.h:6753",
+            "```", "", "Found using fusil.",
+        ] + [f"padding line {n}" for n in range(rng.randint(0, 10))])
+        prs = []
+        for _ in range(rng.choice([0, 1, 1, 2, 3])):
+            pr_number += 1
+            prs.append({
+                "number": pr_number,
+                "html_url": f"https://github.com/{repo_name}/pull/{pr_number}",
+                "url": f"https://api.github.com/repos/{repo_name}/issues/{pr_number}",
+                "state": rng.choice(["closed", "closed", "open"]),
+                "title": f"gh-{number}: Fix {title}",
+                "user": {"login": rng.choice(PR_AUTHORS)},
+                "created_at": created,
+                "pull_request": {"url": f"https://api.github.com/repos/{repo_name}/pulls/{pr_number}",
+                                 "html_url": f"https://github.com/{repo_name}/pull/{pr_number}"},
+            })
+        issues.append({
+            "number": number,
+            "title": title,
+            "html_url": f"https://github.com/{repo_name}/issues/{number}",
+            "url": f"https://api.github.com/repos/{repo_name}/issues/{number}",
+            "repository_url": f"https://api.github.com/repos/{repo_name}",
+            "state": "closed" if closed else "open",
+            "created_at": created,
+            "updated_at": created,
+            "closed_at": created.replace("T12", "T18") if closed else None,
+            "labels": [{"name": name} for name in labels],
+            "assignees": [{"login": rng.choice(PR_AUTHORS)}] if rng.random() < 0.3 else [],
+            "milestone": None,
+            "user": {"login": author},
+            "body": body,
+            "_linked_prs": prs,
+        })
+    return issues
+
+
+def timeline_events(issue):
+    """Timeline for an issue: a labeled event plus one cross-referenced event per linked PR."""
+    events = [{"event": "labeled", "created_at": issue["created_at"], "label": issue["labels"][0]}]
+    for pr in issue["_linked_prs"]:
+        events.append({
+            "event": "cross-referenced",
+            "created_at": pr["created_at"],
+            "source": {"type": "issue", "issue": pr},
+        })
+    return events
+
+
+def repository_of(issue):
+    """'owner/repo' of an issue, from its html_url."""
+    return "/".join(issue["html_url"].split("/")[3:5])
+
+
+def search_issues(issues, query):
+    """The issues matching a search query's repo:, author:, updated:>= and keyword terms."""
+    hits = issues
+    for term in query.split():
+        qualifier, _, value = term.partition(":")
+        if qualifier == "repo":
+            hits = [issue for issue in hits if repository_of(issue) == value]
+        elif qualifier == "author":
+            hits = [issue for issue in hits if issue["user"]["login"] == value]
+        elif qualifier == "updated" and value.startswith(">="):
+            hits = [issue for issue in hits if issue["updated_at"] >= value[2:]]
+        elif not value:  # A keyword
+            hits = [issue for issue in hits
+                    if term.lower() in issue["title"].lower() or term.lower() in issue["body"].lower()]
+    return hits
+
+
+def graphql_cross_references(issue, first, after=None):
+    """A page of an issue's CROSS_REFERENCED_EVENT timeline items, GraphQL style."""
+    start = int(after or 0)
+    prs = issue["_linked_prs"][start:start + first]
+    nodes = [{"source": {"__typename": "PullRequest", "url": pr["html_url"], "state": pr["state"].upper(),
+                         "createdAt": pr["created_at"], "author": {"login": pr["user"]["login"]}}} for pr in prs]
+    has_next_page = start + first < len(issue["_linked_prs"])
+    return {"pageInfo": {"hasNextPage": has_next_page, "endCursor": str(start + first) if has_next_page else None},
+            "nodes": nodes}
+
+
+def graphql_issue_node(issue, timeline_first):
+    return {
+        "number": issue["number"],
+        "title": issue["title"],
+        "url": issue["html_url"],
+        "state": issue["state"].upper(),
+        "createdAt": issue["created_at"],
+        "closedAt": issue["closed_at"],
+        "updatedAt": issue["updated_at"],
+        "body": issue["body"],
+        "repository": {"nameWithOwner": repository_of(issue)},
+        "labels": {"nodes": [{"name": label["name"]} for label in issue["labels"]]},
+        "assignees": {"nodes": [{"login": assignee["login"]} for assignee in issue["assignees"]]},
+        "milestone": {"title": issue["milestone"]["title"]} if issue["milestone"] else None,
+        "timelineItems": graphql_cross_references(issue, timeline_first),
+    }
+
+
+class FakeGitHubServer:
+    """
+    Threaded HTTP server that answers GitHub API requests from an in-memory list of issues.
+
+    Use as a context manager; `url` is the base URL to hand to `Github(base_url=...)`.
+    `request_count` counts every request served, so callers can compare API usage.
+    """
+
+    def __init__(self, issues, latency=0.0, host="127.0.0.1", port=0, per_page=30):
+        self.issues = issues
+        self.issues_by_number = {(repository_of(issue), issue["number"]): issue for issue in issues}
+        self.latency = latency
+        self.per_page = per_page
+        self.request_count = 0
+        self.not_modified_count = 0
+        self.connection_count = 0  # TCP connections accepted; keep-alive clients reuse theirs
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def public_issue(self, issue):
+        return {key: value for key, value in issue.items() if not key.startswith("_")}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like api.github.com
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+                # Headers and body go out in separate writes; without this, Nagle's algorithm
+                # and delayed ACKs add ~40 ms to every keep-alive response.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def send_json(self, payload, status=200, link=None, etag=False):
+                # API URLs inside payloads point back at this server, so lazy loads stay local
+                data = json.dumps(payload).replace("https://api.github.com", server.url).encode("utf-8")
+                if etag:
+                    etag_value = f'W/"{hashlib.sha1(data).hexdigest()}"'
+                    if self.headers.get("If-None-Match") == etag_value:
+                        with server._lock:
+                            server.not_modified_count += 1
+                        self.send_response(304)
+                        self.send_header("ETag", etag_value)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag_value)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                # Fresh quotas, as api.github.com reports them: search is limited per minute
+                resource = "search" if self.path.startswith("/search/") else \
+                    "graphql" if self.path.startswith("/graphql") else "core"
+                limit, window = (30, 60) if resource == "search" else (5000, 3600)
+                self.send_header("X-RateLimit-Limit", str(limit))
+                self.send_header("X-RateLimit-Remaining", str(limit - 1))
+                self.send_header("X-RateLimit-Reset", str(int(time.time()) + window))
+                self.send_header("X-RateLimit-Resource", resource)
+                if link:
+                    self.send_header("Link", link)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def paginate(self, items, path, query):
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", [str(server.per_page)])[0])
+                start = (page - 1) * per_page
+                link = None
+                if start + per_page < len(items):
+                    params = urlencode({key: value[0] for key, value in query.items() if key != "page"})
+                    separator = "&" if params else ""
+                    last_page = (len(items) + per_page - 1) // per_page
+                    link = (f'<{server.url}{path}?{params}{separator}page={page + 1}>; rel="next", '
+                            f'<{server.url}{path}?{params}{separator}page={last_page}>; rel="last"')
+                return items[start:start + per_page], link
+
+            def do_GET(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                parts = urlsplit(self.path)
+                path = parts.path
+                query = parse_qs(parts.query)
+                if path == "/user":
+                    self.send_json({"login": "fusil-bot", "id": 1, "type": "User"})
+                elif path == "/rate_limit":
+                    reset = int(time.time()) + 3600
+                    core = {"limit": 5000, "remaining": 4999, "reset": reset, "used": 1}
+                    search = {"limit": 30, "remaining": 29, "reset": reset, "used": 1}
+                    self.send_json({"resources": {"core": core, "search": search}, "rate": core})
+                elif path == "/search/issues":
+                    hits = search_issues(server.issues, query.get("q", [""])[0])
+                    items, link = self.paginate([server.public_issue(issue) for issue in hits], path, query)
+                    self.send_json({"total_count": len(hits), "incomplete_results": False,
+                                    "items": items}, link=link)
+                else:
+                    match = re.fullmatch(r"/repos/([^/]+/[^/]+)/issues/(\d+)/timeline", path)
+                    issue = server.issues_by_number.get((match.group(1), int(match.group(2)))) if match else None
+                    if issue is None:
+                        self.send_json({"message": "Not Found"}, status=404)
+                        return
+                    events, link = self.paginate(timeline_events(issue), path, query)
+                    self.send_json(events, link=link, etag=True)
+
+            def do_POST(self):
+                with server._lock:
+                    server.request_count += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if urlsplit(self.path).path != "/graphql":
+                    self.send_json({"message": "Not Found"}, status=404)
+                    return
+                operation = re.search(r"query\s+(\w+)", body.get("query", ""))
+                variables = body.get("variables") or {}
+                if operation and operation.group(1) == "SearchIssues":
+                    hits = search_issues(server.issues, variables["query"])
+                    start = int(variables.get("after") or 0)
+                    page = hits[start:start + variables["first"]]
+                    has_next_page = start + variables["first"] < len(hits)
+                    self.send_json({"data": {"search": {
+                        "issueCount": len(hits),
+                        "pageInfo": {"hasNextPage": has_next_page,
+                                     "endCursor": str(start + len(page)) if has_next_page else None},
+                        "nodes": [graphql_issue_node(issue, variables["timelineFirst"]) for issue in page],
+                    }}})
+                elif operation and operation.group(1) == "IssueTimeline":
+                    repository = f"{variables['owner']}/{variables['name']}"
+                    issue = server.issues_by_number.get((repository, variables["number"]))
+                    if issue is None:
+                        self.send_json({"data": {"repository": None}, "errors": [
+                            {"type": "NOT_FOUND", "message": f"Could not resolve issue {variables['number']}"}]})
+                        return
+                    timeline = graphql_cross_references(issue, variables["first"], variables.get("after"))
+                    self.send_json({"data": {"repository": {"issue": {"timelineItems": timeline}}}})
+                else:
+                    self.send_json({"errors": [{"message": "Unknown query"}]})
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve synthetic fusil issues through a fake GitHub API.")
+    parser.add_argument("--issues", type=int, default=200, help="Number of synthetic issues to serve.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds to sleep before each response.")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    server = FakeGitHubServer(make_synthetic_issues(args.issues), latency=args.latency, port=args.port)
+    print(f"Serving {args.issues} fake issues at {server.url} (latency {args.latency}s). Ctrl+C to stop.")
+    print(f"Run the collector with: GITHUB_TOKEN=dummy GITHUB_API_URL={server.url} python gather_issue_data.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,45 @@
+import sys
+import argparse
+import importlib
+
+# Single entry point for the report scripts:
+#
+#   python fusil_report.py gather --workers 4
+#   python fusil_report.py summary issues.open days_to_close.median
+#
+# Each subcommand runs the main() of its script with the remaining arguments, so
+# `python fusil_report.py stats --help` shows the script's own options. A script is only
+# imported when its subcommand runs: `summary` never imports pandas, pyarrow, matplotlib or
+# PyGithub, and neither do `parse-appendix`, `pr-authors` and `pr-graph` while the PR graph
+# is up to date (see pr_graph.py). benchmarks/bench_cli_startup.py measures the imports of
+# each subcommand with -X importtime.
+
+COMMANDS = {  # Subcommand -> (module with a main(argv) function, help)
+    "gather": ("gather_issue_data", "Collect fusil issues and their linked PRs from GitHub."),
+    "ingest": ("session_ingest", "Triage raw fusil session directories by crash signature and kind."),
+    "parse-appendix": ("parse_appendix_prs", "PR authors and PR counts listed in the report's Appendix."),
+    "stats": ("calculate_placeholders", "Compute and print the statistics quoted in the report."),
+    "weekly": ("generate_issues_opened_and_closed_by_week", "Issues created and closed per week, and their chart."),
+    "pr-authors": ("generate_pr_per_issue_statistics", "Number of issues each PR author worked on."),
+    "pr-graph": ("pr_graph", "Query the issue/PR/author graph: top contributors, issues per PR, days to first PR."),
+    "replay": ("reproducer_replay", "Re-run the issues' reproducers against local CPython builds."),
+    "search": ("issue_search", "Full-text search over issues, backtraces and reproducers, with filters."),
+    "summary": ("report_summary", "Answer from the precomputed report summary, e.g. 'summary issues.open'."),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect, analyze and report the issues found by fuzzing CPython "
+                                                 "with fusil.")
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text, add_help=False)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    command = parser.parse_args(argv[:1]).command  # Everything after it, --help included, goes to the script
+
+    sys.argv[0] = f"{parser.prog} {command}"  # Usage lines of the script's parser
+    importlib.import_module(COMMANDS[command][0]).main(argv[1:])
+
+
+if __name__ == "__main__":
+    main()
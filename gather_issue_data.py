@@ -1,170 +1,586 @@
 import os
-import csv
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from github import Github
 from github.GithubException import GithubException
 from datetime import datetime
 
+import instrumentation
+from github_graphql import SEARCH_PAGE_SIZE, iter_issues as iter_graphql_issues
+from issue_classifier import classify
+from issue_cache import IssueCache, utc_now_iso
+from issue_writers import ROW_WRITERS, recover_partial_output
+from rate_limit import RequestScheduler, DEFAULT_CORE_RATE, DEFAULT_SEARCH_RATE, DEFAULT_GRAPHQL_RATE
+
 # --- Configuration ---
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")  # Point at a stand-in server for testing
+DEFAULT_WORKERS = 8  # Concurrent timeline fetches; 1 restores the old serial behaviour
+BACKENDS = ("rest", "graphql")  # graphql: issues and their linked PRs in batched GraphQL queries
 REPO_NAME = "python/cpython"
 AUTHOR = "devdanzin"
 SEARCH_KEYWORD = "fusil"  # Keyword to find in issues
 OUTPUT_CSV_FILE = f"cpython_fusil_issues_by_{AUTHOR}.csv"
+CACHE_FILE = f"cpython_fusil_issues_by_{AUTHOR}.cache.json"  # Used by --incremental
+CAMPAIGNS_FILE = "campaigns.json"  # Used by --campaigns
+CAMPAIGNS_OUTPUT_FILE = "fusil_campaign_issues.csv"
+INCOMPLETE_SUFFIX = ".incomplete"  # Marker file present while the output is still being streamed
+TIMELINE_PAGE_SIZE = 100  # Events per timeline request of --incremental (GitHub's maximum)
+FIELDNAMES = [
+    "Issue #", "Title", "HTML URL", "Date Filed", "Status", "Closed Date",
+    "Labels", "Assignees", "Milestone", "Body Snippet (MRE/Backtrace hint)",
+    "Linked PRs (URL;Author;Status)",
+    "Linked PRs Created",  # Creation date (YYYY-MM-DD) of each linked PR, in the same order
+    "Guessed Kind", "Guessed CPython Versions", "Guessed Configurations"
+]
+# Issues of several campaigns can come from different repositories and match several queries
+CAMPAIGN_FIELDNAMES = FIELDNAMES + ["Repository", "Campaigns"]
 
 
-# --- Helper function for basic categorization (manual review is CRITICAL) ---
-def guess_kind_from_labels_title(labels, title):
-    title_lower = title.lower()
-    label_set = {label.lower() for label in labels}
-    if any(k in title_lower for k in ["segfault", "segmentation fault", "crash"]) or \
-            any(k in label_set for k in ["crash", "segfault"]):
-        return "Segfault/Crash"
-    if "assertionerror" in title_lower or "abort" in title_lower or "assert" in title_lower or \
-            any(k in label_set for k in ["assertionerror", "abort"]):
-        return "Abort/AssertionError"
-    if "systemerror" in title_lower or "system error" in title_lower or \
-            "systemerror" in label_set:
-        return "SystemError"
-    if "fatal python error" in title_lower or "fatal error" in title_lower or \
-            any(k in label_set for k in ["fatal-error"]):
-        return "Fatal Python Error"
-    return ""
+# --- Helper functions for basic categorization (manual review is CRITICAL) ---
+# The rules live in issue_classifier.py; these wrappers keep the original signatures.
+def guess_kind_from_labels_title(labels, title, body=""):
+    return classify(title, labels, body).kind
 
 
 def guess_versions_from_labels(labels):
-    versions = set()
-    for label in labels:
-        label_lower = label.lower()
-        if label_lower.startswith("version-") or label_lower.startswith("python-"):  # e.g., version-3.12
-            ver = label_lower.replace("version-", "").replace("python-", "")
-            versions.add(ver)
-        elif "3." in label_lower:  # crude catch for "3.12", "3.13" etc. if not formally labeled
-            parts = label_lower.split(".")
-            if len(parts) > 1 and parts[0] == "3" and parts[1].isdigit():
-                versions.add(f"{parts[0]}.{parts[1]}")
-    return ";".join(sorted(list(versions))) if versions else ""
+    return classify("", labels).versions
 
 
 def guess_configurations_from_labels(labels):
-    configs = set()
-    label_set = {label.lower() for label in labels}
-    if "free-threading" in label_set or "freethreading" in label_set:
-        configs.add("Free-threaded")
-    if "debug-build" in label_set or "debug" in label_set:  # "debug" might be too broad
-        configs.add("Debug Build")
-    if "asan" in label_set or "addresssanitizer" in label_set:
-        configs.add("ASAN")
-    if "jit" in label_set:
-        configs.add("JIT")
-    # Add more common configurations you expect
-    return ";".join(sorted(list(configs))) if configs else ""
-
-
-def fetch_github_issues():
+    return classify("", labels).configurations
+
+
+def fetch_linked_prs(issue, scheduler=None):
+    """
+    Collects linked PR entries (see linked_prs_columns()) for PRs cross-referenced in an issue's timeline.
+
+    A timeline that can't be fetched raises instead of returning no PRs: the issue's row is
+    then never written, so resuming or re-syncing fetches it again rather than keeping an
+    empty 'Linked PRs' field.
+    """
+    linked_prs_info = []
+    # Attempt to find linked PRs through timeline events (cross-referenced)
+    # This can be slow as it fetches timeline for each issue
+    try:
+        timeline = issue.get_timeline()
+        if scheduler is not None:
+            timeline = scheduler.iterate_pages("core", timeline)  # One token per page
+        for event in timeline:
+            if event.event == "cross-referenced" and \
+                    hasattr(event, 'source') and event.source and \
+                    hasattr(event.source, 'issue') and event.source.issue and \
+                    hasattr(event.source.issue, 'pull_request') and event.source.issue.pull_request:
+
+                pr = event.source.issue  # This is the PR object
+                pr_author = pr.user.login if pr.user else "N/A"
+                pr_created = pr.created_at.strftime("%Y-%m-%d") if pr.created_at else ""
+                pr_info = f"{pr.html_url};{pr_author};{pr.state};{pr_created}"
+                if pr_info not in linked_prs_info:  # Avoid duplicates
+                    linked_prs_info.append(pr_info)
+    except Exception as e:
+        print(f"  Error: Could not fetch timeline for issue #{issue.number}: {e}")
+        raise
+    return linked_prs_info
+
+
+def linked_prs_from_timeline_json(events, linked_prs_info=None):
+    """Same as fetch_linked_prs(), but over raw timeline event dicts from the REST API."""
+    if linked_prs_info is None:
+        linked_prs_info = []
+    for event in events or []:
+        source_issue = (event.get("source") or {}).get("issue") or {}
+        if event.get("event") == "cross-referenced" and source_issue.get("pull_request"):
+            pr_author = (source_issue.get("user") or {}).get("login") or "N/A"
+            pr_created = (source_issue.get("created_at") or "")[:10]
+            pr_info = f"{source_issue.get('html_url')};{pr_author};{source_issue.get('state')};{pr_created}"
+            if pr_info not in linked_prs_info:  # Avoid duplicates
+                linked_prs_info.append(pr_info)
+    return linked_prs_info
+
+
+def linked_prs_columns(linked_prs_info):
+    """
+    The two CSV columns of a list of linked PR entries.
+
+    Entries are 'URL;Author;Status;Created' strings; the CSV keeps 'URL;Author;Status' in
+    its own column and the creation dates in 'Linked PRs Created', so both columns keep a
+    fixed number of fields. Entries cached before creation dates were collected have no
+    ';Created' part and get an empty date.
+    """
+    prs, created = [], []
+    for pr_info in linked_prs_info:
+        fields = pr_info.split(";")
+        prs.append(";".join(fields[:3]))
+        created.append(fields[3] if len(fields) > 3 else "")
+    return {
+        "Linked PRs (URL;Author;Status)": " | ".join(prs),  # Use pipe to separate multiple PRs
+        "Linked PRs Created": " | ".join(created),
+    }
+
+
+def fetch_timeline_conditional(requester, number, etags=None, scheduler=None):
+    """
+    Fetches an issue's timeline, revalidating each page with the ETag it had last time.
+
+    Returns (etags, linked_prs_info), with the ETag of every page. linked_prs_info is None
+    when GitHub answered 304 Not Modified for every page, meaning the cached linked PRs are
+    still current; conditional requests answered with 304 don't count against the rate
+    limit. Otherwise the whole timeline is read again. Pages are read until one isn't full,
+    and that last page has an ETag too, so events added at the end of the timeline are seen.
+    """
+    def request(page, etag=None):
+        args = ("GET", f"/repos/{REPO_NAME}/issues/{number}/timeline")
+        kwargs = {"parameters": {"per_page": TIMELINE_PAGE_SIZE, "page": page},
+                  "headers": {"If-None-Match": etag} if etag else {}}
+        if scheduler is None:
+            return requester.requestJsonAndCheck(*args, **kwargs)
+        return scheduler.call("core", requester.requestJsonAndCheck, *args, **kwargs)
+
+    first_page = None
+    for page, etag in enumerate(etags or [], 1):
+        response = request(page, etag)
+        if response[1] is not None:  # This page changed (304 Not Modified has an empty body)
+            first_page = response if page == 1 else None
+            break
+    else:
+        if etags:
+            return etags, None
+
+    response_headers, events = first_page or request(1)
+    etags, linked_prs_info, page = [], [], 1
+    while True:
+        etags.append(response_headers.get("etag"))
+        linked_prs_from_timeline_json(events, linked_prs_info)
+        if len(events) < TIMELINE_PAGE_SIZE:
+            return etags, linked_prs_info
+        page += 1
+        response_headers, events = request(page)
+
+
+def issue_row(issue, linked_prs_info):
+    """Turns one search hit and its linked PRs into a CSV row dict."""
+    labels = [label.name for label in issue.labels]
+    assignees = [assignee.login for assignee in issue.assignees]
+    milestone = issue.milestone.title if issue.milestone else ""
+
+    body = issue.body or ""
+    body_snippet_lines = body.splitlines()[:15]  # First 15 lines as snippet
+    body_snippet = "\\n".join(body_snippet_lines)  # Escape newlines for CSV
+    if len(body) > len(body_snippet):
+        body_snippet += "..."
+    classification = classify(issue.title, labels, body_snippet)
+
+    return {
+        "Issue #": issue.number,
+        "Title": issue.title,
+        "HTML URL": issue.html_url,
+        "Date Filed": issue.created_at.strftime("%Y-%m-%d") if issue.created_at else "",
+        "Status": issue.state,
+        "Closed Date": issue.closed_at.strftime("%Y-%m-%d") if issue.closed_at else "",
+        "Labels": ";".join(labels),
+        "Assignees": ";".join(assignees),
+        "Milestone": milestone,
+        "Body Snippet (MRE/Backtrace hint)": body_snippet,
+        **linked_prs_columns(linked_prs_info),
+        "Guessed Kind": classification.kind,
+        "Guessed CPython Versions": classification.versions,
+        "Guessed Configurations": classification.configurations,
+    }
+
+
+def ordered_parallel_map(func, iterable, workers):
+    """
+    Like map(func, iterable), but runs up to `workers` calls at a time in threads.
+
+    Items are pulled from `iterable` lazily (so search result pages keep being fetched
+    while earlier timelines are still in flight) and results are yielded in input order.
+    At most 2 * workers items are pending at once.
+    """
+    if workers <= 1:
+        yield from map(func, iterable)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for item in iterable:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def connect_github(workers):
+    """Authenticates against GITHUB_API_URL, returning a Github client or None on failure."""
     if not GITHUB_TOKEN:
         print("Error: GITHUB_TOKEN environment variable not set.")
-        return
+        return None
 
-    g = Github(GITHUB_TOKEN)
+    # One pooled connection per worker, so timeline requests don't queue on the session.
+    # Retries and request spacing are left to RequestScheduler, which knows about
+    # Retry-After and quotas, so PyGithub's own retry and fixed throttle are disabled. The
+    # write throttle too: GraphQL queries are POSTs, but the collector never writes anything.
+    g = Github(GITHUB_TOKEN, base_url=GITHUB_API_URL, pool_size=max(workers, 1), retry=None,
+               seconds_between_requests=None, seconds_between_writes=None)
+    instrumentation.watch_github(g.requester)
 
     try:
         # Check user and rate limit
-        user = g.get_user()
-        print(f"Authenticated as: {user.login}")
-        print(f"Rate limit: {g.get_rate_limit()}")
+        with instrumentation.stage("connect"):
+            user = g.get_user()
+            print(f"Authenticated as: {user.login}")
+            print(f"Rate limit: {g.get_rate_limit()}")
     except GithubException as e:
         print(f"Error connecting to GitHub or authenticating: {e}")
-        return
+        return None
+    return g
+
+
+def build_query(repo_name=None, author=None, keyword=None):
+    """Search query of a campaign; the module's REPO_NAME, AUTHOR and SEARCH_KEYWORD by default."""
+    return (f"repo:{repo_name or REPO_NAME} author:{author or AUTHOR} is:issue sort:created-asc "
+            f"{keyword or SEARCH_KEYWORD}")
 
-    query = f"repo:{REPO_NAME} author:{AUTHOR} is:issue sort:created-asc {SEARCH_KEYWORD}"
-    print(f"Searching for issues with query: {query}\n")
 
-    issues_data = []
+def load_campaigns(path=CAMPAIGNS_FILE):
+    """
+    Reads the campaigns to collect from a JSON file:
+      {"campaigns": [{"name": "cpython", "repo": "python/cpython", "author": "devdanzin", "keyword": "fusil"}]}
+    `name` defaults to "repo author keyword".
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    campaigns = []
+    for campaign in data["campaigns"]:
+        missing = [key for key in ("repo", "author", "keyword") if not campaign.get(key)]
+        if missing:
+            raise ValueError(f"Campaign {campaign} in {path} is missing {', '.join(missing)}")
+        campaigns.append(dict(campaign, name=campaign.get("name") or
+                              f"{campaign['repo']} {campaign['author']} {campaign['keyword']}"))
+    return campaigns
+
+
+def write_rows(rows, output_file, output_format="csv"):
+    """Writes an iterable of row dicts to `output_file`, streaming them one at a time."""
     try:
-        found_issues = g.search_issues(query=query)
-        print(f"Found {found_issues.totalCount} issues matching the query.")
+        with ROW_WRITERS[output_format](output_file, FIELDNAMES) as writer:
+            for row in rows:
+                writer.write(row)
+        instrumentation.count(rows=writer.count)
+        print(f"\nSuccessfully wrote {writer.count} issues to {output_file}")
+    except IOError:
+        print(f"Error writing to file {output_file}")
+
+
+# --- Collection pipeline: search -> enrich -> classify -> write ---
+# Each stage is a generator, so only the rows currently in flight between the stages
+# (at most 2 * workers of them) are held in memory.
+
+def search_stage(g, scheduler, query):
+    """Yields search hits page by page."""
+    found_issues = g.search_issues(query=query)
+    print(f"Found {scheduler.call('search', lambda: found_issues.totalCount)} issues matching the query.")
+    yield from scheduler.iterate_pages("search", found_issues)
+
+
+def enrich_stage(issues, scheduler, workers, skip_numbers=frozenset()):
+    """Yields (issue, linked_prs_info), fetching timelines concurrently but in search order."""
+    def enrich(issue):
+        print(f"Processing Issue #{issue.number}: {issue.title}")
+        with instrumentation.stage("timeline"):
+            return issue, fetch_linked_prs(issue, scheduler)
+
+    pending_issues = (issue for issue in issues if issue.number not in skip_numbers)
+    yield from ordered_parallel_map(enrich, pending_issues, workers)
+
+
+def classify_stage(enriched_issues):
+    """Yields finished CSV rows, including the guessed kind, versions and configurations."""
+    for issue, linked_prs_info in enriched_issues:
+        yield issue_row(issue, linked_prs_info)
+
+
+def write_stage(rows, writer):
+    """Writes each row as soon as it arrives; returns the number written."""
+    for row in rows:
+        writer.write(row)
+    instrumentation.count(rows=writer.count)
+    return writer.count
+
 
-        for issue in found_issues:
+def campaign_search_stage(g, scheduler, campaigns):
+    """
+    Runs every campaign's search and returns [(issue, campaign names)] with one entry per issue.
+
+    An issue matching several queries is kept once, tagged with all of their names, so its
+    timeline is only fetched once. All searches run before any timeline is fetched, since a
+    later campaign may still add a tag to an issue.
+    """
+    found = {}  # HTML URL -> (issue, campaign names), in the order first seen
+    for campaign in campaigns:
+        query = build_query(campaign["repo"], campaign["author"], campaign["keyword"])
+        print(f"[{campaign['name']}] Searching for issues with query: {query}")
+        hits = duplicates = 0
+        for issue in instrumentation.traced("search", search_stage(g, scheduler, query)):
+            hits += 1
+            if issue.html_url in found:
+                duplicates += 1
+                found[issue.html_url][1].append(campaign["name"])
+            else:
+                found[issue.html_url] = (issue, [campaign["name"]])
+        print(f"[{campaign['name']}] {hits} issues, {duplicates} already found by an earlier campaign.\n")
+    return list(found.values())
+
+
+def graphql_enrich_stage(g, scheduler, query, skip_numbers=frozenset()):
+    """Yields (issue, linked_prs_info) like search_stage() + enrich_stage(), from batched GraphQL queries."""
+    for issue, linked_prs_info in iter_graphql_issues(g.requester, scheduler, query):
+        if issue.number not in skip_numbers:
             print(f"Processing Issue #{issue.number}: {issue.title}")
+            yield issue, linked_prs_info
+
+
+def fetch_github_issues(workers=DEFAULT_WORKERS, output_csv_file=OUTPUT_CSV_FILE,
+                        core_rate=DEFAULT_CORE_RATE, search_rate=DEFAULT_SEARCH_RATE, output_format="csv",
+                        backend="rest", graphql_rate=DEFAULT_GRAPHQL_RATE):
+    g = connect_github(workers)
+    if g is None:
+        return
+    scheduler = RequestScheduler(g, core_rate=core_rate, search_rate=search_rate, graphql_rate=graphql_rate)
 
-            labels = [label.name for label in issue.labels]
-            assignees = [assignee.login for assignee in issue.assignees]
-            milestone = issue.milestone.title if issue.milestone else ""
-
-            body_snippet_lines = issue.body.splitlines()[:15]  # First 15 lines as snippet
-            body_snippet = "\\n".join(body_snippet_lines)  # Escape newlines for CSV
-            if len(issue.body) > len(body_snippet):
-                body_snippet += "..."
-
-            linked_prs_info = []
-            # Attempt to find linked PRs through timeline events (cross-referenced)
-            # This can be slow as it fetches timeline for each issue
-            try:
-                for event in issue.get_timeline():
-                    if event.event == "cross-referenced" and \
-                            hasattr(event, 'source') and event.source and \
-                            hasattr(event.source, 'issue') and event.source.issue and \
-                            hasattr(event.source.issue, 'pull_request') and event.source.issue.pull_request:
-
-                        pr = event.source.issue  # This is the PR object
-                        pr_author = pr.user.login if pr.user else "N/A"
-                        pr_info = f"{pr.html_url};{pr_author};{pr.state}"
-                        if pr_info not in linked_prs_info:  # Avoid duplicates
-                            linked_prs_info.append(pr_info)
-            except GithubException as e:
-                print(f"  Warning: Could not fetch timeline for issue #{issue.number}: {e}")
-            except Exception as e:
-                print(f"  Warning: An unexpected error occurred while fetching timeline for issue #{issue.number}: {e}")
-
-            issues_data.append({
-                "Issue #": issue.number,
-                "Title": issue.title,
-                "HTML URL": issue.html_url,
-                "Date Filed": issue.created_at.strftime("%Y-%m-%d") if issue.created_at else "",
-                "Status": issue.state,
-                "Closed Date": issue.closed_at.strftime("%Y-%m-%d") if issue.closed_at else "",
-                "Labels": ";".join(labels),
-                "Assignees": ";".join(assignees),
-                "Milestone": milestone,
-                "Body Snippet (MRE/Backtrace hint)": body_snippet,
-                "Linked PRs (URL;Author;Status)": " | ".join(linked_prs_info),  # Use pipe to separate multiple PRs
-                "Guessed Kind": guess_kind_from_labels_title(labels, issue.title),
-                "Guessed CPython Versions": guess_versions_from_labels(labels),
-                "Guessed Configurations": guess_configurations_from_labels(labels),
-            })
-            # Be mindful of rate limits if fetching timeline for many issues
-            # print(f"Current rate limit: {g.get_rate_limit().core}")
+    query = build_query()
+    print(f"Searching for issues with query: {query}\n")
+
+    # Rows are streamed to the output as they finish. While the marker file exists the
+    # output is partial; a rerun keeps its complete rows and appends only the missing ones.
+    # Search results are sorted by creation date, so appending preserves the row order.
+    writer_class = ROW_WRITERS[output_format]
+    incomplete_marker = output_csv_file + INCOMPLETE_SUFFIX
+    finished_numbers = set()
+    if os.path.exists(incomplete_marker):
+        finished_numbers = recover_partial_output(output_csv_file, writer_class, FIELDNAMES)
+        print(f"Resuming: {len(finished_numbers)} issues already written to {output_csv_file}")
+    else:
+        open(incomplete_marker, 'w').close()
 
+    try:
+        with writer_class(output_csv_file, FIELDNAMES, append=bool(finished_numbers)) as writer:
+            if backend == "graphql":
+                print(f"Fetching issues and linked PRs {SEARCH_PAGE_SIZE} at a time with GraphQL.")
+                enriched = instrumentation.traced("graphql", graphql_enrich_stage(g, scheduler, query,
+                                                                                  finished_numbers))
+            else:
+                print(f"Fetching timelines with {workers} worker(s).")
+                issues = instrumentation.traced("search", search_stage(g, scheduler, query))
+                enriched = instrumentation.traced("enrich", enrich_stage(issues, scheduler, workers, finished_numbers))
+            rows = instrumentation.traced("classify", classify_stage(enriched))
+            with instrumentation.stage("write"):
+                written = write_stage(rows, writer)
 
     except GithubException as e:
         print(f"Error during GitHub search or processing: {e}")
+        print(f"Partial results kept in {output_csv_file}; rerun to resume.")
         return
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+        print(f"Partial results kept in {output_csv_file}; rerun to resume.")
         return
 
-    if not issues_data:
+    os.remove(incomplete_marker)
+    print(f"API calls: {scheduler.request_count}, rate-limit retries: {scheduler.retry_count}")
+    if not written + len(finished_numbers):
         print("No issues found or processed.")
         return
+    print(f"\nSuccessfully wrote {written + len(finished_numbers)} issues to {output_csv_file}")
+
+
+def collect_campaigns(campaigns, workers=DEFAULT_WORKERS, output_file=CAMPAIGNS_OUTPUT_FILE,
+                      core_rate=DEFAULT_CORE_RATE, search_rate=DEFAULT_SEARCH_RATE, output_format="csv"):
+    """
+    Collects the issues of several (repo, author, keyword) campaigns into one output file.
+
+    All campaigns share one authenticated client, so its pooled keep-alive connections are
+    reused from one query to the next, and one RequestScheduler, so every request counts
+    against the same rate-limit budget. Rows get 'Repository' and 'Campaigns' columns.
+
+    An interrupted run resumes like fetch_github_issues(): the searches run again, and only
+    the issues missing from the partial output (by HTML URL, as numbers repeat across
+    repositories) have their timelines fetched and are appended.
+    """
+    g = connect_github(workers)
+    if g is None:
+        return
+    scheduler = RequestScheduler(g, core_rate=core_rate, search_rate=search_rate)
+
+    writer_class = ROW_WRITERS[output_format]
+    incomplete_marker = output_file + INCOMPLETE_SUFFIX
+    finished_urls = set()
+    if os.path.exists(incomplete_marker):
+        finished_urls = recover_partial_output(output_file, writer_class, CAMPAIGN_FIELDNAMES,
+                                               key=lambda row: row["HTML URL"])
+        print(f"Resuming: {len(finished_urls)} issues already written to {output_file}")
+    else:
+        open(incomplete_marker, 'w').close()
 
-    # Write to CSV
-    fieldnames = [
-        "Issue #", "Title", "HTML URL", "Date Filed", "Status", "Closed Date",
-        "Labels", "Assignees", "Milestone", "Body Snippet (MRE/Backtrace hint)",
-        "Linked PRs (URL;Author;Status)",
-        "Guessed Kind", "Guessed CPython Versions", "Guessed Configurations"
-    ]
+    def enrich(found_issue):
+        issue, campaign_names = found_issue
+        print(f"Processing Issue #{issue.number}: {issue.title}")
+        with instrumentation.stage("timeline"):
+            return issue, campaign_names, fetch_linked_prs(issue, scheduler)
 
     try:
-        with open(OUTPUT_CSV_FILE, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            for data_row in issues_data:
-                writer.writerow(data_row)
-        print(f"\nSuccessfully wrote {len(issues_data)} issues to {OUTPUT_CSV_FILE}")
-    except IOError:
-        print(f"Error writing to CSV file {OUTPUT_CSV_FILE}")
+        found_issues = [found_issue for found_issue in campaign_search_stage(g, scheduler, campaigns)
+                        if found_issue[0].html_url not in finished_urls]
+        print(f"Fetching timelines of {len(found_issues)} distinct issues with {workers} worker(s).")
+        enriched = instrumentation.traced("enrich", ordered_parallel_map(enrich, found_issues, workers))
+        with instrumentation.stage("write"), \
+                writer_class(output_file, CAMPAIGN_FIELDNAMES, append=bool(finished_urls)) as writer:
+            for issue, campaign_names, linked_prs_info in enriched:
+                row = issue_row(issue, linked_prs_info)
+                row["Repository"] = "/".join(issue.html_url.split("/")[3:5])
+                row["Campaigns"] = ";".join(campaign_names)
+                writer.write(row)
+            instrumentation.count(rows=writer.count)
+    except GithubException as e:
+        print(f"Error during GitHub search or processing: {e}")
+        print(f"Partial results kept in {output_file}; rerun to resume.")
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        print(f"Partial results kept in {output_file}; rerun to resume.")
+        return
+
+    os.remove(incomplete_marker)
+    print(f"API calls: {scheduler.request_count}, rate-limit retries: {scheduler.retry_count}")
+    print(f"\nSuccessfully wrote {writer.count + len(finished_urls)} issues from {len(campaigns)} campaigns "
+          f"to {output_file}")
+
+
+def sync_github_issues(workers=DEFAULT_WORKERS, output_csv_file=OUTPUT_CSV_FILE, cache_file=CACHE_FILE,
+                       core_rate=DEFAULT_CORE_RATE, search_rate=DEFAULT_SEARCH_RATE, output_format="csv"):
+    """
+    Incremental variant of fetch_github_issues() backed by an IssueCache.
+
+    Every issue matched by the query is listed again, but its timeline pages only get
+    conditional requests (If-None-Match), which cost nothing when they are unchanged, so
+    only issues with new timeline events are read in full. Cached issues the query no
+    longer matches are evicted. The CSV is always regenerated from the whole cache.
+    """
+    g = connect_github(workers)
+    if g is None:
+        return
+    scheduler = RequestScheduler(g, core_rate=core_rate, search_rate=search_rate)
+
+    cache = IssueCache.load(cache_file)
+    query = build_query()
+    cache.reset_if_query_changed(query)
+    sync_started_at = utc_now_iso()
+    print(f"Cached issues: {len(cache.issues)}, last sync: {cache.last_sync or 'never'}")
+    print(f"Searching for issues with query: {query}\n")
+
+    def sync_issue(issue):
+        cached = cache.get(issue.number)
+        with instrumentation.stage("timeline"):
+            etags, linked_prs_info = fetch_timeline_conditional(
+                g.requester, issue.number, cached.get("timeline_etags") if cached else None, scheduler
+            )
+        fetched = linked_prs_info is not None
+        if not fetched:
+            linked_prs_info = cached["linked_prs"]
+        elif cached:
+            print(f"  Timeline changed for issue #{issue.number}: {issue.title}")
+        else:
+            print(f"  New issue #{issue.number}: {issue.title}")
+        updated_at = issue.updated_at.strftime("%Y-%m-%dT%H:%M:%SZ") if issue.updated_at else None
+        return issue.number, issue_row(issue, linked_prs_info), linked_prs_info, updated_at, etags, fetched
+
+    full_fetches = 0
+    try:
+        issues = g.search_issues(query=query)
+        print(f"Found {scheduler.call('search', lambda: issues.totalCount)} issues; "
+              f"revalidating their timelines with conditional requests.")
+        seen = set()
+        search_hits = instrumentation.traced("search", scheduler.iterate_pages("search", issues))
+        for number, row, linked_prs_info, updated_at, etags, fetched in instrumentation.traced(
+                "enrich", ordered_parallel_map(sync_issue, search_hits, workers)):
+            cache.store(number, row, linked_prs_info, updated_at, etags)
+            seen.add(number)
+            full_fetches += fetched
+
+        # Only evict after a complete listing, so an interrupted sync never drops issues
+        evicted = cache.retain(seen)
+        if evicted:
+            print(f"Evicted {len(evicted)} issues no longer matched by the query: "
+                  f"{', '.join(f'#{number}' for number in evicted)}")
+
+    except GithubException as e:
+        print(f"Error during GitHub search or processing: {e}")
+        cache.save()  # Keep what was synced so far, without evicting anything
+        return
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        cache.save()
+        return
+
+    cache.last_sync = sync_started_at
+    cache.save()
+    print(f"Sync done: {full_fetches} full fetches, {len(cache.issues)} issues cached in {cache_file}")
+
+    if not cache.issues:
+        print("No issues found or processed.")
+        return
+
+    with instrumentation.stage("write"):
+        write_rows(cache.rows(), output_csv_file, output_format)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Collect fusil issues and their linked PRs from GitHub.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Number of concurrent timeline fetches (default: {DEFAULT_WORKERS}, 1 = serial).")
+    parser.add_argument("--output", help=f"File to write (default: {OUTPUT_CSV_FILE}, "
+                                         f"or the same name with .jsonl for --format jsonl).")
+    parser.add_argument("--format", choices=sorted(ROW_WRITERS), default="csv",
+                        help="Output format; rows are streamed to the file as each issue finishes.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-read issues whose timelines changed since the last run, using a local cache.")
+    parser.add_argument("--cache-file", default=CACHE_FILE, help="Cache file used by --incremental.")
+    parser.add_argument("--backend", choices=BACKENDS, default="rest",
+                        help="rest: one timeline request per issue; graphql: issues and linked PRs in "
+                             "batched GraphQL queries (not combined with --incremental or --campaigns yet).")
+    parser.add_argument("--campaigns", nargs="?", const=CAMPAIGNS_FILE, metavar="FILE",
+                        help=f"Collect every (repo, author, keyword) campaign listed in FILE "
+                             f"(default: {CAMPAIGNS_FILE}) into one output file.")
+    parser.add_argument("--core-rate", type=float, default=DEFAULT_CORE_RATE,
+                        help=f"Max core API requests per second (default: {DEFAULT_CORE_RATE}).")
+    parser.add_argument("--search-rate", type=float, default=DEFAULT_SEARCH_RATE,
+                        help=f"Max search API requests per second (default: {DEFAULT_SEARCH_RATE}).")
+    parser.add_argument("--graphql-rate", type=float, default=DEFAULT_GRAPHQL_RATE,
+                        help=f"Max GraphQL requests per second (default: {DEFAULT_GRAPHQL_RATE}).")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.campaigns and args.incremental:
+        parser.error("--campaigns and --incremental can't be combined yet")
+    if args.backend != "rest" and (args.campaigns or args.incremental):
+        parser.error(f"--backend {args.backend} can't be combined with --campaigns or --incremental yet")
+    default_output = CAMPAIGNS_OUTPUT_FILE if args.campaigns else OUTPUT_CSV_FILE
+    if args.output is None:
+        args.output = os.path.splitext(default_output)[0] + ROW_WRITERS[args.format].extension
+    with instrumentation.session(args, "gather_issue_data"):
+        if args.campaigns:
+            collect_campaigns(load_campaigns(args.campaigns), workers=args.workers, output_file=args.output,
+                              core_rate=args.core_rate, search_rate=args.search_rate, output_format=args.format)
+        elif args.incremental:
+            sync_github_issues(workers=args.workers, output_csv_file=args.output, cache_file=args.cache_file,
+                               core_rate=args.core_rate, search_rate=args.search_rate, output_format=args.format)
+        else:
+            fetch_github_issues(workers=args.workers, output_csv_file=args.output,
+                                core_rate=args.core_rate, search_rate=args.search_rate, output_format=args.format,
+                                backend=args.backend, graphql_rate=args.graphql_rate)
 
 
 if __name__ == "__main__":
-    fetch_github_issues()
+    main()
@@ -0,0 +1,158 @@
+from datetime import datetime
+
+# GraphQL backend for the GitHub collector.
+#
+# The REST collector needs one timeline request per issue (plus PyGithub's lazy loads) to find
+# the PRs that cross-reference it. Here one GraphQL search request returns a whole page of
+# issues (SEARCH_PAGE_SIZE of them) with their labels, assignees, milestone and the PR
+# sources of their CrossReferencedEvents. Only issues with more cross-references than fit in
+# the first page of their timeline need follow-up IssueTimeline requests.
+#
+# Issues come back as GraphQLIssue objects, which have the attributes issue_row() reads from
+# PyGithub issues, so both backends produce the same rows.
+
+SEARCH_PAGE_SIZE = 50  # Issues per search request (GitHub allows up to 100)
+TIMELINE_PAGE_SIZE = 50  # Cross-references per issue and request
+
+_CROSS_REFERENCES = """
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on CrossReferencedEvent {
+        source {
+          __typename
+          ... on PullRequest { url state createdAt author { login } }
+        }
+      }
+    }
+"""
+
+SEARCH_ISSUES_QUERY = """
+query SearchIssues($query: String!, $first: Int!, $after: String, $timelineFirst: Int!) {
+  search(query: $query, type: ISSUE, first: $first, after: $after) {
+    issueCount
+    pageInfo { hasNextPage endCursor }
+    nodes {
+      ... on Issue {
+        number
+        title
+        url
+        state
+        createdAt
+        closedAt
+        updatedAt
+        body
+        repository { nameWithOwner }
+        labels(first: 100) { nodes { name } }
+        assignees(first: 100) { nodes { login } }
+        milestone { title }
+        timelineItems(itemTypes: [CROSS_REFERENCED_EVENT], first: $timelineFirst) {%s}
+      }
+    }
+  }
+}
+""" % _CROSS_REFERENCES
+
+ISSUE_TIMELINE_QUERY = """
+query IssueTimeline($owner: String!, $name: String!, $number: Int!, $first: Int!, $after: String) {
+  repository(owner: $owner, name: $name) {
+    issue(number: $number) {
+      timelineItems(itemTypes: [CROSS_REFERENCED_EVENT], first: $first, after: $after) {%s}
+    }
+  }
+}
+""" % _CROSS_REFERENCES
+
+
+class _Named:
+    """Stand-in for PyGithub's Label, NamedUser and Milestone: just the attribute we read."""
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+
+def _datetime(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+class GraphQLIssue:
+    """An issue from a GraphQL search, with the attributes of a PyGithub Issue that issue_row() uses."""
+
+    def __init__(self, node):
+        self.number = node["number"]
+        self.title = node["title"]
+        self.html_url = node["url"]
+        self.state = node["state"].lower()
+        self.created_at = _datetime(node["createdAt"])
+        self.closed_at = _datetime(node["closedAt"])
+        self.updated_at = _datetime(node.get("updatedAt"))
+        self.body = node["body"]
+        self.repository_name = node["repository"]["nameWithOwner"]
+        self.labels = [_Named(name=label["name"]) for label in node["labels"]["nodes"]]
+        self.assignees = [_Named(login=assignee["login"]) for assignee in node["assignees"]["nodes"]]
+        self.milestone = _Named(title=node["milestone"]["title"]) if node["milestone"] else None
+
+
+def linked_prs_from_cross_references(nodes, linked_prs_info=None):
+    """Linked PR entries of the PRs among CrossReferencedEvent nodes, like the REST backend's."""
+    if linked_prs_info is None:
+        linked_prs_info = []
+    for node in nodes:
+        source = node.get("source") or {}
+        if source.get("__typename") != "PullRequest":
+            continue
+        pr_author = (source.get("author") or {}).get("login") or "N/A"
+        # REST reports merged PRs as closed
+        pr_state = "closed" if source["state"] in ("CLOSED", "MERGED") else "open"
+        pr_info = f"{source['url']};{pr_author};{pr_state};{(source.get('createdAt') or '')[:10]}"
+        if pr_info not in linked_prs_info:  # Avoid duplicates
+            linked_prs_info.append(pr_info)
+    return linked_prs_info
+
+
+def _query(requester, scheduler, query, variables):
+    if scheduler is None:
+        return requester.graphql_query(query, variables)[1]["data"]
+    return scheduler.call("graphql", requester.graphql_query, query, variables)[1]["data"]
+
+
+def _remaining_cross_references(requester, scheduler, issue, cursor, linked_prs_info):
+    owner, name = issue.repository_name.split("/")
+    while cursor:
+        data = _query(requester, scheduler, ISSUE_TIMELINE_QUERY, {
+            "owner": owner, "name": name, "number": issue.number, "first": TIMELINE_PAGE_SIZE, "after": cursor,
+        })
+        timeline = data["repository"]["issue"]["timelineItems"]
+        linked_prs_from_cross_references(timeline["nodes"], linked_prs_info)
+        cursor = timeline["pageInfo"]["endCursor"] if timeline["pageInfo"]["hasNextPage"] else None
+
+
+def iter_issues(requester, scheduler, query, page_size=SEARCH_PAGE_SIZE):
+    """
+    Yields (GraphQLIssue, linked_prs_info) for every issue matching a search query, in search order.
+
+    `requester` is a PyGithub Requester (Github(...).requester); requests go through
+    `scheduler` (a RequestScheduler) when one is given.
+    """
+    cursor = None
+    first_page = True
+    while True:
+        data = _query(requester, scheduler, SEARCH_ISSUES_QUERY, {
+            "query": query, "first": page_size, "after": cursor, "timelineFirst": TIMELINE_PAGE_SIZE,
+        })
+        search = data["search"]
+        if first_page:
+            print(f"Found {search['issueCount']} issues matching the query.")
+            first_page = False
+        for node in search["nodes"]:
+            if not node:  # Not an Issue (a PR matched the query)
+                continue
+            issue = GraphQLIssue(node)
+            timeline = node["timelineItems"]
+            linked_prs_info = linked_prs_from_cross_references(timeline["nodes"])
+            if timeline["pageInfo"]["hasNextPage"]:
+                _remaining_cross_references(requester, scheduler, issue, timeline["pageInfo"]["endCursor"],
+                                            linked_prs_info)
+            yield issue, linked_prs_info
+        if not search["pageInfo"]["hasNextPage"]:
+            return
+        cursor = search["pageInfo"]["endCursor"]
@@ -0,0 +1,323 @@
+import gzip
+import hashlib
+import json
+import socket
+import threading
+import time
+import argparse
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+
+# Record/replay of GitHub API traffic, so the collector can be run and benchmarked without
+# a token or network access.
+#
+# RecordingProxy forwards every request to an upstream API (api.github.com, or a
+# FakeGitHubServer) and writes each exchange to a fixture file; ReplayServer answers the
+# same requests from that file alone. Point GITHUB_API_URL at either one. Fixtures are
+# gzip-compressed JSON lines: a header line with the upstream URL, then one exchange per
+# line, keyed by method, path with sorted query, If-None-Match and a digest of the body
+# (GraphQL queries are all POST /graphql and only differ there). Authorization headers are
+# never stored, and upstream URLs are rewritten to the serving address in both directions.
+#
+# A request that was recorded several times (/rate_limit, or a search during successive
+# incremental syncs) replays its responses in recorded order, then repeats the last one.
+# ReplayServer can add a fixed latency, and either replays the recorded X-RateLimit-*
+# headers (with resets moved relative to now) or emulates its own quotas, answering like
+# api.github.com once one is used up: 403 "rate limit exceeded" for REST requests, 200 with a
+# RATE_LIMITED error for GraphQL queries.
+
+FIXTURE_VERSION = 1
+FIXTURE_EXTENSION = ".jsonl.gz"
+KEPT_HEADERS = ("Content-Type", "Link", "ETag", "Last-Modified", "Retry-After", "X-RateLimit-Limit",
+                "X-RateLimit-Remaining", "X-RateLimit-Reset", "X-RateLimit-Used", "X-RateLimit-Resource")
+DEFAULT_QUOTAS = {"core": (5000, 3600), "search": (30, 60), "graphql": (5000, 3600)}  # (limit, seconds)
+
+
+def request_key(method, path, body=b"", if_none_match=None):
+    """Key of a request in a fixture file: method, path with sorted query, ETag and body digest."""
+    parts = urlsplit(path)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method} {parts.path}?{query}" if query else f"{method} {parts.path}"
+    if if_none_match:
+        key += f" If-None-Match:{if_none_match}"
+    if body:
+        try:  # JSON bodies may serialize their keys in any order
+            body = json.dumps(json.loads(body), sort_keys=True).encode("utf-8")
+        except ValueError:
+            pass
+        key += " " + hashlib.sha1(body).hexdigest()
+    return key
+
+
+def resource_of(path, headers=()):
+    """API quota a request counts against: the X-RateLimit-Resource header, or guessed from the path."""
+    for name, value in headers:
+        if name.lower() == "x-ratelimit-resource":
+            return value
+    path = urlsplit(path).path
+    if path.startswith("/search/"):
+        return "search"
+    return "graphql" if path == "/graphql" else "core"
+
+
+def load_fixture(path):
+    """(header, {request key: [exchange, ...]}) of a fixture file."""
+    exchanges = {}
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("fixture_version") != FIXTURE_VERSION:
+            raise ValueError(f"{path} is not a version {FIXTURE_VERSION} fixture file")
+        for line in f:
+            exchange = json.loads(line)
+            exchanges.setdefault(exchange["key"], []).append(exchange)
+    return header, exchanges
+
+
+class _LocalServer(ABC):
+    """Threaded keep-alive HTTP server on a local port, usable as a context manager."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.request_count = 0
+        self.connection_count = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @abstractmethod
+    def respond(self, handler, method, body):
+        """(status, headers, body) to send back for the request `handler` is serving."""
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connection_count += 1
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def send(self, status, headers, body):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def handle_method(self, method):
+                with server._lock:
+                    server.request_count += 1
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else b""
+                self.send(*server.respond(self, method, body))
+
+            def do_GET(self):
+                self.handle_method("GET")
+
+            def do_POST(self):
+                self.handle_method("POST")
+
+        return Handler
+
+
+class RecordingProxy(_LocalServer):
+    """
+    Forwards requests to `upstream` and records every exchange into `fixture_file`.
+
+    Use as a context manager; the fixture is complete once the proxy is stopped.
+    """
+
+    def __init__(self, upstream, fixture_file, host="127.0.0.1", port=0):
+        super().__init__(host, port)
+        self.upstream = upstream.rstrip("/")
+        self.fixture_file = fixture_file
+        self._local = threading.local()  # One upstream session (and connection pool) per handler thread
+        self._fixture = gzip.open(fixture_file, "wt", encoding="utf-8")
+        self._fixture.write(json.dumps({"fixture_version": FIXTURE_VERSION, "upstream": self.upstream,
+                                        "recorded_at": time.time()}) + "\n")
+
+    def stop(self):
+        super().stop()
+        self.close_fixture()
+
+    def close_fixture(self):
+        with self._lock:
+            self._fixture.close()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def respond(self, handler, method, body):
+        forwarded = {name: value for name, value in handler.headers.items()
+                     if name.lower() not in ("host", "content-length", "connection", "accept-encoding")}
+        response = self._session().request(method, self.upstream + handler.path, headers=forwarded,
+                                           data=body or None, allow_redirects=False)
+        headers = [(name, response.headers[name]) for name in KEPT_HEADERS if name in response.headers]
+        text = response.content.decode("utf-8")
+        now = time.time()
+        # Resets are stored as seconds from the response, so replays can move them to their own time
+        stored_headers = [(name, str(int(value) - int(now)) if name == "X-RateLimit-Reset" else value)
+                          for name, value in headers]
+        exchange = {"key": request_key(method, handler.path, body, handler.headers.get("If-None-Match")),
+                    "status": response.status_code, "headers": stored_headers, "body": text}
+        with self._lock:
+            self._fixture.write(json.dumps(exchange) + "\n")
+        # The client must keep talking to the proxy, including when following Link headers
+        headers = [(name, value.replace(self.upstream, self.url)) for name, value in headers]
+        return response.status_code, headers, text.replace(self.upstream, self.url).encode("utf-8")
+
+
+class ReplayServer(_LocalServer):
+    """
+    Answers GitHub API requests from a fixture file recorded by RecordingProxy.
+
+    Every response is delayed by `latency` seconds. `quotas` maps resources ("core",
+    "search", "graphql") to (limit, window seconds) to emulate rate limits for them; other
+    resources replay their recorded X-RateLimit-* headers. Requests missing from the
+    fixture get a 404 and are listed in `missing`.
+    """
+
+    def __init__(self, fixture_file, latency=0.0, quotas=None, host="127.0.0.1", port=0):
+        super().__init__(host, port)
+        header, self.exchanges = load_fixture(fixture_file)
+        self.upstream = header["upstream"]
+        self.latency = latency
+        self.quotas = dict(quotas or {})
+        self.used = {resource: 0 for resource in self.quotas}
+        self.window_start = {resource: time.time() for resource in self.quotas}
+        self.replayed = {}  # Request key -> number of times replayed
+        self.missing = []
+        self.rate_limited_count = 0
+
+    def _take_quota(self, resource):
+        """Counts a request against an emulated quota: (allowed, X-RateLimit-* headers)."""
+        limit, window = self.quotas[resource]
+        now = time.time()
+        with self._lock:
+            if now - self.window_start[resource] >= window:
+                self.window_start[resource] = now
+                self.used[resource] = 0
+            allowed = self.used[resource] < limit
+            if allowed:
+                self.used[resource] += 1
+            else:
+                self.rate_limited_count += 1
+            used = self.used[resource]
+            reset = int(self.window_start[resource] + window) + 1
+        return allowed, [("X-RateLimit-Limit", str(limit)), ("X-RateLimit-Remaining", str(limit - used)),
+                         ("X-RateLimit-Reset", str(reset)), ("X-RateLimit-Used", str(used)),
+                         ("X-RateLimit-Resource", resource)]
+
+    def respond(self, handler, method, body):
+        if self.latency:
+            time.sleep(self.latency)
+        key = request_key(method, handler.path, body, handler.headers.get("If-None-Match"))
+        with self._lock:
+            recorded = self.exchanges.get(key)
+            if recorded:
+                exchange = recorded[min(self.replayed.get(key, 0), len(recorded) - 1)]
+                self.replayed[key] = self.replayed.get(key, 0) + 1
+            else:
+                self.missing.append(key)
+        if not recorded:
+            data = json.dumps({"message": f"No recorded response for {key}"}).encode("utf-8")
+            return 404, [("Content-Type", "application/json; charset=utf-8")], data
+
+        now = int(time.time())
+        headers = [(name, str(now + int(value)) if name == "X-RateLimit-Reset" else value.replace(self.upstream,
+                                                                                                  self.url))
+                   for name, value in exchange["headers"]]
+        resource = resource_of(handler.path, exchange["headers"])
+        if resource in self.quotas:
+            allowed, quota_headers = self._take_quota(resource)
+            if not allowed:
+                status, data = 403, {"message": "API rate limit exceeded (replayed fixture quota)",
+                                     "documentation_url": "https://docs.github.com/rest/rate-limit"}
+                if resource == "graphql":
+                    status, data = 200, {"errors": [{"type": "RATE_LIMITED",
+                                                     "message": "API rate limit exceeded (replayed fixture quota)"}]}
+                return status, [("Content-Type", "application/json; charset=utf-8")] + quota_headers, \
+                    json.dumps(data).encode("utf-8")
+            headers = [(name, value) for name, value in headers if not name.startswith("X-RateLimit-")]
+            headers += quota_headers
+        return exchange["status"], headers, exchange["body"].replace(self.upstream, self.url).encode("utf-8")
+
+
+def parse_quota(text):
+    """'search=30/60' -> ('search', (30, 60))."""
+    resource, _, limit = text.partition("=")
+    limit, _, window = limit.partition("/")
+    if resource not in DEFAULT_QUOTAS or not limit.isdigit() or (window and not window.isdigit()):
+        raise argparse.ArgumentTypeError(f"expected RESOURCE=LIMIT[/SECONDS] with RESOURCE one of "
+                                         f"{', '.join(DEFAULT_QUOTAS)}, got '{text}'")
+    return resource, (int(limit), int(window) if window else DEFAULT_QUOTAS[resource][1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record GitHub API traffic into a fixture file, or replay one.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    record_parser = subparsers.add_parser("record", help="Proxy to the GitHub API and record the traffic.")
+    record_parser.add_argument("fixture", help=f"Fixture file to write (*{FIXTURE_EXTENSION}).")
+    record_parser.add_argument("--upstream", default="https://api.github.com")
+    record_parser.add_argument("--port", type=int, default=8001)
+    replay_parser = subparsers.add_parser("replay", help="Serve the responses of a fixture file.")
+    replay_parser.add_argument("fixture")
+    replay_parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep before each response.")
+    replay_parser.add_argument("--quota", type=parse_quota, action="append", default=[],
+                               metavar="RESOURCE=LIMIT[/SECONDS]",
+                               help="Emulate a rate-limit quota instead of replaying the recorded headers "
+                                    "(e.g. search=30/60); may be repeated.")
+    replay_parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        server = RecordingProxy(args.upstream, args.fixture, port=args.port)
+        print(f"Recording {args.upstream} into '{args.fixture}' through {server.url}. Ctrl+C to stop.")
+        print(f"Run the collector with: GITHUB_API_URL={server.url} python gather_issue_data.py")
+    else:
+        server = ReplayServer(args.fixture, latency=args.latency, quotas=dict(args.quota), port=args.port)
+        print(f"Replaying {sum(map(len, server.exchanges.values()))} responses from '{args.fixture}' "
+              f"at {server.url} (latency {args.latency}s). Ctrl+C to stop.")
+        print(f"Run the collector with: GITHUB_TOKEN=dummy GITHUB_API_URL={server.url} python gather_issue_data.py")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        if args.command == "record":
+            server.close_fixture()
+        else:
+            print(f"Served {server.request_count} requests, {len(server.missing)} missing from the fixture.")
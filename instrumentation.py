@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+# Timing and resource instrumentation shared by the pipeline scripts (gather, dataset,
+# statistics, timeline, charts and report).
+#
+# Scripts mark their work with `with stage("parse report"):` blocks, and generator
+# pipelines wrap each of their steps with traced("search", iterable). A stage records its wall
+# time, the part of it not spent in nested stages (self time), the counters added with
+# count(rows=..., api_calls=..., bytes=...) while it was the innermost stage, and the peak
+# RSS of the process when it ends. Stages run in worker threads are recorded as well (their
+# totals add up every thread's time, so their share of the run can pass 100%), and
+# watch_github() counts the responses of a PyGithub client and their size.
+#
+# Recording is always on and costs a few perf_counter() calls per stage. Nothing is printed
+# or written unless a script is run with:
+#   --trace FILE     the stage totals and every stage as a timed event, as JSON, or with
+#                    --trace-format chrome in Chrome's trace event format (chrome://tracing,
+#                    ui.perfetto.dev);
+#   --profile        the stage summary plus the hottest functions under cProfile (main thread);
+#   --trace-memory   tracemalloc: peak Python allocations per stage and the top allocation sites.
+
+TRACE_FORMATS = ("json", "chrome")
+PROFILE_TOP = 25  # Functions listed by --profile
+MEMORY_TOP = 10  # Allocation sites listed by --trace-memory
+
+
+def peak_rss_kb(children=False):
+    """High-water mark of the resident set size of this process (or its finished children), in KB."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS reports bytes
+
+
+class _Frame:
+    __slots__ = ("name", "start", "child_seconds", "counters")
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.child_seconds = 0.0
+        self.counters = {}
+
+
+class Tracer:
+    """Per-stage times and counters of one run; see the module comment."""
+
+    def __init__(self, name="run", keep_events=False):
+        self.name = name
+        self.keep_events = keep_events  # Only needed for --trace files; totals are always kept
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.events = []  # [name, thread id, start offset, seconds, args] of each finished stage
+        self.totals = {}  # Stage name -> calls, seconds, self_seconds and counters
+        self.counters = {}  # Counters of the whole run
+        self.trace_memory = False
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter(self, name):
+        frame = _Frame(name)
+        self._stack().append(frame)
+        return frame
+
+    def _exit(self, frame):
+        """Pops `frame`; returns (seconds, self seconds)."""
+        seconds = time.perf_counter() - frame.start
+        stack = self._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_seconds += seconds
+        return seconds, seconds - frame.child_seconds
+
+    def _add_totals(self, name, seconds, self_seconds, counters, calls=1):
+        with self._lock:
+            totals = self.totals.setdefault(name, {"calls": 0, "seconds": 0.0, "self_seconds": 0.0})
+            totals["calls"] += calls
+            totals["seconds"] += seconds
+            totals["self_seconds"] += self_seconds
+            for key, value in counters.items():
+                totals[key] = totals.get(key, 0) + value
+
+    def _add_event(self, name, start, seconds, args):
+        if not self.keep_events:
+            return
+        args["peak_rss_kb"] = peak_rss_kb()
+        if self.trace_memory and tracemalloc.is_tracing():
+            args["python_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        with self._lock:
+            self.events.append([name, threading.get_ident(), start - self.started, seconds, args])
+
+    @contextmanager
+    def stage(self, name):
+        frame = self._enter(name)
+        try:
+            yield frame
+        finally:
+            seconds, self_seconds = self._exit(frame)
+            self._add_totals(name, seconds, self_seconds, frame.counters)
+            self._add_event(name, frame.start, seconds, dict(frame.counters, self_seconds=self_seconds))
+
+    def traced(self, name, iterable):
+        """Yields the items of `iterable`, timing each step as part of one stage `name`."""
+        iterator = iter(iterable)
+        start = time.perf_counter()
+        seconds = self_seconds = 0.0
+        counters = {}
+        items = 0
+        try:
+            while True:
+                frame = self._enter(name)
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    step_seconds, step_self_seconds = self._exit(frame)
+                    seconds += step_seconds
+                    self_seconds += step_self_seconds
+                    for key, value in frame.counters.items():
+                        counters[key] = counters.get(key, 0) + value
+                items += 1
+                yield item
+        finally:
+            counters["items"] = items
+            self._add_totals(name, seconds, self_seconds, counters)
+            self._add_event(name, start, time.perf_counter() - start,
+                            dict(counters, busy_seconds=seconds, self_seconds=self_seconds))
+
+    def count(self, **counters):
+        stack = self._stack()
+        with self._lock:
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+                if stack:
+                    stack[-1].counters[key] = stack[-1].counters.get(key, 0) + value
+
+    def summary(self):
+        seconds = time.perf_counter() - self.started
+        with self._lock:
+            stages = {name: dict(totals, share=totals["self_seconds"] / seconds if seconds else 0.0)
+                      for name, totals in self.totals.items()}
+            counters = dict(self.counters)
+        summary = {"script": self.name, "argv": sys.argv, "started_at": self.started_at, "seconds": seconds,
+                   "peak_rss_kb": peak_rss_kb(), "children_peak_rss_kb": peak_rss_kb(children=True),
+                   "counters": counters, "stages": stages}
+        if self.trace_memory and tracemalloc.is_tracing():
+            summary["python_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        return summary
+
+    def trace(self, trace_format="json"):
+        """The run as a JSON-serializable dict, in our format or Chrome's trace event format."""
+        summary = self.summary()
+        if trace_format == "json":
+            events = [{"name": name, "thread": thread, "start": start, "seconds": seconds, "args": args}
+                      for name, thread, start, seconds, args in self.events]
+            return {"summary": summary, "events": events}
+        pid = os.getpid()
+        threads = {threading.main_thread().ident: 0}
+        for event in self.events:
+            threads.setdefault(event[1], len(threads))
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": self.name}}]
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": number,
+                    "args": {"name": "main" if number == 0 else f"worker {number}"}}
+                   for thread, number in threads.items()]
+        events += [{"name": name, "ph": "X", "pid": pid, "tid": threads[thread], "ts": start * 1e6,
+                    "dur": seconds * 1e6, "args": args} for name, thread, start, seconds, args in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": summary}
+
+    def write(self, path, trace_format="json"):
+        tmp_file = path + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.trace(trace_format), f, default=str)
+        os.replace(tmp_file, path)
+
+    def print_summary(self):
+        summary = self.summary()
+        print(f"\n--- {self.name}: {summary['seconds']:.2f}s, peak RSS {summary['peak_rss_kb'] or 0} KB ---")
+        print(f"{'stage':<24} {'calls':>6} {'seconds':>8} {'self s':>8} {'self %':>7} "
+              f"{'rows':>8} {'API calls':>9} {'KB in':>8}")
+        for name, totals in sorted(summary["stages"].items(), key=lambda item: -item[1]["self_seconds"]):
+            rows = totals.get("rows", totals.get("items", ""))
+            kb = f"{totals['bytes'] / 1024:.0f}" if "bytes" in totals else ""
+            print(f"{name:<24} {totals['calls']:>6} {totals['seconds']:>8.3f} {totals['self_seconds']:>8.3f} "
+                  f"{totals['share']:>7.1%} {rows:>8} {totals.get('api_calls', ''):>9} {kb:>8}")
+        if summary["counters"]:
+            print("Totals: " + ", ".join(f"{key} {value}" for key, value in sorted(summary["counters"].items())))
+
+
+_tracer = Tracer()
+
+
+def current():
+    return _tracer
+
+
+def stage(name):
+    """Context manager timing a stage of the current run."""
+    return _tracer.stage(name)
+
+
+def traced(name, iterable):
+    """Wraps an iterable (a pipeline generator) so the time spent producing its items is a stage."""
+    return _tracer.traced(name, iterable)
+
+
+def count(**counters):
+    """Adds to counters (rows=, api_calls=, bytes=...) of the innermost stage of this thread and of the run."""
+    _tracer.count(**counters)
+
+
+def watch_github(requester):
+    """Counts every response of a PyGithub Requester as an API call, with its size in bytes."""
+    on_response = requester.DEBUG_ON_RESPONSE  # Called for every response, debugging on or not
+
+    def counting_on_response(status, headers, data):
+        size = headers.get("content-length")
+        count(api_calls=1, bytes=int(size) if size else len(data) if isinstance(data, str) else 0)
+        on_response(status, headers, data)
+
+    requester.DEBUG_ON_RESPONSE = counting_on_response
+    return requester
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--trace", metavar="FILE", help="Write per-stage times and counters to FILE.")
+    group.add_argument("--trace-format", choices=TRACE_FORMATS, default="json",
+                       help="json, or chrome for chrome://tracing and ui.perfetto.dev (default: json).")
+    group.add_argument("--profile", action="store_true",
+                       help="Print where the time went: stage summary and hottest functions (cProfile).")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="Track Python allocations with tracemalloc (slower); print the top sites.")
+
+
+@contextmanager
+def session(args, name):
+    """
+    Instrumented run of a script: starts a new trace, and the profilers the --profile and
+    --trace-memory flags of `args` ask for; prints and writes the results at the end.
+    """
+    global _tracer
+    _tracer = Tracer(name, keep_events=bool(args.trace))
+    profiler = cProfile.Profile() if args.profile else None
+    if args.trace_memory:
+        tracemalloc.start()
+        _tracer.trace_memory = True
+    if profiler:
+        profiler.enable()
+    try:
+        with _tracer.stage(name):
+            yield _tracer
+    finally:
+        if profiler:
+            profiler.disable()
+        if args.profile or args.trace_memory:
+            _tracer.print_summary()
+        if profiler:
+            print(f"\nTop {PROFILE_TOP} functions by cumulative time:")
+            pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        if args.trace_memory:
+            print(f"Top {MEMORY_TOP} allocation sites still alive "
+                  f"(peak {tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f} MB):")
+            for statistic in tracemalloc.take_snapshot().statistics("lineno")[:MEMORY_TOP]:
+                print(f"  {statistic}")
+        if args.trace:
+            _tracer.write(args.trace, args.trace_format)
+            print(f"Wrote the {args.trace_format} trace to '{args.trace}'")
+        if args.trace_memory:
+            tracemalloc.stop()
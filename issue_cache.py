@@ -0,0 +1,76 @@
+import json
+import os
+from datetime import datetime, timezone
+
+# Persistent per-issue cache used by gather_issue_data.py for incremental syncs.
+# Layout of the JSON file:
+#   {"last_sync": "2025-01-31T12:00:00Z", "query": "...",
+#    "issues": {"126219": {"row": {...CSV row...}, "linked_prs": [...],
+#                          "updated_at": "...", "timeline_etags": ["W/\"...\"", ...]}}}
+# with the ETag of every page of the issue's timeline, in page order.
+
+
+def utc_now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class IssueCache:
+    """Issue rows, linked PRs, `updated_at` and timeline page ETags keyed by issue number."""
+
+    def __init__(self, path):
+        self.path = path
+        self.last_sync = None
+        self.query = None
+        self.issues = {}
+
+    @classmethod
+    def load(cls, path):
+        cache = cls(path)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            cache.last_sync = data.get("last_sync")
+            cache.query = data.get("query")
+            cache.issues = {int(number): entry for number, entry in data.get("issues", {}).items()}
+        return cache
+
+    def save(self):
+        # Write to a temporary file first so an interrupted save never corrupts the cache
+        tmp_path = f"{self.path}.tmp"
+        data = {
+            "last_sync": self.last_sync,
+            "query": self.query,
+            "issues": {str(number): self.issues[number] for number in sorted(self.issues)},
+        }
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def reset_if_query_changed(self, query):
+        """A different search query invalidates everything cached for the previous one."""
+        if self.query != query:
+            self.issues = {}
+            self.last_sync = None
+            self.query = query
+
+    def get(self, number):
+        return self.issues.get(number)
+
+    def store(self, number, row, linked_prs, updated_at, timeline_etags):
+        self.issues[number] = {
+            "row": row,
+            "linked_prs": linked_prs,
+            "updated_at": updated_at,
+            "timeline_etags": timeline_etags,
+        }
+
+    def retain(self, numbers):
+        """Evicts the issues not in `numbers` (no longer matched by the query); returns their numbers."""
+        evicted = sorted(number for number in self.issues if number not in numbers)
+        for number in evicted:
+            del self.issues[number]
+        return evicted
+
+    def rows(self):
+        """Cached CSV rows in issue number order, which matches the search's created-asc order."""
+        return [self.issues[number]["row"] for number in sorted(self.issues)]
@@ -0,0 +1,152 @@
+import re
+from collections import namedtuple
+
+# Rule engine that guesses an issue's kind, CPython versions and build configurations.
+#
+# The rules below are plain data. They are compiled once, at import time, into:
+#   - one regex per text source (title, body) that finds every keyword of every kind in a
+#     single scan. When a keyword of one kind could overlap a keyword of another (e.g. one
+#     ends with what the other starts with), the regex uses a lookahead so that every
+#     overlapping match is reported; otherwise it uses a plain, faster alternation;
+#   - a memoized per-label lookup, since the label vocabulary is small and repeats across
+#     issues, so each distinct label is analysed only once per process.
+#
+# Title and label rules reproduce the original guess_* helpers of gather_issue_data.py
+# exactly. Body rules only apply when the title and labels say nothing about the kind.
+# Bodies may be the CSV's '\\n'-escaped snippets; escapes are turned back into newlines
+# before matching, so that single-line rules can't span several lines.
+
+Classification = namedtuple("Classification", ["kind", "versions", "configurations"])
+
+# In priority order: when several kinds match, the first one wins.
+KIND_RULES = [
+    {
+        "kind": "Segfault/Crash",
+        "title": ["segfault", "segmentation fault", "crash"],
+        "labels": ["crash", "segfault"],
+        "body": [r"segmentation fault", r"\bsigsegv\b", r"\bsegfaults?\b"],
+    },
+    {
+        "kind": "Abort/AssertionError",
+        "title": ["assertionerror", "abort", "assert"],
+        "labels": ["assertionerror", "abort"],
+        "body": [r"assertion\W[^\n]{0,300}?\Wfailed", r"\baborted\b", r"\bsigabrt\b", r"assertionerror"],
+    },
+    {
+        "kind": "SystemError",
+        "title": ["systemerror", "system error"],
+        "labels": ["systemerror"],
+        "body": [r"\bsystemerror:"],
+    },
+    {
+        "kind": "Fatal Python Error",
+        "title": ["fatal python error", "fatal error"],
+        "labels": ["fatal-error"],
+        "body": [r"fatal python error"],
+    },
+]
+
+CONFIGURATION_RULES = [
+    {"configuration": "Free-threaded", "labels": ["free-threading", "freethreading"]},
+    {"configuration": "Debug Build", "labels": ["debug-build", "debug"]},  # "debug" might be too broad
+    {"configuration": "ASAN", "labels": ["asan", "addresssanitizer"]},
+    {"configuration": "JIT", "labels": ["jit"]},
+]
+
+VERSION_LABEL_PREFIXES = ("version-", "python-")  # e.g., version-3.12
+
+
+def _keywords_may_overlap(source):
+    """True if a keyword of one kind can share characters with a keyword of another kind."""
+    keywords = [(index, keyword) for index, rule in enumerate(KIND_RULES) for keyword in rule[source]]
+    for index, keyword in keywords:
+        for other_index, other in keywords:
+            if index == other_index:
+                continue
+            if keyword in other or any(keyword.endswith(other[:size]) for size in range(1, len(other))):
+                return True
+    return False
+
+
+def _compile_keyword_regex(source, literal):
+    """One regex matching any keyword of any kind; the named group tells which kind matched."""
+    alternatives = []
+    for index, rule in enumerate(KIND_RULES):
+        patterns = [re.escape(keyword) if literal else keyword for keyword in rule[source]]
+        alternatives.append(f"(?P<k{index}>{'|'.join(patterns)})")
+    combined = "|".join(alternatives)
+    # Overlaps can't be checked for arbitrary regexes, so those always get the lookahead
+    if not literal or _keywords_may_overlap(source):
+        return re.compile(f"(?=(?:{combined}))")
+    return re.compile(combined)
+
+
+_TITLE_REGEX = _compile_keyword_regex("title", literal=True)
+_BODY_REGEX = _compile_keyword_regex("body", literal=False)
+_LABEL_KINDS = {}
+for _index, _rule in enumerate(KIND_RULES):
+    for _label in _rule["labels"]:
+        _LABEL_KINDS.setdefault(_label, _index)
+_LABEL_CONFIGURATIONS = {
+    label: rule["configuration"] for rule in CONFIGURATION_RULES for label in rule["labels"]
+}
+_NO_KIND = len(KIND_RULES)
+
+
+def _best_kind_in_text(regex, text):
+    best = _NO_KIND
+    for match in regex.finditer(text):
+        index = int(match.lastgroup[1:])
+        if index < best:
+            best = index
+            if best == 0:
+                break
+    return best
+
+
+_LABEL_FACTS_CACHE = {}
+
+
+def label_facts(label):
+    """(kind index, version, configuration) contributed by one label; None where it says nothing."""
+    facts = _LABEL_FACTS_CACHE.get(label)
+    if facts is None:
+        facts = _LABEL_FACTS_CACHE[label] = _compute_label_facts(label)
+    return facts
+
+
+def _compute_label_facts(label):
+    label_lower = label.lower()
+    version = None
+    if label_lower.startswith(VERSION_LABEL_PREFIXES):
+        version = label_lower.replace("version-", "").replace("python-", "")
+    elif "3." in label_lower:  # crude catch for "3.12", "3.13" etc. if not formally labeled
+        parts = label_lower.split(".")
+        if len(parts) > 1 and parts[0] == "3" and parts[1].isdigit():
+            version = f"{parts[0]}.{parts[1]}"
+    return _LABEL_KINDS.get(label_lower, _NO_KIND), version, _LABEL_CONFIGURATIONS.get(label_lower)
+
+
+def classify(title, labels, body=""):
+    """Guesses kind, versions and configurations of an issue in one pass over its text and labels."""
+    kind_index = _best_kind_in_text(_TITLE_REGEX, title.lower()) if title else _NO_KIND
+    versions = set()
+    configurations = set()
+    cache = _LABEL_FACTS_CACHE
+    for label in labels:
+        facts = cache.get(label) or label_facts(label)
+        label_kind, version, configuration = facts
+        if label_kind < kind_index:
+            kind_index = label_kind
+        if version is not None:
+            versions.add(version)
+        if configuration is not None:
+            configurations.add(configuration)
+    if kind_index == _NO_KIND and body:
+        kind_index = _best_kind_in_text(_BODY_REGEX, body.lower().replace("\\n", "\n"))
+
+    return Classification(
+        KIND_RULES[kind_index]["kind"] if kind_index < _NO_KIND else "",
+        ";".join(sorted(versions)),
+        ";".join(sorted(configurations)),
+    )
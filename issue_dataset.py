@@ -0,0 +1,334 @@
+import os
+import json
+import hashlib
+import argparse
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.feather as feather
+
+import instrumentation
+from appendix_parser import iter_findings_from_file
+
+# Typed columnar dataset of the campaign's issues, stored as an uncompressed Arrow IPC
+# (Feather v2) file so readers can memory-map it and only touch the columns they ask for.
+#
+# The dataset is built from:
+#   - cpython_fusil_issues.csv (gather_issue_data.py output: commas, ISO dates),
+#   - cpython_fusil_report.csv (report spreadsheet export: semicolons, %d/%m/%Y dates),
+#   - cpython_report.curated.md (hand-curated kind, configuration, status, notes, MREs and
+#     PRs, in the Appendix format). The report itself is only an output of report_builder.py.
+# Rows are keyed by issue number. What GitHub knows (titles, dates, open/closed state) comes
+# from the collector, then the spreadsheet. The curated fields win over both CSVs (and their
+# PR listings keep their order and authors), but a curated Report Status that contradicts
+# the GitHub state is replaced by that state, with a warning (see reconcile_report_status()).
+#
+# Dates are timestamps, repeated strings are dictionary-encoded (pandas categoricals) and
+# labels, versions, configurations, assignees and PRs are real list columns, so scripts no
+# longer split strings or coerce dates on every run. 'Row Hash' changes whenever anything
+# else in the row does, so consumers can find changed issues by reading that column alone.
+
+DATASET_FILE = "cpython_fusil_issues.arrow"
+COLLECTOR_CSV_FILE = "cpython_fusil_issues.csv"
+REPORT_CSV_FILE = "cpython_fusil_report.csv"
+CURATED_FILE = "cpython_report.curated.md"
+
+PR_TYPE = pa.struct([
+    ("number", pa.int64()),
+    ("url", pa.string()),
+    ("authors", pa.list_(pa.string())),
+    ("status", pa.string()),
+    ("created", pa.timestamp("s")),  # Only the collector knows it (from the PR itself)
+])
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema([
+    ("Issue #", pa.int64()),
+    ("Finding", pa.int32()),  # Position in the report's Appendix, null if not in the report
+    ("Title", pa.string()),
+    ("HTML URL", pa.string()),
+    ("Date Filed", pa.timestamp("s")),
+    ("Closed Date", pa.timestamp("s")),
+    ("Status", CATEGORY),  # GitHub state: open / closed
+    ("Report Status", CATEGORY),  # Closed-Completed, Closed-Not-Planned, Open...
+    ("Kind", CATEGORY),  # Curated
+    ("Configuration", CATEGORY),  # Curated
+    ("Labels", pa.list_(pa.string())),
+    ("Assignees", pa.list_(pa.string())),
+    ("Milestone", pa.string()),
+    ("Body Snippet (MRE/Backtrace hint)", pa.string()),
+    ("Guessed Kind", CATEGORY),
+    ("Guessed CPython Versions", pa.list_(pa.string())),
+    ("Guessed Configurations", pa.list_(pa.string())),
+    ("Python Versions", pa.list_(pa.string())),  # Curated
+    ("PRs", pa.list_(PR_TYPE)),
+    ("MREs", pa.list_(pa.string())),  # Curated reproducers shown in the report
+    ("Backtraces", pa.list_(pa.string())),  # Curated backtraces shown in the report
+    ("Notes", pa.list_(pa.string())),  # Curated free-text remarks of the report's entry
+    ("Row Hash", pa.string()),  # Digest of all the other fields, to spot changed rows cheaply
+])
+COLUMNS = SCHEMA.names
+
+
+def _split(value, separator=";"):
+    return [part.strip() for part in value.split(separator) if part.strip()] if value else []
+
+
+def _date(value, date_format):
+    if not value:
+        return None
+    parsed = pd.to_datetime(value, format=date_format, errors='coerce')
+    return None if pd.isna(parsed) else parsed.to_pydatetime()
+
+
+def _pr_number(url):
+    tail = url.rstrip("/").rsplit("/", 1)[-1]
+    return int(tail) if tail.isdigit() else None
+
+
+def _merge_prs(existing, new, curated=False):
+    """
+    Adds PRs from `new` not already in `existing` (by URL), completing missing fields.
+
+    With `curated` (PRs listed in the curated findings), the non-empty fields of `new` win, its
+    authors come before any others and its PRs come first, in its order.
+    """
+    by_url = {pr["url"]: pr for pr in existing}
+    for pr in new:
+        known = by_url.get(pr["url"])
+        if known is None:
+            existing.append(pr)
+            by_url[pr["url"]] = pr
+            continue
+        for key, value in pr.items():
+            if key == "authors" and curated:
+                known[key] = value + [author for author in known[key] if author not in value]
+            elif value and (curated or not known[key]):
+                known[key] = value
+    if curated:
+        order = {pr["url"]: index for index, pr in enumerate(new)}
+        existing.sort(key=lambda pr: order.get(pr["url"], len(order)))  # Stable: the others keep their order
+    return existing
+
+
+def _empty_record(number):
+    record = {column: None for column in COLUMNS}
+    record["Issue #"] = number
+    for column in COLUMNS:
+        if pa.types.is_list(SCHEMA.field(column).type):
+            record[column] = []
+    return record
+
+
+def _fill(record, values, override=False):
+    """Sets each value of `values` that the record doesn't already have (every non-empty one with `override`)."""
+    for column, value in values.items():
+        if value not in (None, "", []) and (override or record[column] in (None, "", [])):
+            record[column] = value
+
+
+def _read_csv(path, sep):
+    return pd.read_csv(path, sep=sep, dtype=str, keep_default_na=False).to_dict("records")
+
+
+def import_collector_csv(records, path=COLLECTOR_CSV_FILE):
+    """Merges rows of a gather_issue_data.py CSV into `records` (issue number -> record)."""
+    for row in _read_csv(path, ","):
+        number = int(row["Issue #"])
+        record = records.setdefault(number, _empty_record(number))
+        prs = []
+        # 'Linked PRs Created' lists the PRs' creation dates in the same order. CSVs written before
+        # it existed don't have the column, and PRs whose date is unknown have an empty entry.
+        created_dates = [part.strip() for part in (row.get("Linked PRs Created") or "").split(" | ")]
+        for index, pr_info in enumerate(_split(row.get("Linked PRs (URL;Author;Status)", ""), " | ")):
+            url, author, status = (pr_info.split(";") + ["", ""])[:3]
+            created = created_dates[index] if index < len(created_dates) else ""
+            prs.append({"number": _pr_number(url), "url": url,
+                        "authors": [author] if author and author != "N/A" else [], "status": status,
+                        "created": _date(created, "%Y-%m-%d")})
+        _merge_prs(record["PRs"], prs)
+        _fill(record, {
+            "Title": row["Title"].strip(),
+            "HTML URL": row["HTML URL"],
+            "Date Filed": _date(row["Date Filed"], "%Y-%m-%d"),
+            "Closed Date": _date(row["Closed Date"], "%Y-%m-%d"),
+            "Status": row["Status"].lower(),
+            "Labels": _split(row["Labels"]),
+            "Assignees": _split(row["Assignees"]),
+            "Milestone": row.get("Milestone", ""),
+            "Body Snippet (MRE/Backtrace hint)": row.get("Body Snippet (MRE/Backtrace hint)", ""),
+            "Guessed Kind": row.get("Guessed Kind", ""),
+            "Guessed CPython Versions": _split(row.get("Guessed CPython Versions", "")),
+            "Guessed Configurations": _split(row.get("Guessed Configurations", "")),
+        })
+    return records
+
+
+def import_report_csv(records, path=REPORT_CSV_FILE):
+    """Merges rows of the report spreadsheet export (';'-separated, %d/%m/%Y dates) into `records`."""
+    for row in _read_csv(path, ";"):
+        number = int(row["Issue #"])
+        record = records.setdefault(number, _empty_record(number))
+        _fill(record, {
+            "Finding": int(row["Number"]) if row.get("Number", "").isdigit() else None,
+            "Title": row["Title"].strip(),
+            "HTML URL": row["HTML URL"],
+            "Date Filed": _date(row["Date Filed"], "%d/%m/%Y"),
+            "Closed Date": _date(row["Closed Date"], "%d/%m/%Y"),
+            "Status": row["Status"].lower(),
+            "Labels": _split(row["Labels"]),
+            "Assignees": _split(row["Assignees"]),
+            "Guessed Kind": row.get("Guessed Kind", ""),
+            "Guessed CPython Versions": _split(row.get("Guessed CPython Versions", "")),
+        })
+    return records
+
+
+def import_curated_findings(records, path=CURATED_FILE):
+    """Merges the curated findings into `records`, their curated fields winning over the CSVs."""
+    for finding in iter_findings_from_file(path):
+        number = finding["issue"]
+        record = records.setdefault(number, _empty_record(number))
+        _merge_prs(record["PRs"], [dict(pr, status="", created=None) for pr in finding["prs"]], curated=True)
+        _fill(record, {"Title": finding["title"], "HTML URL": finding["url"]})  # GitHub's win
+        _fill(record, {
+            "Finding": finding["finding"],
+            # Only given to correct GitHub's dates
+            "Date Filed": _date(finding["date_filed"], "%d/%m/%Y"),
+            "Closed Date": _date(finding["date_closed"], "%d/%m/%Y"),
+            "Report Status": finding["status"],
+            "Kind": finding["kind"],
+            "Configuration": finding["configuration"],
+            "Python Versions": finding["versions"],
+            "MREs": finding["mres"],
+            "Backtraces": finding["backtraces"],
+            "Notes": finding["notes"],
+        }, override=True)
+        if not record["Status"] and finding["status"]:
+            record["Status"] = "open" if finding["status"].lower() == "open" else "closed"
+    return records
+
+
+def reconcile_report_status(records):
+    """
+    Makes each 'Report Status' agree with the GitHub state in 'Status'.
+
+    A missing Report Status is derived from the state. One that says the issue is open when
+    it's closed (or the reverse) is stale: it becomes "Closed" (or "Open"), since only the
+    curator knows whether the issue was completed. Returns (issue, curated, used) for those.
+    """
+    conflicts = []
+    for number, record in records.items():
+        state = (record["Status"] or "").lower()
+        if state not in ("open", "closed"):
+            continue
+        curated = record["Report Status"] or ""
+        if curated and curated.lower().startswith("open") == (state == "open"):
+            continue
+        record["Report Status"] = state.title()
+        if curated:
+            conflicts.append((number, curated, record["Report Status"]))
+    return conflicts
+
+
+def row_hash(record):
+    """Digest of a record's fields (except the hash itself)."""
+    fields = {column: value for column, value in record.items() if column != "Row Hash"}
+    return hashlib.sha1(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def records_to_table(records):
+    """Arrow table of the merged records, sorted by issue number."""
+    rows = [records[number] for number in sorted(records)]
+    for row in rows:
+        row["Row Hash"] = row_hash(row)
+    columns = {column: [row[column] for row in rows] for column in COLUMNS}
+    arrays = []
+    for field in SCHEMA:
+        values = columns[field.name]
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+
+def build_dataset(dataset_file=DATASET_FILE, collector_csv=COLLECTOR_CSV_FILE, report_csv=REPORT_CSV_FILE,
+                  curated_file=CURATED_FILE):
+    """Imports every source that exists and writes the dataset. Returns the table."""
+    records = {}
+    if os.path.exists(collector_csv):
+        with instrumentation.stage("parse collector csv"):
+            import_collector_csv(records, collector_csv)
+    if os.path.exists(report_csv):
+        with instrumentation.stage("parse report csv"):
+            import_report_csv(records, report_csv)
+    if os.path.exists(curated_file):
+        with instrumentation.stage("parse curated findings"):
+            import_curated_findings(records, curated_file)
+    for number, curated, used in reconcile_report_status(records):
+        print(f"Warning: #{number} is {used.lower()} on GitHub but its curated Status is '{curated}'; "
+              f"using '{used}'. Update '{curated_file}'.")
+    with instrumentation.stage("build table"):
+        table = records_to_table(records)
+        instrumentation.count(rows=table.num_rows)
+    with instrumentation.stage("write dataset"):
+        tmp_file = dataset_file + ".tmp"
+        # Uncompressed so the file can be memory-mapped and read without copies
+        feather.write_feather(table, tmp_file, compression="uncompressed")
+        os.replace(tmp_file, dataset_file)
+    return table
+
+
+def dataset_is_stale(dataset_file=DATASET_FILE, sources=(COLLECTOR_CSV_FILE, REPORT_CSV_FILE, CURATED_FILE)):
+    if not os.path.exists(dataset_file):
+        return True
+    with pa.memory_map(dataset_file) as source:
+        if not ipc.open_file(source).schema.equals(SCHEMA):  # Written before a schema change
+            return True
+    dataset_mtime = os.path.getmtime(dataset_file)
+    return any(os.path.exists(source) and os.path.getmtime(source) > dataset_mtime for source in sources)
+
+
+def load_table(columns=None, dataset_file=DATASET_FILE, rebuild_if_stale=True):
+    """
+    The dataset (or only `columns` of it) as a memory-mapped Arrow table.
+
+    The dataset is rebuilt first when it's missing or older than the CSVs or curated
+    findings it's imported from.
+    """
+    if rebuild_if_stale and dataset_file == DATASET_FILE and dataset_is_stale(dataset_file):
+        print(f"Building '{dataset_file}' from the CSVs and curated findings...")
+        build_dataset(dataset_file)
+    with instrumentation.stage("load dataset"):
+        table = feather.read_table(dataset_file, columns=columns, memory_map=True)
+        instrumentation.count(rows=table.num_rows)
+    return table
+
+
+def load_issues(columns=None, dataset_file=DATASET_FILE, rebuild_if_stale=True):
+    """
+    Loads the dataset (or only `columns` of it) as a DataFrame, memory-mapping the file.
+
+    Dates come back as datetime64 columns, dictionary columns as categoricals and list
+    columns as Python lists.
+    """
+    table = load_table(columns, dataset_file, rebuild_if_stale)
+    with instrumentation.stage("to pandas"):
+        return table.to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the columnar issue dataset from the CSVs and curated findings.")
+    parser.add_argument("--output", default=DATASET_FILE)
+    parser.add_argument("--collector-csv", default=COLLECTOR_CSV_FILE)
+    parser.add_argument("--report-csv", default=REPORT_CSV_FILE)
+    parser.add_argument("--curated", default=CURATED_FILE)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.session(args, "issue_dataset"):
+        built = build_dataset(args.output, args.collector_csv, args.report_csv, args.curated)
+    print(f"Saved {built.num_rows} issues ({built.num_columns} columns) to '{args.output}' "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
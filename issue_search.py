@@ -0,0 +1,310 @@
+import re
+import os
+import json
+import time
+import sqlite3
+import argparse
+
+# Full-text search over the campaign's issues, with structured filters.
+#
+# Every issue of the dataset (issue_dataset.py: the collector and report CSVs merged with
+# the report's Appendix) is stored in a SQLite database: its kind, configuration, status,
+# dates and Python versions in plain indexed tables, and its title, body, reproducers,
+# backtraces and notes in an FTS5 table whose rowid is the issue number. Underscores are
+# part of tokens, so `_PyEval_EvalFrameDefault` and `_interpreters` are single terms that
+# match exactly (or by prefix with a trailing '*'), while dots and parentheses split
+# `_interpreters.exec()` into `_interpreters` and `exec`.
+#
+#   python issue_search.py update
+#   python issue_search.py query _PyEval_EvalFrameDefault --kind "Segmentation Fault"
+#   python issue_search.py query "_interpreters*" --version 3.14 --status open --since 2025-01-01
+#
+# update is incremental: it reads the 'Row Hash' column of the dataset and only rewrites
+# the issues whose hash changed (and drops the ones that left the dataset). Queries are an
+# FTS5 MATCH ranked with bm25 plus indexed filters, so they stay at a few milliseconds
+# with tens of thousands of crash reports; see benchmarks/bench_issue_search.py.
+
+INDEX_FILE = "issue_search.sqlite3"
+INDEX_VERSION = 1  # Bump when the schema or the indexed text changes, so the index is rebuilt
+LIMIT = 20
+TEXT_COLUMNS = ("title", "body", "mre", "backtrace", "notes")
+RANK_WEIGHTS = (10.0, 1.0, 2.0, 2.0, 1.0)  # bm25 weight of each text column: title matches rank first
+DATASET_COLUMNS = ['Issue #', 'Title', 'HTML URL', 'Date Filed', 'Closed Date', 'Status', 'Report Status', 'Kind',
+                   'Configuration', 'Guessed Kind', 'Python Versions', 'Guessed CPython Versions',
+                   'Body Snippet (MRE/Backtrace hint)', 'MREs', 'Backtraces', 'Notes', 'Row Hash']
+
+_FTS_TERM = re.compile(r'"[^"]*"\*?|\S+')
+
+
+def _date(value):
+    """ISO date (YYYY-MM-DD) of a dataset timestamp, which sorts and compares as text."""
+    if value is None:
+        return None
+    return value.date().isoformat() if hasattr(value, "date") else str(value)[:10]
+
+
+def _text(value):
+    if not value:
+        return ""
+    if isinstance(value, list):
+        return "\n\n".join(value)
+    return value.replace("\\n", "\n") if "\\n" in value and "\n" not in value else value  # CSV snippets
+
+
+def index_row(row):
+    """(issue fields, versions, text fields) of a dataset row (a dict of DATASET_COLUMNS)."""
+    fields = {
+        "issue": row["Issue #"],
+        "title": row["Title"] or "",
+        "url": row["HTML URL"] or "",
+        "kind": row["Kind"] or row["Guessed Kind"] or "",
+        "configuration": row["Configuration"] or "",
+        "status": (row["Status"] or "").lower(),
+        "report_status": row["Report Status"] or "",
+        "filed": _date(row["Date Filed"]),
+        "closed": _date(row["Closed Date"]),
+        "row_hash": row["Row Hash"] or "",
+    }
+    versions = sorted(set(row["Python Versions"] or row["Guessed CPython Versions"] or []))
+    texts = (fields["title"], _text(row["Body Snippet (MRE/Backtrace hint)"]), _text(row["MREs"]),
+             _text(row["Backtraces"]), _text(row["Notes"]))
+    return fields, versions, texts
+
+
+def match_expression(text):
+    """
+    FTS5 query for plain search text: every word must match, as a phrase of its tokens (so
+    `_interpreters.exec` works), and a trailing '*' keeps prefix matching.
+    """
+    terms = []
+    for term in _FTS_TERM.findall(text):
+        prefix = term.endswith("*")
+        term = term.rstrip("*").strip('"')
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " AND ".join(terms)
+
+
+class IssueSearchIndex:
+    """
+    On-disk FTS5 index of issues with filterable columns.
+
+    The FTS table shares its rowids with the issue numbers, so updating an issue rewrites
+    only its own rows, and text matches join the structured tables by primary key.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(f"""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS issues (
+                issue INTEGER PRIMARY KEY,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL COLLATE NOCASE,
+                configuration TEXT NOT NULL COLLATE NOCASE,
+                status TEXT NOT NULL,
+                report_status TEXT NOT NULL COLLATE NOCASE,
+                filed TEXT,
+                closed TEXT,
+                row_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS issues_by_kind ON issues (kind);
+            CREATE INDEX IF NOT EXISTS issues_by_configuration ON issues (configuration);
+            CREATE INDEX IF NOT EXISTS issues_by_filed ON issues (filed);
+            CREATE TABLE IF NOT EXISTS versions (
+                version TEXT NOT NULL,
+                issue INTEGER NOT NULL,
+                PRIMARY KEY (version, issue)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS versions_by_issue ON versions (issue);
+            CREATE VIRTUAL TABLE IF NOT EXISTS issue_text USING fts5(
+                {', '.join(TEXT_COLUMNS)}, tokenize = "unicode61 tokenchars '_'"
+            );
+        """)
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if stored is None or stored[0] != str(INDEX_VERSION):
+            with self.connection:  # Rows indexed by another version may be missing fields: start over
+                for table in ("issues", "versions", "issue_text"):
+                    self.connection.execute(f"DELETE FROM {table}")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                                        (str(INDEX_VERSION),))
+                # ORDER BY rank lets FTS5 rank matches itself, faster than ORDER BY bm25(...)
+                self.connection.execute("INSERT INTO issue_text (issue_text, rank) VALUES ('rank', ?)",
+                                        (f"bm25({', '.join(map(str, RANK_WEIGHTS))})",))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _remove(self, issue):
+        self.connection.execute("DELETE FROM issues WHERE issue = ?", (issue,))
+        self.connection.execute("DELETE FROM versions WHERE issue = ?", (issue,))
+        self.connection.execute("DELETE FROM issue_text WHERE rowid = ?", (issue,))
+
+    def _add(self, row):
+        fields, versions, texts = index_row(row)
+        self._remove(fields["issue"])
+        self.connection.execute(
+            f"INSERT INTO issues ({', '.join(fields)}) VALUES ({', '.join('?' * len(fields))})",
+            list(fields.values()),
+        )
+        self.connection.executemany("INSERT INTO versions (version, issue) VALUES (?, ?)",
+                                    [(version, fields["issue"]) for version in versions])
+        self.connection.execute(
+            f"INSERT INTO issue_text (rowid, {', '.join(TEXT_COLUMNS)}) VALUES (?{', ?' * len(TEXT_COLUMNS)})",
+            (fields["issue"], *texts),
+        )
+
+    def add(self, row):
+        """Indexes (or re-indexes) one dataset row."""
+        with self.connection:
+            self._add(row)
+
+    def add_many(self, rows):
+        """Indexes dataset rows in one transaction; returns how many were written."""
+        written = 0
+        with self.connection:
+            for row in rows:
+                self._add(row)
+                written += 1
+        return written
+
+    def remove(self, issue):
+        with self.connection:
+            self._remove(issue)
+
+    def row_hashes(self):
+        """{issue: row hash} of every indexed issue."""
+        return dict(self.connection.execute("SELECT issue, row_hash FROM issues"))
+
+    def search(self, text=None, kind=None, configuration=None, version=None, status=None, since=None, until=None,
+               limit=LIMIT, raw=False):
+        """
+        [(issue, title, kind, configuration, status, filed, snippet)] of the issues matching
+        every given filter, best text matches first (newest first without `text`).
+
+        `text` is plain search text (see match_expression()), or FTS5 query syntax with
+        `raw`; `since`/`until` are ISO dates bounding the filing date.
+        """
+        conditions, parameters = [], []
+        for column, value in (("kind", kind), ("configuration", configuration)):
+            if value:
+                conditions.append(f"issues.{column} = ?")
+                parameters.append(value)
+        if status:
+            conditions.append("(issues.status = ? OR issues.report_status = ?)")
+            parameters += [status.lower(), status]
+        if version:
+            conditions.append("issues.issue IN (SELECT issue FROM versions WHERE version = ?)")
+            parameters.append(version)
+        if since:
+            conditions.append("issues.filed >= ?")
+            parameters.append(since)
+        if until:
+            conditions.append("issues.filed <= ?")
+            parameters.append(until)
+        columns = "issues.issue, issues.title, issues.kind, issues.configuration, issues.status, issues.filed"
+        if text:
+            expression = text if raw else match_expression(text)
+            conditions.insert(0, "issue_text MATCH ?")
+            parameters.insert(0, expression)
+            query = (f"SELECT {columns}, snippet(issue_text, -1, '[', ']', '...', 12) FROM issue_text "
+                     f"JOIN issues ON issues.issue = issue_text.rowid WHERE {' AND '.join(conditions)} "
+                     f"ORDER BY issue_text.rank, issues.issue LIMIT ?")
+        else:
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            query = f"SELECT {columns}, '' FROM issues {where} ORDER BY issues.filed DESC, issues.issue DESC LIMIT ?"
+        return self.connection.execute(query, (*parameters, limit)).fetchall()
+
+    def stats(self):
+        issues = self.connection.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+        versions = self.connection.execute("SELECT COUNT(DISTINCT version) FROM versions").fetchone()[0]
+        return {"issues": issues, "versions": versions}
+
+
+def update_index(index_path=INDEX_FILE, dataset_file=None):
+    """Re-indexes the issues of the dataset whose 'Row Hash' changed and drops the ones no longer in it."""
+    import pyarrow as pa  # pyarrow (and pandas, via issue_dataset): only needed to read the dataset
+    import pyarrow.compute as pc
+    from issue_dataset import DATASET_FILE, load_table
+
+    dataset_file = dataset_file or DATASET_FILE
+    hashes = load_table(columns=['Issue #', 'Row Hash'], dataset_file=dataset_file).to_pydict()
+    current = dict(zip(hashes['Issue #'], hashes['Row Hash']))
+    with IssueSearchIndex(index_path) as index:
+        indexed = index.row_hashes()
+        changed = [issue for issue, row_hash in current.items() if indexed.get(issue) != row_hash]
+        removed = [issue for issue in indexed if issue not in current]
+        if changed:
+            table = load_table(columns=DATASET_COLUMNS, dataset_file=dataset_file, rebuild_if_stale=False)
+            table = table.filter(pc.is_in(table.column('Issue #'), value_set=pa.array(changed, pa.int64())))
+            index.add_many(table.to_pylist())
+        for issue in removed:
+            index.remove(issue)
+        stats = index.stats()
+    print(f"Indexed {len(changed)} new or changed issues and removed {len(removed)} in '{index_path}' "
+          f"({stats['issues']} issues, {stats['versions']} Python versions).")
+
+
+def print_results(results):
+    if not results:
+        print("No matching issues.")
+    for issue, title, kind, configuration, status, filed, snippet in results:
+        details = ", ".join(value for value in (status, kind, configuration, filed) if value)
+        print(f"#{issue}: {title} ({details})")
+        if snippet:
+            print(f"    {' '.join(snippet.split())}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text search over fusil issues, backtraces and reproducers.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="Index the new and changed issues of the dataset.")
+    update_parser.add_argument("--dataset", help="Dataset file (default: the issue dataset, rebuilt if stale).")
+    query_parser = subparsers.add_parser("query", help="Search the indexed issues.")
+    query_parser.add_argument("text", nargs="*", help="Words that must all appear; end one with * for a prefix.")
+    query_parser.add_argument("--raw", action="store_true", help="The text is an FTS5 query (OR, NOT, NEAR...).")
+    query_parser.add_argument("--kind")
+    query_parser.add_argument("--configuration")
+    query_parser.add_argument("--version", help="Python version, e.g. 3.14.")
+    query_parser.add_argument("--status", help="open/closed, or a report status like Closed-Completed.")
+    query_parser.add_argument("--since", help="Filed on or after this date (YYYY-MM-DD).")
+    query_parser.add_argument("--until", help="Filed on or before this date (YYYY-MM-DD).")
+    query_parser.add_argument("-n", "--limit", type=int, default=LIMIT, help=f"Results to show (default: {LIMIT}).")
+    query_parser.add_argument("--json", action="store_true", help="Print the results as JSON.")
+    parser.add_argument("--index", default=INDEX_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        update_index(args.index, args.dataset)
+        return
+    if not os.path.exists(args.index):
+        parser.error(f"'{args.index}' doesn't exist yet; run the update command first")
+    text = " ".join(args.text)
+    with IssueSearchIndex(args.index) as index:
+        start = time.perf_counter()
+        try:
+            results = index.search(text, args.kind, args.configuration, args.version, args.status, args.since,
+                                   args.until, args.limit, args.raw)
+        except sqlite3.OperationalError as e:
+            parser.error(f"invalid query {text!r}: {e}")
+        elapsed = time.perf_counter() - start
+    if args.json:
+        keys = ("issue", "title", "kind", "configuration", "status", "filed", "snippet")
+        print(json.dumps([dict(zip(keys, result)) for result in results], indent=2))
+    else:
+        print_results(results)
+        print(f"{len(results)} issues in {elapsed * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
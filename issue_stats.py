@@ -0,0 +1,221 @@
+import json
+import argparse
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import instrumentation
+from issue_dataset import COLLECTOR_CSV_FILE, CURATED_FILE, DATASET_FILE, REPORT_CSV_FILE, load_issues
+from report_summary import SUMMARY_FILE, write_summary
+
+# Every statistic quoted in the report, computed in one pass over the issue dataset.
+#
+# Each categorical column (status, report status, kinds, configuration) is reduced to
+# integer codes, with the (few) distinct values normalized once instead of once per row.
+# The codes are combined into a single key and counted with one np.bincount(); counts by
+# status, kind, etc. are marginals of that count cube. Days to close come from one
+# vectorized subtraction over the date columns, and PR totals from the flattened PR list
+# column, all without leaving Arrow/numpy.
+#
+# compute_statistics() returns a JSON-serializable dict:
+#
+#   {"issues": {"total": 52, "open": 9, "closed": 43, "other": 0},
+#    "by_status": {...}, "by_report_status": {...}, "by_kind": {...},
+#    "by_guessed_kind": {...}, "by_configuration": {...},
+#    "days_to_close": {"count": 43, "mean": 20.1, "median": 5.0, "p25": ..., "p75": ...,
+#                      "p90": ..., "max": ...},
+#    "prs": {"total": 98, "unique": 98, "issues_with_prs": 42, "authors": 18,
+#            "associations": 118, "prs_per_author": {...}, "issues_per_author": {...}}}
+
+STATISTICS_FILE = "report_statistics.json"
+SUMMARY_SOURCES = (DATASET_FILE, COLLECTOR_CSV_FILE, REPORT_CSV_FILE, CURATED_FILE)  # A change to any of them
+STATISTICS_COLUMNS = ['Date Filed', 'Closed Date', 'Status', 'Report Status', 'Kind', 'Configuration',
+                      'Guessed Kind', 'PRs']
+CATEGORY_COLUMNS = {  # Result key -> (column, normalization of its distinct values)
+    "by_status": ('Status', str.lower),
+    "by_report_status": ('Report Status', None),
+    "by_kind": ('Kind', None),
+    "by_guessed_kind": ('Guessed Kind', None),
+    "by_configuration": ('Configuration', None),
+}
+PERCENTILES = (25, 50, 75, 90)
+UNKNOWN = "Unknown"
+SECONDS_PER_DAY = 86400
+
+
+def _as_table(issues):
+    if isinstance(issues, pa.Table):
+        return issues
+    return pa.Table.from_pandas(issues[[column for column in STATISTICS_COLUMNS if column in issues.columns]],
+                                preserve_index=False)
+
+
+def _codes(column, normalize=None):
+    """
+    (codes, values) for a column: values are the sorted distinct values plus UNKNOWN last,
+    which is the code of nulls and empty strings. Values differing only in case are merged
+    under their most frequent spelling.
+    """
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if not pa.types.is_dictionary(array.type):
+        array = pc.dictionary_encode(array)
+    raw_values = [value.strip() if isinstance(value, str) else "" for value in array.dictionary.to_pylist()]
+    if normalize is not None:
+        raw_values = [normalize(value) for value in raw_values]
+    indices = array.indices.fill_null(-1).to_numpy(zero_copy_only=False).astype(np.int64)
+    raw_counts = np.bincount(indices + 1, minlength=len(raw_values) + 1)[1:]
+
+    spellings = {}  # Case-folded value -> (count, spelling) of its most frequent spelling
+    for value, count in zip(raw_values, raw_counts):
+        if value and value != UNKNOWN:
+            key = value.casefold()
+            spellings[key] = max(spellings.get(key, (-1, "")), (int(count), value))
+    values = sorted(spelling for _, spelling in spellings.values())
+    position = {value.casefold(): index for index, value in enumerate(values)}
+    # The extra trailing entry is for null indices (-1)
+    remap = np.array([position.get(value.casefold(), len(values)) for value in raw_values] + [len(values)],
+                     dtype=np.int64)
+    return remap[indices], values + [UNKNOWN]
+
+
+def _counts(counts, values):
+    return {value: int(count) for value, count in zip(values, counts) if count}
+
+
+def _seconds(column):
+    """Seconds since the epoch as float64, NaN for missing dates."""
+    seconds = pc.cast(pc.cast(column, pa.timestamp("s")), pa.int64())
+    return seconds.to_numpy(zero_copy_only=False).astype(np.float64)
+
+
+def _days_to_close(table, closed_mask):
+    filed = _seconds(table.column('Date Filed'))
+    closed = _seconds(table.column('Closed Date'))
+    valid = closed_mask & np.isfinite(filed) & np.isfinite(closed)
+    days = np.floor((closed[valid] - filed[valid]) / SECONDS_PER_DAY)
+    if not len(days):
+        return {"count": 0, "mean": None, "median": None, "max": None,
+                **{f"p{percentile}": None for percentile in PERCENTILES}}
+    percentiles = np.percentile(days, PERCENTILES)
+    return {
+        "count": int(len(days)),
+        "mean": round(float(days.mean()), 2),
+        "median": float(np.median(days)),
+        "max": float(days.max()),
+        **{f"p{percentile}": round(float(value), 2) for percentile, value in zip(PERCENTILES, percentiles)},
+    }
+
+
+def _author_counts(owner_codes, author_codes, authors):
+    """How many distinct owners (PRs or issues) each author appears in."""
+    if not len(author_codes):
+        return {}
+    pairs = np.sort(owner_codes * len(authors) + author_codes)
+    pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]  # Distinct (owner, author) pairs
+    counts = np.bincount(pairs % len(authors), minlength=len(authors))
+    order = sorted(range(len(authors)), key=lambda index: (-counts[index], authors[index]))
+    return {authors[index]: int(counts[index]) for index in order if counts[index]}
+
+
+def _pr_statistics(table):
+    prs = table.column('PRs').combine_chunks()
+    lengths = pc.fill_null(pc.list_value_length(prs), 0).to_numpy(zero_copy_only=False)
+    flat = prs.flatten()  # One struct per (issue, PR) entry
+    pr_keys = flat.field('number')
+    if pr_keys.null_count:  # PRs known only by URL: key everything by string
+        pr_keys = pc.coalesce(pc.cast(pr_keys, pa.string()), flat.field('url'))
+    pr_array = pc.dictionary_encode(pr_keys)
+    pr_codes = pr_array.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    issue_of_pr = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+
+    authors_lists = flat.field('authors')
+    author_array = pc.dictionary_encode(authors_lists.flatten())
+    authors = author_array.dictionary.to_pylist()
+    author_codes = author_array.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    pr_of_author = pc.list_parent_indices(authors_lists).to_numpy(zero_copy_only=False)
+
+    prs_per_author = _author_counts(pr_codes[pr_of_author], author_codes, authors)
+    return {
+        "total": int(lengths.sum()),
+        "unique": len(pr_array.dictionary),
+        "issues_with_prs": int(np.count_nonzero(lengths)),
+        "authors": len(prs_per_author),
+        "associations": sum(prs_per_author.values()),  # (PR, author) pairs
+        "prs_per_author": prs_per_author,
+        "issues_per_author": _author_counts(issue_of_pr[pr_of_author], author_codes, authors),
+    }
+
+
+def compute_statistics(issues):
+    """All report statistics for `issues` (a DataFrame or Arrow table of the issue dataset)."""
+    with instrumentation.stage("statistics"):
+        table = _as_table(issues)
+        instrumentation.count(rows=table.num_rows)
+        return _table_statistics(table)
+
+
+def _table_statistics(table):
+    keys = list(CATEGORY_COLUMNS)
+    codes_and_values = [_codes(table.column(CATEGORY_COLUMNS[key][0]), CATEGORY_COLUMNS[key][1])
+                        for key in keys]
+    shape = tuple(len(values) for _, values in codes_and_values)
+
+    # One combined key per issue, counted once; per-column counts are marginals of the cube
+    combined = np.zeros(table.num_rows, dtype=np.int64)
+    for codes, values in codes_and_values:
+        combined = combined * len(values) + codes
+    cube = np.bincount(combined, minlength=int(np.prod(shape))).reshape(shape)
+
+    statistics = {"issues": None}  # Filled below, first in the output
+    for axis, key in enumerate(keys):
+        other_axes = tuple(index for index in range(len(keys)) if index != axis)
+        statistics[key] = _counts(cube.sum(axis=other_axes), codes_and_values[axis][1])
+
+    by_status = statistics["by_status"]
+    statistics["issues"] = {
+        "total": int(table.num_rows),
+        "open": by_status.get("open", 0),
+        "closed": by_status.get("closed", 0),
+        "other": int(table.num_rows) - by_status.get("open", 0) - by_status.get("closed", 0),
+    }
+    status_codes, status_values = codes_and_values[keys.index("by_status")]
+    closed_code = status_values.index("closed") if "closed" in status_values else -1
+    statistics["days_to_close"] = _days_to_close(table, status_codes == closed_code)
+    statistics["prs"] = _pr_statistics(table)
+    return statistics
+
+
+def load_statistics(dataset_file=DATASET_FILE):
+    """Statistics of the issue dataset, reading only the columns they need."""
+    return compute_statistics(load_issues(columns=STATISTICS_COLUMNS, dataset_file=dataset_file))
+
+
+def update_summary(statistics=None, summary_file=SUMMARY_FILE):
+    """Writes the report summary (see report_summary.py), computing the statistics if not given."""
+    if statistics is None:
+        statistics = load_statistics()
+    write_summary(statistics, SUMMARY_SOURCES, summary_file)  # Stamped after load_statistics() rebuilt the dataset
+    return statistics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the report statistics from the issue dataset.")
+    parser.add_argument("--dataset", default=DATASET_FILE)
+    parser.add_argument("--output", default=STATISTICS_FILE, help="JSON file to write ('-' for stdout only).")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumentation.session(args, "issue_stats"):
+        report_statistics = load_statistics(args.dataset)
+        if args.dataset == DATASET_FILE:
+            update_summary(report_statistics)
+        print(json.dumps(report_statistics, indent=2))
+        if args.output != "-":
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report_statistics, f, indent=2)
+            print(f"Saved statistics to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+import os
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import instrumentation
+from issue_dataset import DATASET_FILE, load_table
+
+# Time buckets of the issues: how many were created and closed per day, ISO week or month,
+# and how many were open at the end of each period (the backlog).
+#
+# Dates are turned into integer period numbers (days since 1970-01-01, ISO weeks counted
+# from the Monday before it, or months since January 1970) and counted with np.bincount,
+# so a multi-year history is one pass over the two date columns. Weeks are ISO weeks: they
+# start on Monday and belong to the ISO year of their Thursday, so "2025-W01" may start in
+# December 2024 and years are never guessed from the week numbers.
+#
+# Backlog keeps the daily created/closed counts and the filing and closing day of every
+# issue it has seen, in a small .npz file. Appended issues only add their own days to the
+# counts. A refresh is incremental, like issue_search.py and pr_graph.py: the dataset's
+# 'Row Hash' column is diffed against the stored ones, and only the new or changed rows are
+# read and passed to sync(), so the series of a long, multi-campaign history is never
+# recounted from scratch. Hashes are stored as 64-bit fingerprints (their first 16 hex
+# digits), read straight from the Arrow column's buffer, so the diff compares integers.
+
+PERIODS = ("day", "week", "month")
+BACKLOG_FILE = "issue_backlog.cache.npz"
+NO_DAY = np.iinfo(np.int64).min  # Missing date
+ROW_HASH_LENGTH = 40  # Hex SHA-1 of issue_dataset.row_hash()
+UNKNOWN_FINGERPRINT = 0  # Of a missing 'Row Hash': the issue is applied again on the next refresh
+
+# 1970-01-01 was a Thursday: week numbers count from Monday 1969-12-29
+_WEEK_OFFSET = 3
+
+
+def day_numbers(dates):
+    """Days since 1970-01-01 of a datetime Series/array, NO_DAY where the date is missing."""
+    values = pd.to_datetime(pd.Series(dates)).to_numpy(dtype="datetime64[ns]")
+    days = values.astype("datetime64[D]").astype(np.int64)
+    days[np.isnat(values)] = NO_DAY
+    return days
+
+
+def _hash_prefixes(row_hashes):
+    """(N, 16) array of the ASCII codes of the first 16 hex digits of each 'Row Hash'."""
+    if isinstance(row_hashes, pa.ChunkedArray):
+        return np.concatenate([_hash_prefixes(chunk) for chunk in row_hashes.chunks] + [np.zeros((0, 16), np.uint8)])
+    if isinstance(row_hashes, pa.Array):
+        if pa.types.is_string(row_hashes.type) and row_hashes.null_count == 0 and len(row_hashes):
+            # Every hash has the same length: the data buffer is a (N, 40) array of ASCII codes
+            offsets = np.frombuffer(row_hashes.buffers()[1], dtype=np.int32)[
+                row_hashes.offset:row_hashes.offset + len(row_hashes) + 1]
+            if offsets[-1] - offsets[0] == len(row_hashes) * ROW_HASH_LENGTH and \
+                    (np.diff(offsets) == ROW_HASH_LENGTH).all():
+                data = np.frombuffer(row_hashes.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]
+                return data.reshape(-1, ROW_HASH_LENGTH)[:, :16]
+        row_hashes = row_hashes.to_numpy(zero_copy_only=False)
+    return np.asarray([value or "" for value in row_hashes], dtype="S16").view(np.uint8).reshape(-1, 16)
+
+
+def row_hash_fingerprints(row_hashes):
+    """64-bit fingerprints of 'Row Hash' values (an Arrow column, or any sequence), 0 for missing ones."""
+    digits = _hash_prefixes(row_hashes)
+    nibbles = (digits & 0xF) + 9 * (digits >> 6)  # '0'-'9' (0x30-0x39) -> 0-9, 'a'-'f' (0x61-0x66) -> 10-15
+    return ((nibbles[:, 0::2] << 4) | nibbles[:, 1::2]).view(">u8").ravel().astype(np.uint64)
+
+
+def period_numbers(days, period):
+    """Period numbers of day numbers (NO_DAY stays NO_DAY)."""
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}', expected one of {', '.join(PERIODS)}")
+    missing = days == NO_DAY
+    if period == "day":
+        numbers = days.copy()
+    elif period == "week":
+        numbers = (days + _WEEK_OFFSET) // 7
+    else:
+        numbers = np.where(missing, 0, days).astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    numbers[missing] = NO_DAY
+    return numbers
+
+
+def period_starts(numbers, period):
+    """First day of each period number, as a DatetimeIndex."""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if period == "day":
+        days = numbers
+    elif period == "week":
+        days = numbers * 7 - _WEEK_OFFSET
+    else:
+        return pd.DatetimeIndex(numbers.astype("datetime64[M]").astype("datetime64[ns]"))
+    return pd.DatetimeIndex(days.astype("datetime64[D]").astype("datetime64[ns]"))
+
+
+def period_labels(starts, period):
+    """'31/10/2024', '2024-W44' or '2024-10' for each period start."""
+    if period == "day":
+        return [start.strftime("%d/%m/%Y") for start in starts]
+    if period == "week":
+        return [f"{year}-W{week:02d}" for year, week, _ in (start.isocalendar() for start in starts)]
+    return [start.strftime("%Y-%m") for start in starts]
+
+
+def _series(created, closed, first, period):
+    """DataFrame of the counts, one row per period starting at period number `first`."""
+    starts = period_starts(np.arange(first, first + len(created)), period)
+    df_counts = pd.DataFrame({
+        "Period": starts,
+        "Label": period_labels(starts, period),
+        "Created": created.astype(int),
+        "Closed": closed.astype(int),
+    })
+    # Issues still open at the end of each period
+    df_counts["Open"] = np.cumsum(created) - np.cumsum(closed)
+    return df_counts
+
+
+def count_days(filed_days, closed_days, first=None, last=None):
+    """(created, closed, first day) counts per day from `first` to `last` (default: the dates' range)."""
+    filed_days = filed_days[filed_days != NO_DAY]
+    closed_days = closed_days[closed_days != NO_DAY]
+    present = np.concatenate([filed_days, closed_days])
+    if first is None:
+        first = int(filed_days.min()) if len(filed_days) else (int(present.min()) if len(present) else 0)
+    if last is None:
+        last = int(present.max()) if len(present) else first - 1
+    length = max(last - first + 1, 0)
+
+    def bincount(days):
+        days = days[(days >= first) & (days <= last)] - first
+        return np.bincount(days, minlength=length).astype(np.int64)
+
+    return bincount(filed_days), bincount(closed_days), first
+
+
+def regroup(daily, first_day, period):
+    """Adds up per-day counts starting at `first_day` into per-period counts; returns (counts, first period)."""
+    numbers = period_numbers(np.arange(first_day, first_day + len(daily)), period)
+    if not len(numbers):
+        return np.zeros(0, dtype=np.int64), 0
+    first = int(numbers[0])
+    return np.bincount(numbers - first, weights=daily, minlength=int(numbers[-1]) - first + 1).astype(np.int64), first
+
+
+def bucket_counts(df_issues, period="week"):
+    """
+    Issues created, closed and still open per period.
+
+    Periods run from the one of the first filing to the one of the last filing or closing,
+    with empty periods included. Returns a DataFrame with the columns Period (first day),
+    Label, Created, Closed and Open.
+    """
+    with instrumentation.stage("bucket counts"):
+        instrumentation.count(rows=len(df_issues))
+        created, closed, first_day = count_days(day_numbers(df_issues['Date Filed']),
+                                                day_numbers(df_issues['Closed Date']))
+        if period == "day":
+            return _series(created, closed, first_day, period)
+        created, first = regroup(created, first_day, period)
+        closed, _ = regroup(closed, first_day, period)
+        return _series(created, closed, first, period)
+
+
+def count_issues_per_week(df_issues):
+    """Issues created and closed per ISO week, as saved in cleaned_issues_per_week.csv."""
+    weeks = bucket_counts(df_issues, "week")
+    return pd.DataFrame({
+        "Year": [int(label[:4]) for label in weeks['Label']],  # ISO year of the week
+        "Week": [int(label[6:]) for label in weeks['Label']],
+        "Issues_Created": weeks['Created'],
+        "Issues_Closed": weeks['Closed'],
+    })
+
+
+class Backlog:
+    """Created/closed/open series kept up to date as issues are added or change."""
+
+    def __init__(self):
+        self.issues = np.zeros(0, dtype=np.int64)  # Sorted issue numbers
+        self.filed = np.zeros(0, dtype=np.int64)  # Day numbers, NO_DAY if missing
+        self.closed = np.zeros(0, dtype=np.int64)
+        self.fingerprints = np.zeros(0, dtype=np.uint64)  # Of each issue's 'Row Hash'
+        self.first_day = 0
+        self.created_per_day = np.zeros(0, dtype=np.int64)
+        self.closed_per_day = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def load(cls, path=BACKLOG_FILE):
+        backlog = cls()
+        if os.path.exists(path):
+            with np.load(path) as state:
+                backlog.issues = state["issues"]
+                backlog.filed = state["filed"]
+                backlog.closed = state["closed"]
+                backlog.fingerprints = (state["fingerprints"] if "fingerprints" in state.files  # Older state files
+                                        else np.full(len(backlog.issues), UNKNOWN_FINGERPRINT, dtype=np.uint64))
+                backlog.first_day = int(state["first_day"])
+                backlog.created_per_day = state["created_per_day"]
+                backlog.closed_per_day = state["closed_per_day"]
+        return backlog
+
+    def save(self, path=BACKLOG_FILE):
+        tmp_file = path + ".tmp.npz"
+        np.savez(tmp_file, issues=self.issues, filed=self.filed, closed=self.closed, fingerprints=self.fingerprints,
+                 first_day=self.first_day, created_per_day=self.created_per_day, closed_per_day=self.closed_per_day)
+        os.replace(tmp_file, path)
+
+    def _grow(self, days):
+        """Extends the daily counts so they cover `days`."""
+        days = days[days != NO_DAY]
+        if not len(days):
+            return
+        if not len(self.created_per_day):
+            self.first_day = int(days.min())
+        first = min(self.first_day, int(days.min()))
+        last = max(self.first_day + len(self.created_per_day) - 1, int(days.max()))
+        before = self.first_day - first
+        after = last - first + 1 - before - len(self.created_per_day)
+        if before or after:
+            self.created_per_day = np.pad(self.created_per_day, (before, after))
+            self.closed_per_day = np.pad(self.closed_per_day, (before, after))
+            self.first_day = first
+
+    def _add(self, filed, closed, sign):
+        self._grow(np.concatenate([filed, closed]))
+        np.add.at(self.created_per_day, filed[filed != NO_DAY] - self.first_day, sign)
+        np.add.at(self.closed_per_day, closed[closed != NO_DAY] - self.first_day, sign)
+
+    def _positions(self, issues):
+        """Index of each issue in self.issues, and whether it is there."""
+        stored = len(self.issues)
+        if len(issues) >= stored and np.array_equal(issues[:stored], self.issues):
+            # The usual case: the same issues in the same order, maybe with new ones after them
+            positions = np.arange(len(issues))
+            return positions, positions < stored
+        positions = np.searchsorted(self.issues, issues)
+        known = positions < stored
+        known[known] = self.issues[positions[known]] == issues[known]
+        return positions, known
+
+    def append(self, issues, filed, closed, fingerprints=None):
+        """Adds issues that aren't in the backlog yet (arrays of issue and day numbers, and their fingerprints)."""
+        issues = np.asarray(issues, dtype=np.int64)
+        if not len(issues):
+            return
+        _, known = self._positions(issues)
+        if known.any():
+            raise ValueError(f"{int(known.sum())} issues are already in the backlog, use sync() to update them")
+        if fingerprints is None:
+            fingerprints = np.full(len(issues), UNKNOWN_FINGERPRINT, dtype=np.uint64)
+        self._add(filed, closed, 1)
+        self.issues = np.concatenate([self.issues, issues])
+        self.filed = np.concatenate([self.filed, filed])
+        self.closed = np.concatenate([self.closed, closed])
+        self.fingerprints = np.concatenate([self.fingerprints, np.asarray(fingerprints, dtype=np.uint64)])
+        if len(self.issues) > 1 and (np.diff(self.issues) < 0).any():  # Not appended in issue order
+            order = np.argsort(self.issues, kind="stable")
+            self.issues, self.filed, self.closed = self.issues[order], self.filed[order], self.closed[order]
+            self.fingerprints = self.fingerprints[order]
+
+    def changes(self, issues, row_hashes):
+        """(new or changed issues, issues no longer there) of the dataset's 'Issue #' and 'Row Hash' columns."""
+        issues = np.asarray(issues, dtype=np.int64)
+        fingerprints = row_hash_fingerprints(row_hashes)
+        positions, known = self._positions(issues)
+        changed = ~known
+        changed[known] = (self.fingerprints[positions[known]] != fingerprints[known]) | (
+            fingerprints[known] == UNKNOWN_FINGERPRINT)
+        if known.sum() == len(self.issues):  # Every stored issue is still there
+            return issues[changed], np.zeros(0, dtype=np.int64)
+        return issues[changed], self.issues[~np.isin(self.issues, issues)]
+
+    def sync(self, df_changed, removed=()):
+        """
+        Applies the rows of new or changed issues ('Issue #', 'Date Filed', 'Closed Date' and,
+        optionally, 'Row Hash'), found with changes(), and drops the `removed` issues.
+
+        Only these issues touch the counts. Returns the number of issues applied.
+        """
+        removed = np.asarray(removed, dtype=np.int64)
+        gone = np.zeros(len(self.issues), dtype=bool)
+        if len(removed):
+            positions, known = self._positions(removed)
+            gone[positions[known]] = True
+            self._add(self.filed[gone], self.closed[gone], -1)
+            self.issues, self.filed, self.closed = self.issues[~gone], self.filed[~gone], self.closed[~gone]
+            self.fingerprints = self.fingerprints[~gone]
+
+        issues = df_changed['Issue #'].to_numpy(dtype=np.int64)
+        filed = day_numbers(df_changed['Date Filed'])
+        closed = day_numbers(df_changed['Closed Date'])
+        fingerprints = (row_hash_fingerprints(df_changed['Row Hash'].to_numpy()) if 'Row Hash' in df_changed
+                        else np.full(len(issues), UNKNOWN_FINGERPRINT, dtype=np.uint64))
+
+        # Known issues: take the old days out, put the new ones in
+        positions, known = self._positions(issues)
+        old = positions[known]
+        self._add(self.filed[old], self.closed[old], -1)
+        self._add(filed[known], closed[known], 1)
+        self.filed[old] = filed[known]
+        self.closed[old] = closed[known]
+        self.fingerprints[old] = fingerprints[known]
+
+        new = ~known
+        self.append(issues[new], filed[new], closed[new], fingerprints[new])
+        return int(len(issues) + gone.sum())
+
+    def counts(self, period="week"):
+        """The same DataFrame as bucket_counts(), from the stored daily counts."""
+        if not len(self.created_per_day):
+            return _series(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), 0, period)
+        # Same range as bucket_counts(): from the first filing to the last filing or closing
+        filed_days = np.flatnonzero(self.created_per_day)
+        any_days = np.flatnonzero(self.created_per_day | self.closed_per_day)
+        start = int(filed_days[0]) if len(filed_days) else int(any_days[0]) if len(any_days) else 0
+        end = int(any_days[-1]) + 1 if len(any_days) else start
+        created = self.created_per_day[start:end]
+        closed = self.closed_per_day[start:end]
+        first = self.first_day + start
+        if period != "day":
+            created, first_period = regroup(created, first, period)
+            closed, _ = regroup(closed, first, period)
+            first = first_period
+        return _series(created, closed, first, period)
+
+
+def update_backlog(path=BACKLOG_FILE, dataset_file=DATASET_FILE):
+    """Applies the issues of the dataset whose 'Row Hash' changed to the saved backlog; returns (backlog, applied)."""
+    hashes = load_table(columns=['Issue #', 'Row Hash'], dataset_file=dataset_file)
+    backlog = Backlog.load(path)
+    changed, removed = backlog.changes(hashes.column('Issue #').to_numpy(), hashes.column('Row Hash'))
+    applied = 0
+    if len(changed) or len(removed):
+        table = load_table(columns=['Issue #', 'Date Filed', 'Closed Date', 'Row Hash'], dataset_file=dataset_file,
+                           rebuild_if_stale=False)
+        table = table.filter(pc.is_in(table.column('Issue #'), value_set=pa.array(changed, pa.int64())))
+        applied = backlog.sync(table.to_pandas(), removed)
+        backlog.save(path)
+    return backlog, applied
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Issues created, closed and open per day, ISO week or month.")
+    parser.add_argument("--period", choices=PERIODS, default="week")
+    parser.add_argument("--output", help="Save the counts to this CSV file.")
+    parser.add_argument("--backlog", default=BACKLOG_FILE, help="Incremental backlog state file.")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.session(args, "issue_timeline"):
+        with instrumentation.stage("backlog sync"):
+            backlog, applied = update_backlog(args.backlog)
+            instrumentation.count(rows=applied)
+        print(f"Applied {applied} new, changed or removed issues to '{args.backlog}' ({len(backlog.issues)} issues, "
+              f"from '{DATASET_FILE}')")
+
+        with instrumentation.stage("backlog counts"):
+            df_counts = backlog.counts(args.period)
+        print(df_counts[["Label", "Created", "Closed", "Open"]].to_string(index=False))
+        if args.output:
+            df_counts.to_csv(args.output, index=False)
+            print(f"\nSaved the counts per {args.period} to '{args.output}'")
@@ -0,0 +1,135 @@
+import csv
+import io
+import json
+import os
+
+# Streaming row writers for the collector. Each row is rendered to a string first and
+# written with a single write() + flush(), so a crash leaves a file that holds only whole
+# rows (plus, at worst, one torn last row that read_rows() drops when resuming).
+
+
+class CsvRowWriter:
+    extension = ".csv"
+
+    def __init__(self, path, fieldnames, append=False):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.count = 0
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self.file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._buffer = io.StringIO()
+        self._writer = csv.DictWriter(self._buffer, fieldnames=fieldnames)
+        if write_header:
+            self._writer.writeheader()
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        self.file.write(self._buffer.getvalue())
+        self.file.flush()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self._flush_buffer()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def read_rows(path, fieldnames):
+        """Yields the complete rows of a possibly truncated CSV written by this class."""
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                # A torn last row is missing trailing fields (DictReader fills them with None)
+                if any(row.get(name) is None for name in fieldnames):
+                    return
+                yield row
+
+
+class JsonLinesRowWriter:
+    extension = ".jsonl"
+
+    def __init__(self, path, fieldnames, append=False):
+        self.path = path
+        self.fieldnames = fieldnames
+        self.count = 0
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, row):
+        self.file.write(json.dumps({name: row.get(name, "") for name in self.fieldnames}) + "\n")
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def read_rows(path, fieldnames):
+        """Yields the complete rows of a possibly truncated JSON Lines file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    return  # Torn last line
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    return
+
+
+ROW_WRITERS = {"csv": CsvRowWriter, "jsonl": JsonLinesRowWriter}
+
+
+def truncate_torn_tail(path, chunk_size=65536):
+    """Cuts anything after the last newline, i.e. a row whose write was interrupted."""
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline_index = chunk.rfind(b"\n")
+            if newline_index != -1:
+                f.truncate(start + newline_index + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def _issue_number(row):
+    return int(row["Issue #"])
+
+
+def recover_partial_output(path, writer_class, fieldnames, key=_issue_number):
+    """
+    Drops a torn last row from an interrupted run's output and returns the keys of the rows
+    it holds: their issue numbers, or key(row).
+
+    Rows are copied one at a time into a fresh file that replaces the original, so memory
+    stays flat no matter how many rows were already written.
+    """
+    finished_keys = set()
+    if not os.path.exists(path):
+        return finished_keys
+    truncate_torn_tail(path)
+    recovering_path = f"{path}.recovering"
+    with writer_class(recovering_path, fieldnames) as writer:
+        for row in writer_class.read_rows(path, fieldnames):
+            writer.write(row)
+            finished_keys.add(key(row))
+    os.replace(recovering_path, path)
+    return finished_keys
@@ -1,13 +1,20 @@
-import re
+import io
+import argparse
 from collections import Counter
 
+from appendix_parser import iter_findings
+from pr_graph import current_graph
+
+REPORT_FILE = "cpython_report.md"
+
 def parse_appendix_for_pr_data(report_content):
     """
     Parses the Appendix section of the report to extract PR authors,
     their PR association counts, and the total number of unique PRs.
 
     Args:
-        report_content (str): The full string content of the cpython_report.md file.
+        report_content (str or iterable of str): The full string content of the
+            cpython_report.md file, or its lines (e.g. the open file, to stream it).
 
     Returns:
         tuple: (pr_author_counts, total_unique_prs_found, parsing_issues)
@@ -16,93 +23,62 @@ def parse_appendix_for_pr_data(report_content):
                parsing_issues (list): Descriptions of parsing inconsistencies.
     """
     pr_author_association_counts = Counter()
-    total_unique_prs_found = 0
+    seen_prs = set()
     parsing_issues = []
-    
-    in_appendix_findings = False
-    appendix_section_starts = ["## Appendix", "## Apendix"]
-    findings_subsection_header = "### Findings"
-    end_appendix_sections = ["## Conclusions", "## Impact"] 
-
-    prs_header_pattern = re.compile(r"^\s*-\s*PRs\s*\(author\):", re.IGNORECASE)
-    pr_line_pattern = re.compile(
-        r"^\s*-\s*(?:\[\d+\]\(https?://[^\)]+\))?\s*\((@[^)]+)\)" 
-    ) # Ensures authors are present
-    
-    lines = report_content.splitlines()
-    
-    for i, line in enumerate(lines):
-        if not in_appendix_findings:
-            if any(start_header in line for start_header in appendix_section_starts):
-                if (i + 1 < len(lines) and findings_subsection_header in lines[i+1]) or \
-                   (i + 2 < len(lines) and findings_subsection_header in lines[i+2]):
-                    in_appendix_findings = True
-                    print("INFO: Entered Appendix Findings section for PR parsing.")
-            continue
-        
-        if any(end_header in line for end_header in end_appendix_sections) and line.startswith("## "):
-            print(f"INFO: Reached section '{line}', stopping PR parse for Appendix.")
-            break
-
-        if prs_header_pattern.search(line):
-            line_index = i + 1
-            while line_index < len(lines) and lines[line_index].strip().startswith("- "):
-                pr_line_text = lines[line_index].strip()
-                
-                if "None yet" in pr_line_text or "None" in pr_line_text.strip():
-                    line_index += 1
-                    continue
-
-                match_pr = pr_line_pattern.search(pr_line_text)
-                
-                if match_pr:
-                    # This line is considered one unique PR
-                    total_unique_prs_found += 1 
-                    
-                    authors_group_str = match_pr.group(1) 
-                    authors_in_pr = [
-                        author.strip().lstrip('@') 
-                        for author in authors_group_str.split(',') 
-                        if author.strip()
-                    ]
-                    
-                    if not authors_in_pr:
-                        log_msg = f"WARNING: Parsed empty author list from group '({authors_group_str})' in PR line: '{pr_line_text}' (Line ~{line_index+1})"
-                        parsing_issues.append(log_msg)
-                    else:
-                        for author_name in authors_in_pr:
-                            if author_name:
-                                pr_author_association_counts[author_name] += 1
-                else:
-                    log_msg = f"WARNING: Line under 'PRs (author):' did not match expected PR-author pattern (and not 'None yet'): '{pr_line_text}' (Line ~{line_index+1})"
-                    parsing_issues.append(log_msg)
-                
-                line_index += 1
-            i = line_index - 1 
-            
-    return pr_author_association_counts, total_unique_prs_found, parsing_issues
-
-# --- Main execution part ---
-if __name__ == "__main__":
-    report_file_path = "cpython_report.md" 
-    
+
+    lines = io.StringIO(report_content) if isinstance(report_content, str) else report_content
+    finding_count = 0
+    for finding in iter_findings(lines):
+        finding_count += 1
+        parsing_issues.extend(finding["parsing_issues"])
+        for pr in finding["prs"]:
+            # A PR fixing several issues is listed under each of them, count it once
+            pr_key = pr["number"] if pr["number"] is not None else (finding["issue"], len(seen_prs))
+            if pr_key in seen_prs:
+                continue
+            seen_prs.add(pr_key)
+            for author_name in pr["authors"]:
+                pr_author_association_counts[author_name] += 1
+
+    print(f"INFO: Parsed {finding_count} findings from the Appendix.")
+    return pr_author_association_counts, len(seen_prs), parsing_issues
+
+def pr_data_from_graph():
+    """Same as parse_appendix_for_pr_data(), from the PR graph (the Appendix merged with the collected PRs)."""
+    with current_graph() as graph:
+        pr_statistics = graph.statistics()
+    return Counter(pr_statistics["prs_per_author"]), pr_statistics["unique"], []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PR authors and PR counts listed in the report's Appendix.")
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--from-report", action="store_true",
+                        help="Count from the report's markdown alone, and list its parsing issues, instead of "
+                             "reading the PR graph (pr_graph.py).")
+    args = parser.parse_args(argv)
+    report_file_path = args.report
+
     try:
-        with open(report_file_path, 'r', encoding='utf-8') as f:
-            report_content = f.read()
-        
-        print(f"Successfully read '{report_file_path}'. Analyzing Appendix for PR data...")
-        author_counts, total_prs, issues = parse_appendix_for_pr_data(report_content)
-        
+        if args.from_report:
+            with open(report_file_path, 'r', encoding='utf-8') as f:
+                print(f"Successfully opened '{report_file_path}'. Analyzing Appendix for PR data...")
+                author_counts, total_prs, issues = parse_appendix_for_pr_data(f)
+        else:
+            # The graph is only rebuilt when the report, the CSVs or the dataset changed
+            author_counts, total_prs, issues = pr_data_from_graph()
+            print("Successfully read PR data from the PR graph")
+
         print(f"\n--- Total Unique PRs Found in Appendix ---")
         print(f"Total distinct PRs listed: {total_prs}")
 
         if author_counts:
             print("\n--- Number of PRs Each Author is Associated With (from Appendix) ---")
             sorted_pr_authors = sorted(author_counts.items(), key=lambda item: (-item[1], item[0]))
-            
+
             for author, count in sorted_pr_authors:
                 print(f"{author}: {count} PRs associated") # Clarified meaning
-            
+
             total_unique_authors = len(sorted_pr_authors)
             print(f"\nTotal unique PR authors found in Appendix: {total_unique_authors}")
 
@@ -115,15 +91,21 @@ if __name__ == "__main__":
                          print(f"The second author associated with most PRs ({second_author_pr_associations}) was {second_author_name}.")
         else:
             print("\nNo PR author association data extracted from the Appendix.")
-            
+
         if issues:
             print("\n--- Parsing Issues/Inconsistencies Found During Appendix Scan ---")
             for issue_desc in issues:
                 print(issue_desc)
+        elif not args.from_report:
+            print("\nRun with --from-report to check the Appendix's PR listings for parsing inconsistencies.")
         else:
             print("\nNo major parsing inconsistencies detected in PR listings within Appendix.")
-            
+
     except FileNotFoundError:
         print(f"Error: The report file '{report_file_path}' was not found.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+import os
+import json
+import argparse
+import sqlite3
+import statistics
+
+from report_summary import source_stamps
+
+# Issue <-> PR <-> author graph of the campaign, built once and kept on disk.
+#
+# parse_appendix_prs.py used to count PR authors from the report's markdown, the PR author
+# statistics came from the dataset's 'PRs' column and the collector saw a third version in
+# the timeline cross-references, and each recounted from raw text. The issue dataset
+# (issue_dataset.py) already merges the three sources into one list of PRs per issue; this
+# module stores those links as a bipartite graph in SQLite:
+#
+#   issues (filing date, first PR date) -- issue_prs -- prs (number/URL, state, creation date)
+#                                                        prs -- pr_authors -- authors
+#
+# with the counts the reports ask for kept up to date as links are added: the PRs and
+# issues of each author, the issues of each PR and the days from filing to the first PR of
+# each issue. Per-author counts, issues per PR and top contributors are then index lookups.
+#
+#   python pr_graph.py update
+#   python pr_graph.py top --by issues -n 5
+#   python pr_graph.py author vstinner
+#   python pr_graph.py pr 126233
+#   python pr_graph.py first-pr
+#
+# update is incremental, like issue_search.py: only issues whose 'Row Hash' changed are
+# relinked, and only the counts of the PRs and authors they touch are recomputed. A PR's
+# authors are the union of the authors every source gave for it. current_graph() skips the
+# update (and the pandas/pyarrow imports it needs) while the dataset and the files it's
+# built from are unchanged, so the PR statistics scripts usually only read the database.
+
+GRAPH_FILE = "pr_graph.sqlite3"
+GRAPH_VERSION = 1  # Bump when the schema or the way links are stored changes, so the graph is rebuilt
+# issue_dataset's DATASET_FILE and the files it's built from; not imported from there, as that imports pandas
+GRAPH_SOURCES = ("cpython_fusil_issues.arrow", "cpython_fusil_issues.csv", "cpython_fusil_report.csv",
+                 "cpython_report.curated.md")
+TOP = 10
+
+
+def pr_key(pr):
+    """Identity of a PR: its number, or its URL when the number isn't known."""
+    return str(pr["number"]) if pr.get("number") is not None else pr["url"]
+
+
+def _date(value):
+    if value is None:
+        return None
+    return value.date().isoformat() if hasattr(value, "date") else str(value)[:10]
+
+
+class PRGraph:
+    """
+    On-disk bipartite graph of issues, PRs and PR authors.
+
+    Links are changed through link_issue() (one issue and all its PRs) or link_pr() (one
+    more PR for an issue); both refresh the stored counts of what they touched before
+    committing, so every query reads precomputed values.
+    """
+
+    def __init__(self, path=GRAPH_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS issues (
+                issue INTEGER PRIMARY KEY,
+                filed TEXT,
+                row_hash TEXT NOT NULL DEFAULT '',
+                first_pr TEXT,  -- Creation date of its earliest PR
+                days_to_first_pr INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS issues_by_days_to_first_pr ON issues (days_to_first_pr)
+                WHERE days_to_first_pr IS NOT NULL;
+            CREATE TABLE IF NOT EXISTS prs (
+                pr INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                number INTEGER,
+                url TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT '',
+                created TEXT,
+                issues INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS authors (
+                author INTEGER PRIMARY KEY,
+                login TEXT NOT NULL UNIQUE,
+                prs INTEGER NOT NULL DEFAULT 0,
+                issues INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS authors_by_prs ON authors (prs DESC, login);
+            CREATE INDEX IF NOT EXISTS authors_by_issues ON authors (issues DESC, login);
+            CREATE TABLE IF NOT EXISTS issue_prs (
+                issue INTEGER NOT NULL,
+                pr INTEGER NOT NULL,
+                PRIMARY KEY (issue, pr)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS issue_prs_by_pr ON issue_prs (pr, issue);
+            CREATE TABLE IF NOT EXISTS pr_authors (
+                pr INTEGER NOT NULL,
+                author INTEGER NOT NULL,
+                PRIMARY KEY (pr, author)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS pr_authors_by_author ON pr_authors (author, pr);
+        """)
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if stored is None or stored[0] != str(GRAPH_VERSION):
+            with self.connection:  # Links stored by another version may be incomplete: start over
+                for table in ("issues", "prs", "authors", "issue_prs", "pr_authors", "meta"):
+                    self.connection.execute(f"DELETE FROM {table}")
+                self.connection.execute("INSERT INTO meta (key, value) VALUES ('version', ?)", (str(GRAPH_VERSION),))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Updates ---
+
+    def _pr_id(self, pr):
+        """Row of a PR, created or completed with what `pr` knows about it."""
+        self.connection.execute(
+            "INSERT INTO prs (key, number, url, status, created) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET number = coalesce(number, excluded.number), "
+            "url = CASE WHEN excluded.url != '' THEN excluded.url ELSE url END, "
+            "status = CASE WHEN excluded.status != '' THEN excluded.status ELSE status END, "
+            "created = coalesce(created, excluded.created)",
+            (pr_key(pr), pr.get("number"), pr.get("url") or "", (pr.get("status") or "").lower(),
+             _date(pr.get("created"))),
+        )
+        return self.connection.execute("SELECT pr FROM prs WHERE key = ?", (pr_key(pr),)).fetchone()[0]
+
+    def _author_id(self, login):
+        self.connection.execute("INSERT OR IGNORE INTO authors (login) VALUES (?)", (login,))
+        return self.connection.execute("SELECT author FROM authors WHERE login = ?", (login,)).fetchone()[0]
+
+    def _authors_of(self, prs):
+        return {author for pr in prs for (author,) in
+                self.connection.execute("SELECT author FROM pr_authors WHERE pr = ?", (pr,))}
+
+    def _add_links(self, issue, prs, touched):
+        for pr in prs:
+            pr_id = self._pr_id(pr)
+            self.connection.execute("INSERT OR IGNORE INTO issue_prs (issue, pr) VALUES (?, ?)", (issue, pr_id))
+            touched.add(pr_id)
+            for login in pr.get("authors") or []:
+                self.connection.execute("INSERT OR IGNORE INTO pr_authors (pr, author) VALUES (?, ?)",
+                                        (pr_id, self._author_id(login)))
+
+    def _refresh(self, touched):
+        """Recomputes the counts and first-PR dates that depend on the PRs in `touched`."""
+        connection = self.connection
+        authors = self._authors_of(touched)
+        issues = set()
+        for pr in touched:
+            count = connection.execute("SELECT COUNT(*) FROM issue_prs WHERE pr = ?", (pr,)).fetchone()[0]
+            if count:
+                connection.execute("UPDATE prs SET issues = ? WHERE pr = ?", (count, pr))
+                issues.update(issue for (issue,) in connection.execute("SELECT issue FROM issue_prs WHERE pr = ?",
+                                                                        (pr,)))
+            else:  # No issue links it anymore
+                connection.execute("DELETE FROM pr_authors WHERE pr = ?", (pr,))
+                connection.execute("DELETE FROM prs WHERE pr = ?", (pr,))
+        for author in authors:
+            prs, issue_count = connection.execute(
+                "SELECT COUNT(DISTINCT pr_authors.pr), COUNT(DISTINCT issue_prs.issue) FROM pr_authors "
+                "JOIN issue_prs ON issue_prs.pr = pr_authors.pr WHERE pr_authors.author = ?", (author,)
+            ).fetchone()
+            if prs:
+                connection.execute("UPDATE authors SET prs = ?, issues = ? WHERE author = ?",
+                                   (prs, issue_count, author))
+            else:
+                connection.execute("DELETE FROM authors WHERE author = ?", (author,))
+        for issue in issues:
+            self._refresh_issue(issue)
+
+    def _refresh_issue(self, issue):
+        self.connection.execute(
+            "UPDATE issues SET first_pr = (SELECT MIN(prs.created) FROM issue_prs JOIN prs ON prs.pr = issue_prs.pr "
+            "WHERE issue_prs.issue = issues.issue) WHERE issue = ?", (issue,)
+        )
+        self.connection.execute(
+            "UPDATE issues SET days_to_first_pr = CAST(julianday(first_pr) - julianday(filed) AS INTEGER) "
+            "WHERE issue = ?", (issue,)
+        )
+
+    def _unlink_issue(self, issue, touched):
+        touched.update(pr for (pr,) in self.connection.execute("SELECT pr FROM issue_prs WHERE issue = ?", (issue,)))
+        self.connection.execute("DELETE FROM issue_prs WHERE issue = ?", (issue,))
+
+    def _link_issue(self, issue, filed, prs, row_hash, touched):
+        self._unlink_issue(issue, touched)
+        self.connection.execute(
+            "INSERT INTO issues (issue, filed, row_hash) VALUES (?, ?, ?) "
+            "ON CONFLICT (issue) DO UPDATE SET filed = excluded.filed, row_hash = excluded.row_hash",
+            (issue, _date(filed), row_hash),
+        )
+        self._add_links(issue, prs, touched)
+        self._refresh_issue(issue)  # Also when it has no PRs left
+
+    def link_issue(self, issue, filed, prs, row_hash=""):
+        """
+        Replaces the PRs of an issue. `prs` are dicts with a number and/or url, and
+        optionally authors, status and created (the dataset's PR structs).
+        """
+        self.link_issues([(issue, filed, prs, row_hash)])
+
+    def link_issues(self, rows):
+        """link_issue() for many (issue, filed, prs, row_hash) tuples, in one transaction; returns how many."""
+        touched = set()
+        linked = 0
+        with self.connection:
+            for issue, filed, prs, row_hash in rows:
+                self._link_issue(issue, filed, prs, row_hash, touched)
+                linked += 1
+            self._refresh(touched)
+        return linked
+
+    def link_pr(self, issue, pr):
+        """Adds one PR to an issue's links, keeping the issue's other PRs."""
+        touched = set()
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO issues (issue) VALUES (?)", (issue,))
+            self._add_links(issue, [pr], touched)
+            self._refresh(touched)
+
+    def remove_issues(self, issues):
+        touched = set()
+        with self.connection:
+            for issue in issues:
+                self._unlink_issue(issue, touched)
+                self.connection.execute("DELETE FROM issues WHERE issue = ?", (issue,))
+            self._refresh(touched)
+
+    def row_hashes(self):
+        """{issue: row hash} of every issue in the graph."""
+        return dict(self.connection.execute("SELECT issue, row_hash FROM issues"))
+
+    def stamp(self, sources=GRAPH_SOURCES):
+        """Records the files the graph is now up to date with (see is_current())."""
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sources', ?)",
+                                    (json.dumps(source_stamps(sources)),))
+
+    def is_current(self):
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'sources'").fetchone()
+        if stored is None:
+            return False
+        sources = json.loads(stored[0])
+        return source_stamps(sources) == sources
+
+    # --- Queries ---
+
+    def author(self, login):
+        """(PRs, issues) the author is associated with, or None for an unknown author."""
+        return self.connection.execute("SELECT prs, issues FROM authors WHERE login = ?", (login,)).fetchone()
+
+    def top_authors(self, by="prs", limit=TOP):
+        """[(login, PRs, issues)] of the authors with the most PRs (or issues, `by`="issues")."""
+        order = {"prs": "prs DESC, login", "issues": "issues DESC, login"}[by]
+        query = f"SELECT login, prs, issues FROM authors ORDER BY {order}"
+        if limit is not None:
+            return self.connection.execute(query + " LIMIT ?", (limit,)).fetchall()
+        return self.connection.execute(query).fetchall()
+
+    def author_counts(self, by="prs"):
+        """{author: count} of every author, largest counts first (ties by name)."""
+        return {login: prs if by == "prs" else issues for login, prs, issues in self.top_authors(by, None)}
+
+    def pr(self, key):
+        """Stored fields of a PR, by number or URL, or None."""
+        row = self.connection.execute("SELECT pr, number, url, status, created, issues FROM prs WHERE key = ?",
+                                      (str(key),)).fetchone()
+        if row is None:
+            return None
+        pr_id, number, url, status, created, issues = row
+        authors = [login for (login,) in self.connection.execute(
+            "SELECT login FROM pr_authors JOIN authors ON authors.author = pr_authors.author "
+            "WHERE pr_authors.pr = ? ORDER BY login", (pr_id,))]
+        return {"number": number, "url": url, "status": status, "created": created, "issues": issues,
+                "authors": authors}
+
+    def issues_of_pr(self, key):
+        return [issue for (issue,) in self.connection.execute(
+            "SELECT issue_prs.issue FROM prs JOIN issue_prs ON issue_prs.pr = prs.pr WHERE prs.key = ? "
+            "ORDER BY issue_prs.issue", (str(key),))]
+
+    def prs_of_issue(self, issue):
+        return [key for (key,) in self.connection.execute(
+            "SELECT prs.key FROM issue_prs JOIN prs ON prs.pr = issue_prs.pr WHERE issue_prs.issue = ? "
+            "ORDER BY prs.created, prs.key", (issue,))]
+
+    def days_to_first_pr(self, issue):
+        """Days from filing the issue to creating its first PR, or None when either date is unknown."""
+        row = self.connection.execute("SELECT days_to_first_pr FROM issues WHERE issue = ?", (issue,)).fetchone()
+        return row[0] if row else None
+
+    def first_pr_statistics(self):
+        """Distribution of the days from filing to first PR, over the issues where both dates are known."""
+        known = "FROM issues WHERE days_to_first_pr IS NOT NULL"
+        count, mean, low, high = self.connection.execute(
+            f"SELECT COUNT(*), AVG(days_to_first_pr), MIN(days_to_first_pr), MAX(days_to_first_pr) {known}"
+        ).fetchone()
+        if not count:
+            return {"count": 0}
+        # The middle value(s), walking the index on days_to_first_pr
+        middle = [row[0] for row in self.connection.execute(
+            f"SELECT days_to_first_pr {known} ORDER BY days_to_first_pr LIMIT ? OFFSET ?",
+            (2 - count % 2, (count - 1) // 2))]
+        return {"count": count, "mean": round(mean, 2), "median": statistics.fmean(middle), "min": low, "max": high}
+
+    def statistics(self):
+        """PR statistics with the keys of issue_stats.compute_statistics()['prs']."""
+        total, issues_with_prs = self.connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT issue) FROM issue_prs").fetchone()
+        prs_per_author = self.author_counts("prs")
+        return {
+            "total": total,
+            "unique": self.connection.execute("SELECT COUNT(*) FROM prs").fetchone()[0],
+            "issues_with_prs": issues_with_prs,
+            "authors": len(prs_per_author),
+            "associations": sum(prs_per_author.values()),  # (PR, author) pairs
+            "prs_per_author": prs_per_author,
+            "issues_per_author": self.author_counts("issues"),
+        }
+
+
+def update_graph(graph_path=GRAPH_FILE, dataset_file=None):
+    """Relinks the issues of the dataset whose 'Row Hash' changed and drops the ones no longer in it."""
+    import pyarrow as pa  # pyarrow (and pandas, via issue_dataset): only needed to read the dataset
+    import pyarrow.compute as pc
+    from issue_dataset import DATASET_FILE, load_table
+
+    default_dataset = dataset_file is None
+    dataset_file = dataset_file or DATASET_FILE
+    hashes = load_table(columns=['Issue #', 'Row Hash'], dataset_file=dataset_file).to_pydict()
+    current = dict(zip(hashes['Issue #'], hashes['Row Hash']))
+    with PRGraph(graph_path) as graph:
+        stored = graph.row_hashes()
+        changed = [issue for issue, row_hash in current.items() if stored.get(issue) != row_hash]
+        removed = [issue for issue in stored if issue not in current]
+        if changed:
+            table = load_table(columns=['Issue #', 'Date Filed', 'PRs', 'Row Hash'], dataset_file=dataset_file,
+                               rebuild_if_stale=False)
+            table = table.filter(pc.is_in(table.column('Issue #'), value_set=pa.array(changed, pa.int64())))
+            graph.link_issues((row['Issue #'], row['Date Filed'], row['PRs'], row['Row Hash'])
+                              for row in table.to_pylist())
+        if removed:
+            graph.remove_issues(removed)
+        if default_dataset:  # Stamped after load_table() rebuilt a stale dataset
+            graph.stamp()
+        statistics = graph.statistics()
+    print(f"Relinked {len(changed)} new or changed issues and removed {len(removed)} in '{graph_path}' "
+          f"({statistics['issues_with_prs']} issues with {statistics['unique']} PRs by {statistics['authors']} "
+          f"authors).")
+
+
+def current_graph(graph_path=GRAPH_FILE):
+    """The PR graph, updated first if the dataset or its sources changed since it was (no pandas/pyarrow otherwise)."""
+    graph = PRGraph(graph_path)
+    if not graph.is_current():
+        graph.close()
+        update_graph(graph_path)
+        graph = PRGraph(graph_path)
+    return graph
+
+
+def print_authors(rows):
+    for login, prs, issues in rows:
+        print(f"{login}: {prs} PRs, {issues} issues")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Issue, PR and PR author graph of the fusil issues.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="Link the new and changed issues of the dataset.")
+    update_parser.add_argument("--dataset", help="Dataset file (default: the issue dataset, rebuilt if stale).")
+    top_parser = subparsers.add_parser("top", help="Authors with the most PRs or issues.")
+    top_parser.add_argument("--by", choices=("prs", "issues"), default="prs")
+    top_parser.add_argument("-n", "--limit", type=int, default=TOP, help=f"Authors to show (default: {TOP}).")
+    author_parser = subparsers.add_parser("author", help="PRs and issues of an author.")
+    author_parser.add_argument("login")
+    pr_parser = subparsers.add_parser("pr", help="A PR and the issues it's linked to.")
+    pr_parser.add_argument("pr", help="PR number (or URL for PRs without one).")
+    issue_parser = subparsers.add_parser("issue", help="The PRs of an issue and the days to the first one.")
+    issue_parser.add_argument("issue", type=int)
+    subparsers.add_parser("first-pr", help="Days from filing an issue to its first PR.")
+    subparsers.add_parser("stats", help="PR statistics as JSON, like the report statistics' 'prs'.")
+    parser.add_argument("--graph", default=GRAPH_FILE)
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        update_graph(args.graph, args.dataset)
+        return
+    if args.graph == GRAPH_FILE:
+        graph = current_graph(args.graph)
+    elif os.path.exists(args.graph):
+        graph = PRGraph(args.graph)
+    else:
+        parser.error(f"'{args.graph}' doesn't exist; build it with the update command")
+    with graph:
+        if args.command == "top":
+            print_authors(graph.top_authors(args.by, args.limit))
+        elif args.command == "author":
+            counts = graph.author(args.login)
+            if counts is None:
+                parser.error(f"no PRs by {args.login!r}")
+            print_authors([(args.login, *counts)])
+        elif args.command == "pr":
+            pr = graph.pr(args.pr)
+            if pr is None:
+                parser.error(f"PR {args.pr} isn't linked to any issue")
+            print(f"PR {pr['number'] or pr['url']} ({pr['status'] or 'unknown state'}, created "
+                  f"{pr['created'] or 'on an unknown date'}) by {', '.join(pr['authors']) or 'unknown authors'}")
+            print(f"Linked to {pr['issues']} issues: {', '.join(map(str, graph.issues_of_pr(args.pr)))}")
+        elif args.command == "issue":
+            prs = graph.prs_of_issue(args.issue)
+            print(f"Issue #{args.issue}: {len(prs)} PRs{': ' + ', '.join(prs) if prs else ''}")
+            days = graph.days_to_first_pr(args.issue)
+            if days is not None:
+                print(f"First PR {days} days after filing")
+        elif args.command == "first-pr":
+            for key, value in graph.first_pr_statistics().items():
+                print(f"{key}: {value}")
+        else:
+            print(json.dumps(graph.statistics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import random
+import threading
+import time
+
+from github.GithubException import GithubException, RateLimitExceededException
+
+# Request scheduling for the GitHub collector.
+# GitHub enforces a primary quota (5000 core / 30 search requests per hour/minute, reported
+# in X-RateLimit-* headers) and undocumented secondary limits that answer 403/429 with a
+# Retry-After header when requests come too fast. RequestScheduler spaces requests with a
+# token bucket per API resource, and retries rate-limited calls after the delay GitHub asks
+# for. GraphQL reports its primary limit differently: HTTP 200 with a RATE_LIMITED error,
+# which PyGithub raises as a 400; that is retried too. The quota of each resource is tracked
+# from the X-RateLimit-* headers of its own responses (X-RateLimit-Resource says which quota
+# a response counts against). Requests run at the bucket's full rate until a quota runs low;
+# then they are spread over the time left until it resets.
+
+DEFAULT_CORE_RATE = 15.0    # requests per second against the core API: GitHub's secondary limit is 900/minute
+DEFAULT_SEARCH_RATE = 0.5   # the search API allows 30 requests per minute
+DEFAULT_GRAPHQL_RATE = 1.0  # GraphQL queries are costed in points; each of ours covers many issues
+PACING_REMAINING_FRACTION = 0.1  # with less than 10% of a quota left, spread it until the reset
+MIN_REMAINING_FRACTION = 0.01  # with less than 1% of the quota left, wait for it to reset
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RequestScheduler:
+    """
+    Runs GitHub API calls through per-resource token buckets with quota-aware retries.
+
+    `call(resource, func)` waits for a token of the given resource ("core", "search" or "graphql"),
+    runs func() and returns its result. Calls that fail with 403/429 rate-limit errors are
+    retried up to `max_retries` times, sleeping for Retry-After, until X-RateLimit-Reset, or
+    with exponential backoff, in that order of preference.
+
+    Every response the client gets through `github.requester.requestJsonAndCheck` (all REST
+    and GraphQL requests, including PyGithub's lazy loads and pages) updates `quotas`.
+    """
+
+    def __init__(self, github, core_rate=DEFAULT_CORE_RATE, search_rate=DEFAULT_SEARCH_RATE,
+                 max_retries=5, min_remaining_fraction=MIN_REMAINING_FRACTION, graphql_rate=DEFAULT_GRAPHQL_RATE,
+                 pacing_remaining_fraction=PACING_REMAINING_FRACTION):
+        self.github = github
+        self.buckets = {"core": TokenBucket(core_rate), "search": TokenBucket(search_rate),
+                        "graphql": TokenBucket(graphql_rate)}
+        self.base_rates = {"core": core_rate, "search": search_rate, "graphql": graphql_rate}
+        self.max_retries = max_retries
+        self.min_remaining_fraction = min_remaining_fraction
+        self.pacing_remaining_fraction = pacing_remaining_fraction
+        self.quotas = {}  # Resource -> (remaining, limit, reset timestamp) of its latest response
+        self.request_count = 0
+        self.retry_count = 0
+        self.lock = threading.Lock()
+        self._calling = threading.local()  # Resource of the call running in this thread
+        self._observe(github.requester)
+
+    def _observe(self, requester):
+        """Wraps the requester so that every response records the quota it counts against."""
+        request = requester.requestJsonAndCheck
+
+        def observed(*args, **kwargs):
+            try:
+                headers, data = request(*args, **kwargs)
+            except GithubException as e:
+                self.record_quota(e.headers)
+                raise
+            self.record_quota(headers)
+            return headers, data
+
+        requester.requestJsonAndCheck = observed
+
+    def record_quota(self, headers):
+        """Stores the X-RateLimit-* values of a response under its X-RateLimit-Resource."""
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        resource = headers.get("x-ratelimit-resource") or getattr(self._calling, "resource", None)
+        try:
+            quota = (int(float(headers["x-ratelimit-remaining"])), int(float(headers["x-ratelimit-limit"])),
+                     float(headers.get("x-ratelimit-reset", 0)))
+        except (KeyError, ValueError):
+            return
+        if resource in self.buckets:
+            with self.lock:
+                self.quotas[resource] = quota
+
+    def _adapt_to_quota(self, resource):
+        """
+        Runs the bucket at its base rate while the quota lasts; once it runs low, spreads what's
+        left until the reset, and sleeps until the reset if it's nearly exhausted.
+        """
+        quota = self.quotas.get(resource)
+        if quota is None or quota[1] <= 0:  # No response of this resource seen yet
+            return
+        remaining, limit, reset = quota
+        seconds_to_reset = max(1.0, reset - time.time())
+        if remaining <= limit * self.min_remaining_fraction:
+            print(f"  {resource.title()} rate limit nearly exhausted ({remaining}/{limit} left), "
+                  f"sleeping {seconds_to_reset:.0f}s until reset.")
+            time.sleep(seconds_to_reset)
+            with self.lock:
+                self.quotas.pop(resource, None)  # Stale until the next response
+            return
+        rate = self.base_rates[resource]
+        if remaining <= limit * self.pacing_remaining_fraction:
+            rate = min(rate, remaining / seconds_to_reset)
+        self.buckets[resource].rate = rate
+
+    def _retry_delay(self, exception, attempt):
+        headers = {key.lower(): value for key, value in (getattr(exception, "headers", None) or {}).items()}
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+        if headers.get("x-ratelimit-remaining") == "0" and "x-ratelimit-reset" in headers:
+            return max(1.0, float(headers["x-ratelimit-reset"]) - time.time())
+        return min(300.0, 2 ** attempt * 5) + random.uniform(0, 1)
+
+    def is_rate_limited(self, exception):
+        status = getattr(exception, "status", None)
+        if isinstance(exception, RateLimitExceededException) or status == 429:
+            return True
+        data = getattr(exception, "data", None)
+        errors = data.get("errors") if isinstance(data, dict) else None
+        if any(isinstance(error, dict) and error.get("type") == "RATE_LIMITED" for error in errors or []):
+            return True
+        return status == 403 and "rate limit" in str(data or "").lower()
+
+    def call(self, resource, func, *args, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            self._adapt_to_quota(resource)
+            self.buckets[resource].acquire()
+            with self.lock:
+                self.request_count += 1
+            self._calling.resource = resource
+            try:
+                return func(*args, **kwargs)
+            except GithubException as e:
+                if attempt == self.max_retries or not self.is_rate_limited(e):
+                    raise
+                delay = self._retry_delay(e, attempt)
+                with self.lock:
+                    self.retry_count += 1
+                print(f"  Rate limited ({e.status}), retrying in {delay:.0f}s "
+                      f"(attempt {attempt + 1}/{self.max_retries}).")
+                time.sleep(delay)
+
+    def iterate_pages(self, resource, paginated_list):
+        """Yields the items of a PyGithub PaginatedList, fetching each page through call()."""
+        page = 0
+        while True:
+            items = self.call(resource, paginated_list.get_page, page)
+            yield from items
+            if len(items) < self.github.per_page:  # A short page is the last one
+                return
+            page += 1
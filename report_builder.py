@@ -0,0 +1,375 @@
+import os
+import re
+import json
+import hashlib
+import argparse
+
+import instrumentation
+from issue_dataset import DATASET_FILE, load_table
+from issue_stats import STATISTICS_COLUMNS, UNKNOWN, compute_statistics
+from report_summary import resolve
+
+# Renders cpython_report.md from cpython_report.template.md and the issue dataset.
+#
+# The template is plain Markdown with {{ ... }} placeholders:
+#   {{ issues.total }}                               a value of the statistics (issue_stats.py)
+#   {{ percent(prs.prs_per_author.vstinner, prs.unique) }}   {{ round(days_to_close.mean) }}
+#   {{ count_table(by_guessed_kind, Kind, Number of Issues) }}   counts with a Total row
+#   {{ author_table(prs.issues_per_author, GitHub User, Issues Involved) }}
+#   {{ pr_share_table() }}                           PRs per author with their share
+#   {{ summary_table() }}                            one row per finding
+#   {{ findings() }}                                 the Appendix entries (on its own line)
+#
+# The document is cut into units: one per template section (split at headings) and one per
+# Appendix entry. Each unit has a dependency hash over its template text and the data it
+# reads: the statistics its placeholders use, or the 'Row Hash' of its issue. The build cache
+# keeps the hash of every unit and where its text is in the previous report (plus the cells
+# of each summary table row), so a rebuild after one issue changes only re-renders that
+# issue's entry and the sections whose statistics moved. Only the small columns are read
+# for unchanged issues; the full rows (with reproducers and backtraces) are read for the
+# entries that need rendering. If the report was edited by hand, everything is re-rendered.
+
+TEMPLATE_FILE = "cpython_report.template.md"
+REPORT_FILE = "cpython_report.md"
+BUILD_CACHE_FILE = "cpython_report.md.build.json"
+
+PLACEHOLDER = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+CALL = re.compile(r"^(\w+)\((.*)\)$")
+FINDINGS_MARKER = re.compile(r"^\{\{\s*findings\(\)\s*\}\}\n?", re.MULTILINE)
+INDEX_COLUMNS = ['Issue #', 'Finding', 'Row Hash']
+SUMMARY_COLUMNS = ['Issue #', 'Report Status', 'Date Filed', 'Closed Date', 'Kind', 'Configuration',
+                   'Python Versions', 'PRs']
+# Bump when the rendering of entries or tables changes, to invalidate cached units
+RENDERER_VERSION = 1
+
+
+def _digest(*parts):
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _text_digest(text):
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def split_sections(template):
+    """Splits the template before every heading line that is not inside a code block."""
+    sections = []
+    current = []
+    in_code = False
+    for line in template.splitlines(keepends=True):
+        if line.startswith("```"):
+            in_code = not in_code
+        elif line.startswith("#") and not in_code and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def _parse_expression(expression):
+    """(function name or None, arguments) of a placeholder."""
+    match = CALL.match(expression)
+    if not match:
+        return None, [expression]
+    arguments = [argument.strip() for argument in match.group(2).split(",")] if match.group(2).strip() else []
+    return match.group(1), arguments
+
+
+def _date(value):
+    return value.strftime("%d/%m/%Y") if value is not None else ""
+
+
+def _markdown_table(headers, rows):
+    widths = [max([len(header)] + [len(row[column]) for row in rows]) for column, header in enumerate(headers)]
+    lines = ["| " + " | ".join(header.ljust(width) for header, width in zip(headers, widths)) + " |",
+             "|" + "|".join("-" * (width + 2) for width in widths) + "|"]
+    lines.extend("| " + " | ".join(cell.ljust(width) for cell, width in zip(row, widths)) + " |" for row in rows)
+    return "\n".join(lines)
+
+
+def count_table(counts, first_header, second_header):
+    ordered = sorted(counts.items(), key=lambda item: (item[0] == UNKNOWN, -item[1], item[0]))
+    rows = [[value, str(count)] for value, count in ordered]
+    rows.append(["**Total**", f"**{sum(counts.values())}**"])
+    return _markdown_table([first_header, second_header], rows)
+
+
+def author_table(counts, first_header, second_header):
+    return _markdown_table([first_header, second_header], [[author, str(count)] for author, count in counts.items()])
+
+
+def percent(part, whole):
+    return f"{part / whole:.1%}" if whole else "0.0%"
+
+
+def pr_share_table(statistics):
+    prs = statistics["prs"]
+    rows = [[author, str(count), percent(count, prs["unique"])] for author, count in prs["prs_per_author"].items()]
+    rows.append(["**Total Unique PRs**", f"**{prs['unique']}**", ""])
+    rows.append(["**Total Associations**", f"**{prs['associations']}**", ""])
+    return _markdown_table(["GitHub User", "PRs Associated With", f"Involvement Share (of {prs['unique']} PRs)"], rows)
+
+
+SUMMARY_HEADERS = ["Issue Number", "Status", "Date filed", "Date closed", "Days open", "Kind", "Configuration",
+                   "Python versions", "Component", "Affected files", "PRs", "Number of PRs", "PR authors"]
+
+
+def summary_cells(row):
+    """The cells of one finding's row in the summary table."""
+    authors = []
+    for pr in row["PRs"]:
+        authors.extend(author for author in pr["authors"] if author not in authors)
+    days_open = ""
+    if row["Date Filed"] is not None and row["Closed Date"] is not None:
+        days_open = str((row["Closed Date"] - row["Date Filed"]).days)
+    configuration = row["Configuration"] or ""
+    return [
+        str(row["Issue #"]),
+        row["Report Status"] or "",
+        _date(row["Date Filed"]),
+        _date(row["Closed Date"]),
+        days_open,
+        row["Kind"] or "",
+        configuration.title() if configuration.islower() else configuration,
+        ", ".join(row["Python Versions"]),
+        "",  # Component and affected files aren't tracked yet
+        "",
+        ", ".join(str(pr["number"]) for pr in row["PRs"] if pr["number"] is not None),
+        str(len(row["PRs"])),
+        ", ".join(f"@{author}" for author in authors),
+    ]
+
+
+def summary_table(rows):
+    return _markdown_table(SUMMARY_HEADERS, [summary_cells(row) for row in rows])
+
+
+def render_finding(number, row):
+    """One Appendix entry."""
+    lines = [f"#### {number}- [{row['Issue #']}]({row['HTML URL']}) - {row['Title']}", ""]
+    for note in row["Notes"]:
+        lines.extend([note, ""])
+    for mre in row["MREs"] or [""]:
+        lines.extend(["```python", mre, "```", ""])
+    lines.append(f"- Issue Number: {row['Issue #']}")
+    lines.append(f"- Date filed: {_date(row['Date Filed'])}")
+    if row["Closed Date"] is not None:
+        lines.append(f"- Date closed: {_date(row['Closed Date'])}")
+    lines.append(f"- Kind: {row['Kind'] or ''}")
+    lines.append(f"- Configuration: {row['Configuration'] or ''}")
+    lines.append(f"- Python versions: {', '.join(row['Python Versions'])}")
+    lines.append(f"- Status: {row['Report Status'] or ''}")
+    lines.append("- PRs (author):")
+    for pr in row["PRs"]:
+        authors = ", ".join(f"@{author}" for author in pr["authors"])
+        lines.append(f"  - [{pr['number']}]({pr['url']}) ({authors})")
+    if not row["PRs"]:
+        lines.append("  - None yet" if (row["Report Status"] or "").lower() == "open" else "  - None")
+    lines.extend(["", "<details><summary>Backtrace/error message:</summary>", "<p>", "", ""])
+    for backtrace in row["Backtraces"] or [""]:
+        lines.extend(["```shell", backtrace, "```"])
+    lines.extend(["</p>", "</details>", "", "----------", "", ""])
+    return "\n".join(lines)
+
+
+class ReportBuilder:
+    """Renders a report, reusing the units of the previous build whose inputs didn't change."""
+
+    def __init__(self, template_file=TEMPLATE_FILE, output_file=REPORT_FILE, dataset_file=DATASET_FILE,
+                 cache_file=BUILD_CACHE_FILE):
+        self.template_file = template_file
+        self.output_file = output_file
+        self.dataset_file = dataset_file
+        self.cache_file = cache_file
+        self.rendered_units = 0
+        self.reused_units = 0
+
+    def _load_cache(self):
+        """The previous build's cache and report text, or empty ones if they can't be reused."""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            with open(self.output_file, 'r', encoding='utf-8') as f:
+                previous_report = f.read()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}, ""
+        # Unit texts are slices of the previous report, so it must be exactly what we wrote
+        if cache.get("version") != RENDERER_VERSION or cache.get("report_hash") != _text_digest(previous_report):
+            return {}, ""
+        return cache, previous_report
+
+    def _save_cache(self, cache):
+        tmp_file = self.cache_file + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(cache))  # Much faster than json.dump's chunked writes for a large cache
+        os.replace(tmp_file, self.cache_file)
+
+    def _findings_order(self, index):
+        """(finding number, issue, row position) for every issue, new issues numbered after the last finding."""
+        known = sorted((finding, issue, position) for position, (issue, finding)
+                       in enumerate(zip(index['Issue #'], index['Finding'])) if finding is not None)
+        next_number = max((finding for finding, _, _ in known), default=0) + 1
+        new = sorted((issue, position) for position, (issue, finding)
+                     in enumerate(zip(index['Issue #'], index['Finding'])) if finding is None)
+        return known + [(next_number + offset, issue, position) for offset, (issue, position) in enumerate(new)]
+
+    def _placeholder_dependencies(self, section, statistics, row_hashes):
+        dependencies = {}
+        for expression in PLACEHOLDER.findall(section):
+            function, arguments = _parse_expression(expression)
+            if function == "summary_table":
+                dependencies[expression] = row_hashes
+            else:
+                dependencies[expression] = [resolve(argument, statistics) for argument in arguments]
+        if "pr_share_table()" in dependencies:
+            dependencies["pr_share_table()"] = statistics["prs"]
+        return dependencies
+
+    def _summary_rows(self, table, order, index, previous_rows):
+        """
+        Cells of every summary table row, keyed by issue number.
+
+        Rows whose 'Row Hash' is unchanged come from the cache; only the others are read
+        from the dataset.
+        """
+        rows = {}
+        pending = []
+        for _, issue, position in order:
+            row_hash = index['Row Hash'][position]
+            cached = previous_rows.get(str(issue))
+            if cached is not None and cached[0] == row_hash:
+                rows[str(issue)] = cached
+            else:
+                rows[str(issue)] = None  # Keeps the table order
+                pending.append((issue, position, row_hash))
+        if pending:
+            changed = table.select(SUMMARY_COLUMNS).take([position for _, position, _ in pending]).to_pylist()
+            for (issue, _, row_hash), row in zip(pending, changed):
+                rows[str(issue)] = [row_hash, summary_cells(row)]
+        return rows
+
+    def _render_placeholders(self, section, statistics, summary_rows):
+        def substitute(match):
+            function, arguments = _parse_expression(match.group(1))
+            values = [resolve(argument, statistics) for argument in arguments]
+            if function is None:
+                return str(values[0])
+            if function == "percent":
+                return percent(*values)
+            if function == "round":
+                return str(round(values[0]))
+            if function == "count_table":
+                return count_table(*values)
+            if function == "author_table":
+                return author_table(*values)
+            if function == "pr_share_table":
+                return pr_share_table(statistics)
+            if function == "summary_table":
+                return _markdown_table(SUMMARY_HEADERS, [cells for _, cells in summary_rows().values()])
+            raise ValueError(f"Unknown template function '{function}' in '{match.group(0)}'")
+        return PLACEHOLDER.sub(substitute, section)
+
+    def build(self):
+        """Renders the report; returns True if the output file changed."""
+        with open(self.template_file, 'r', encoding='utf-8') as f:
+            template = f.read()
+        table = load_table(dataset_file=self.dataset_file)  # Memory-mapped: columns are only read when used
+        statistics = compute_statistics(table.select(STATISTICS_COLUMNS))
+        index = table.select(INDEX_COLUMNS).to_pydict()
+        order = self._findings_order(index)
+        row_hashes = [index['Row Hash'][position] for _, _, position in order]
+
+        cache, previous_report = self._load_cache()
+        previous_units = cache.get("units", {})  # Unit id -> [dependency hash, start, end] in the previous report
+        summary_cache = {}
+
+        def summary_rows():
+            if not summary_cache:
+                summary_cache.update(self._summary_rows(table, order, index, cache.get("summary_rows", {})))
+            return summary_cache
+
+        texts = {}
+        hashes = {}
+        layout = []  # Unit ids in document order
+        pending_findings = []  # (unit id, finding number, row position) to render
+
+        def add_unit(unit_id, unit_hash):
+            """Reuses the previous text of the unit if its hash didn't change; returns True if it did."""
+            layout.append(unit_id)
+            hashes[unit_id] = unit_hash
+            previous = previous_units.get(unit_id)
+            if previous is not None and previous[0] == unit_hash:
+                texts[unit_id] = previous_report[previous[1]:previous[2]]
+                self.reused_units += 1
+                return False
+            return True
+
+        with instrumentation.stage("render sections"):
+            for section_number, section in enumerate(split_sections(template)):
+                parts = FINDINGS_MARKER.split(section, maxsplit=1)
+                for part_number, part in enumerate(parts):
+                    if part_number:  # The findings() marker was between the previous part and this one
+                        for finding, issue, position in order:
+                            unit_id = f"finding:{issue}"
+                            # The row hash already covers every field, so no need to hash it again
+                            if add_unit(unit_id, f"{finding}:{index['Row Hash'][position]}"):
+                                pending_findings.append((unit_id, finding, position))
+                    unit_id = f"section:{section_number}.{part_number}"
+                    if add_unit(unit_id, _digest(part, self._placeholder_dependencies(part, statistics, row_hashes))):
+                        texts[unit_id] = self._render_placeholders(part, statistics, summary_rows)
+                        self.rendered_units += 1
+
+        if pending_findings:
+            with instrumentation.stage("render findings"):
+                rows = table.take([position for _, _, position in pending_findings]).to_pylist()
+                for (unit_id, finding, _), row in zip(pending_findings, rows):
+                    texts[unit_id] = render_finding(finding, row)
+                    self.rendered_units += 1
+                instrumentation.count(rows=len(rows))
+
+        units = {}
+        offset = 0
+        for unit_id in layout:
+            units[unit_id] = [hashes[unit_id], offset, offset + len(texts[unit_id])]
+            offset += len(texts[unit_id])
+        report = "".join(texts[unit_id] for unit_id in layout)
+        if report == previous_report and units == previous_units:
+            return False  # Nothing to write, not even the cache
+        changed = report != previous_report
+        with instrumentation.stage("write report"):
+            if changed:
+                tmp_file = self.output_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(report)
+                os.replace(tmp_file, self.output_file)
+            self._save_cache({"version": RENDERER_VERSION, "report_hash": _text_digest(report), "units": units,
+                              "summary_rows": summary_cache or cache.get("summary_rows", {})})
+        return changed
+
+
+def build_report(template_file=TEMPLATE_FILE, output_file=REPORT_FILE, dataset_file=DATASET_FILE,
+                 cache_file=BUILD_CACHE_FILE, full=False):
+    if full and os.path.exists(cache_file):
+        os.remove(cache_file)
+    builder = ReportBuilder(template_file, output_file, dataset_file, cache_file)
+    changed = builder.build()
+    return builder, changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the report from its template and the issue dataset.")
+    parser.add_argument("--template", default=TEMPLATE_FILE)
+    parser.add_argument("--output", default=REPORT_FILE)
+    parser.add_argument("--dataset", default=DATASET_FILE)
+    parser.add_argument("--cache", default=BUILD_CACHE_FILE)
+    parser.add_argument("--full", action="store_true", help="Ignore the build cache and render every unit.")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.session(args, "report_builder"):
+        report_builder, report_changed = build_report(args.template, args.output, args.dataset, args.cache,
+                                                      args.full)
+    print(f"Rendered {report_builder.rendered_units} units, reused {report_builder.reused_units}; "
+          f"'{args.output}' {'updated' if report_changed else 'unchanged'}.")
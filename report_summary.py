@@ -0,0 +1,101 @@
+import os
+import json
+import argparse
+
+# Small precomputed summary of the report statistics, for questions like "how many open
+# issues" that shouldn't pay for importing pandas, pyarrow and numpy.
+#
+# The summary is the dict of issue_stats.compute_statistics() plus the modification time
+# and size of every file it was computed from (the dataset and the CSVs and report it's
+# built from). It's written whenever the statistics are computed (issue_stats.py,
+# calculate_placeholders.py) and is only used while none of those files changed; otherwise
+# current_statistics() imports issue_stats, recomputes it and writes it again.
+#
+# This module only imports the standard library: keep it that way.
+
+SUMMARY_FILE = "report_summary.json"
+SUMMARY_VERSION = 1
+
+
+def source_stamps(paths):
+    """{path: [mtime_ns, size]} of each file in `paths`; None for missing files."""
+    stamps = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stamps[path] = None
+        else:
+            stamps[path] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def write_summary(statistics, sources, summary_file=SUMMARY_FILE):
+    summary = {"version": SUMMARY_VERSION, "sources": source_stamps(sources), "statistics": statistics}
+    tmp_file = summary_file + ".tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f)
+    os.replace(tmp_file, summary_file)
+
+
+def load_summary(summary_file=SUMMARY_FILE):
+    """The summarized statistics, or None if there is no summary or any of its sources changed."""
+    try:
+        with open(summary_file, encoding='utf-8') as f:
+            summary = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if summary.get("version") != SUMMARY_VERSION:
+        return None
+    sources = summary.get("sources", {})
+    if source_stamps(sources) != sources:
+        return None
+    return summary["statistics"]
+
+
+def current_statistics(summary_file=SUMMARY_FILE):
+    """The report statistics, from the summary when it's up to date (no pandas/pyarrow import)."""
+    statistics = load_summary(summary_file)
+    if statistics is None:
+        import issue_stats  # pyarrow, numpy and pandas: only when the summary must be recomputed
+        statistics = issue_stats.update_summary(summary_file=summary_file)
+    return statistics
+
+
+def resolve(path, statistics):
+    """The value at a dotted path of the statistics, or the path itself if there is none."""
+    value = statistics
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return path
+        value = value[part]
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer questions from the precomputed report summary.")
+    parser.add_argument("keys", nargs="*", metavar="KEY",
+                        help="Dotted paths into the statistics, e.g. issues.open or days_to_close.median "
+                             "(default: the issue counts).")
+    parser.add_argument("--summary", default=SUMMARY_FILE)
+    parser.add_argument("--json", action="store_true", help="Print the values as JSON.")
+    args = parser.parse_args(argv)
+
+    statistics = current_statistics(args.summary)
+    keys = args.keys or ["issues"]
+    missing = [key for key in keys if resolve(key, statistics) == key]
+    if missing:
+        parser.error(f"not in the summary: {', '.join(missing)} (top-level keys: {', '.join(statistics)})")
+    for key in keys:
+        value = resolve(key, statistics)
+        if args.json:
+            print(json.dumps(value, indent=2))
+        elif isinstance(value, dict):
+            for name, item in value.items():
+                print(f"{key}.{name}: {item}")
+        else:
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
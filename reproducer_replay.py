@@ -0,0 +1,421 @@
+import os
+import re
+import csv
+import json
+import time
+import signal
+import shlex
+import shutil
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+# Re-runs the reproducers of the campaign's issues against local CPython builds.
+#
+# Each issue's reproducer is its first MRE in the report's Appendix, or else the first
+# Python code block of its body, with interactive prompts (">>> ", "... ") stripped and
+# shell one-liners (`$ ./python -c "..."`) replaced by their -c code. It is
+# written to a script and run by every build given with --python, in a pool of worker
+# processes, each run in its own temporary directory and process group with a timeout and
+# rlimits (address space, CPU time, no core files). Sanitizer builds (found by asking each
+# build for its configure flags) get no address space limit: ASAN reserves terabytes of
+# shadow memory at startup and aborts under one. Outcomes:
+#
+#   segfault      killed by SIGSEGV or SIGBUS
+#   abort         killed by SIGABRT (failed assertions, most "Fatal Python error"s)
+#   asan          AddressSanitizer/UndefinedBehaviorSanitizer report (ASAN builds exit with 1)
+#   fatal error   "Fatal Python error" without an abort
+#   SystemError   an uncaught SystemError (a C function returned an error without setting one...)
+#   signal NAME   killed by another signal
+#   timeout       still running after --timeout seconds (or out of CPU time)
+#   exception     exited with another uncaught exception: usually fixed, now raising properly
+#   unrunnable    the reproducer itself doesn't compile (SyntaxError): it needs fixing by hand
+#   clean exit    exit status 0
+#   harness error the run couldn't start, e.g. a sanitizer refusing the memory limit; not an
+#                 outcome of the reproducer, so never cached
+#
+# The status matrix (issue x build) goes to a CSV. Results are cached by the hash of the
+# reproducer, of the build and of the run limits, so running again only re-runs the pairs
+# that changed: new reproducers, a rebuilt interpreter or different limits. A build's hash
+# covers its executable, sys.version, libpython (shared builds) and the C extension modules
+# on its sys.path outside site-packages, so rebuilding only an extension invalidates it too.
+# Changes to the pure Python stdlib of an in-tree build aren't seen: use --rerun after them.
+
+OUTPUT_FILE = "reproducer_status.csv"
+CACHE_FILE = "reproducer_results.cache.json"
+DEFAULT_TIMEOUT = 30.0  # Seconds
+DEFAULT_MEMORY_MB = 4096  # Address space limit of each run, except for sanitizer builds (use 0 for no limit)
+DEFAULT_WORKERS = os.cpu_count() or 1
+CRASHES = ("segfault", "abort", "asan", "fatal error", "SystemError")  # Outcomes meaning the bug is still there
+HARNESS_ERROR = "harness error"
+SCRIPT_NAME = "reproducer.py"
+STDERR_TAIL = 2000  # Characters of stderr kept with each result
+
+_CODE_BLOCK = re.compile(r"```(?:python|py|pycon)?[ \t]*\n(?P<code>.*?)```", re.S)
+_PROMPT = re.compile(r"^(?:>>>|\.\.\.)(?: |$)")
+_SHELL_PROMPT = re.compile(r"^\s*[$%]\s+")
+_SHELL_PYTHON = re.compile(r"^(?:\w+=\S*\s+)*\S*python[\w.]*(?:\s.*)?\s-c\b", re.S)  # [VAR=value ...] python ... -c
+_SANITIZER = re.compile(r"==\d+==ERROR: AddressSanitizer|runtime error: |ERROR: LeakSanitizer")
+_UNCAUGHT_SYSTEM_ERROR = re.compile(r"^SystemError\b", re.M)
+# Compiling the script failed: no traceback, just the error's location in the script
+_SCRIPT_SYNTAX_ERROR = re.compile(r'\A\s*File "[^"]*' + re.escape(SCRIPT_NAME) + r'", line \d+.*?'
+                                  r'^(?:SyntaxError|IndentationError|TabError)\b', re.S | re.M)
+# Sanitizer runtimes failing to set up their shadow memory, before any Python code runs
+_SANITIZER_STARTUP = re.compile(r"ReserveShadowMemoryRange failed|Shadow memory range interleaves|"
+                                r"failed to mmap the shadow memory|unexpected memory mapping|"
+                                r"runtime does not come first in initial library list")
+# Run with the build being inspected; prints its facts as JSON
+_BUILD_PROBE = """
+import importlib.machinery, json, os, sys, sysconfig
+flags = " ".join(str(sysconfig.get_config_var(name) or "") for name in ("CONFIG_ARGS", "PY_CFLAGS", "PY_LDFLAGS"))
+files = []
+for directory in sys.path:
+    if directory and "-packages" not in directory and os.path.isdir(directory):
+        files += [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                  if name.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES))]
+library = sysconfig.get_config_var("LDLIBRARY")
+if sysconfig.get_config_var("Py_ENABLE_SHARED") and library:
+    for directory in (sysconfig.get_config_var("LIBDIR"), os.path.dirname(sys.executable)):
+        if directory and os.path.isfile(os.path.join(directory, library)):
+            files.append(os.path.join(directory, library))
+print(json.dumps({"sanitizer": "sanitizer" in flags or "-fsanitize=" in flags, "version": sys.version,
+                  "files": files}))
+"""
+
+
+def _python_c_code(lines, start):
+    """
+    (code, next line) of a `python ... -c CODE` shell command starting at lines[start], or None.
+
+    The command ends at the first line where its quotes are balanced, so multi-line -c strings work.
+    """
+    command = _SHELL_PROMPT.sub("", lines[start], count=1)
+    if not _SHELL_PYTHON.match(command):
+        return None
+    for end in range(start, len(lines)):
+        try:
+            words = shlex.split(command)
+        except ValueError:  # Unbalanced quotes: the -c string goes on
+            if end + 1 < len(lines):
+                command += "\n" + lines[end + 1]
+            continue
+        if "-c" in words[:-1]:
+            return words[words.index("-c") + 1], end + 1
+        return None
+    return None
+
+
+def clean_reproducer(code):
+    """
+    The code of a reproducer, without the prompts (and output lines) of a pasted interactive
+    session, and with shell one-liners running Python replaced by their -c code.
+    """
+    lines = code.replace("\r\n", "\n").strip("\n").split("\n")
+    if any(_PROMPT.match(line) for line in lines):
+        lines = [line[4:] if len(line) > 3 else "" for line in lines if _PROMPT.match(line)]
+    cleaned, index = [], 0
+    while index < len(lines):
+        command = _python_c_code(lines, index)
+        if command is None:
+            cleaned.append(lines[index])
+            index += 1
+        else:
+            cleaned.extend(command[0].strip("\n").split("\n"))
+            index = command[1]
+    return "\n".join(cleaned) + "\n"
+
+
+def reproducer_source(mres, body=""):
+    """An issue's reproducer: its first MRE from the report, or else the first Python code block of its body."""
+    for mre in mres or []:
+        if mre.strip():
+            return clean_reproducer(mre)
+    if body:
+        if "\\n" in body and "\n" not in body:  # CSV snippets are '\n'-escaped
+            body = body.replace("\\n", "\n")
+        match = _CODE_BLOCK.search(body)
+        if match and match.group("code").strip():
+            return clean_reproducer(match.group("code"))
+    return None
+
+
+def load_reproducers(open_only=True, issues=None):
+    """[(issue number, title, reproducer)] of the dataset's issues that have one, oldest first."""
+    from issue_dataset import load_table  # pyarrow: only needed to read the dataset
+
+    rows = load_table(columns=['Issue #', 'Title', 'Status', 'MREs', 'Body Snippet (MRE/Backtrace hint)']).to_pylist()
+    reproducers = []
+    for row in rows:
+        if issues and row['Issue #'] not in issues:
+            continue
+        if open_only and not issues and (row['Status'] or "").lower() != "open":
+            continue
+        source = reproducer_source(row['MREs'], row['Body Snippet (MRE/Backtrace hint)'])
+        if source:
+            reproducers.append((row['Issue #'], row['Title'], source))
+    return reproducers
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_build(spec):
+    """(name, binary path) of a --python value: NAME=PATH, or PATH (also used as its name)."""
+    name, _, path = spec.rpartition("=")
+    resolved = shutil.which(path) or path
+    if not os.path.isfile(resolved):
+        raise ValueError(f"no such interpreter: {path}")
+    return name or path, os.path.realpath(resolved)
+
+
+def build_info(binary):
+    """
+    Facts about a build, from the build itself: {"sanitizer": True for ASAN/MSAN/UBSAN builds,
+    "version": sys.version, "files": [its libpython and C extension modules]}.
+    """
+    try:
+        process = subprocess.run([binary, "-I", "-c", _BUILD_PROBE], capture_output=True, text=True, timeout=60,
+                                 check=True)
+        return json.loads(process.stdout)
+    except (OSError, subprocess.SubprocessError, ValueError) as e:
+        print(f"Warning: could not inspect '{binary}' ({e}); treating it as a regular build, "
+              f"identified by its executable alone.")
+        return {"sanitizer": False, "version": "", "files": []}
+
+
+def build_hash(binary, info):
+    """Identity of a build: hash of its executable, version, libpython and extension modules."""
+    digest = hashlib.sha256(file_hash(binary).encode())
+    digest.update(info["version"].encode("utf-8"))
+    for path in sorted(set(info["files"])):
+        try:
+            digest.update(f"\0{path}\0{file_hash(path)}".encode("utf-8"))
+        except OSError:  # Gone since the probe
+            continue
+    return digest.hexdigest()
+
+
+def _limit_resources(memory_mb, cpu_seconds):
+    """Runs in the child between fork and exec; the pool's worker processes are single-threaded."""
+    if resource is None:
+        return
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    if memory_mb:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_mb << 20, memory_mb << 20))
+    if cpu_seconds:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+
+def classify(returncode, stderr, timed_out=False):
+    if _SANITIZER_STARTUP.search(stderr):
+        return HARNESS_ERROR
+    if timed_out:
+        return "timeout"
+    if returncode < 0:
+        signal_number = -returncode
+        if signal_number in (signal.SIGSEGV, signal.SIGBUS):
+            return "segfault"
+        if signal_number == signal.SIGABRT:
+            return "abort"
+        if signal_number == getattr(signal, "SIGXCPU", None):
+            return "timeout"
+        try:
+            return f"signal {signal.Signals(signal_number).name}"
+        except ValueError:
+            return f"signal {signal_number}"
+    if _SANITIZER.search(stderr):
+        return "asan"
+    if "Fatal Python error" in stderr:
+        return "fatal error"
+    if returncode == 0:
+        return "clean exit"
+    if _SCRIPT_SYNTAX_ERROR.search(stderr):
+        return "unrunnable"
+    if _UNCAUGHT_SYSTEM_ERROR.search(stderr):
+        return "SystemError"
+    return "exception"
+
+
+def run_reproducer(binary, source, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB):
+    """Runs one reproducer with `binary`; returns {"outcome", "returncode", "seconds", "stderr"}."""
+    with tempfile.TemporaryDirectory(prefix="reproducer-") as work_dir:
+        script = os.path.join(work_dir, SCRIPT_NAME)
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write(source)
+        process = subprocess.Popen(
+            [binary, script], cwd=work_dir, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE, start_new_session=True,  # Its own process group, killed as a whole
+            preexec_fn=lambda: _limit_resources(memory_mb, int(timeout) + 1),
+        )
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            _, stderr = process.communicate()
+        seconds = time.perf_counter() - start
+    stderr = stderr.decode("utf-8", "replace")
+    return {"outcome": classify(process.returncode, stderr, timed_out), "returncode": process.returncode,
+            "seconds": round(seconds, 3), "stderr": stderr[-STDERR_TAIL:]}
+
+
+class ResultCache:
+    """Run results by (reproducer hash, binary hash, run limits), in a JSON file."""
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.results = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.results = json.load(f)
+
+    @staticmethod
+    def key(source_hash, build_hash, timeout, memory_mb):
+        return f"{source_hash}:{build_hash}:{timeout:g}:{memory_mb}"
+
+    def get(self, key):
+        return self.results.get(key)
+
+    def put(self, key, result):
+        self.results[key] = result
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_file = self.path + ".tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f)
+        os.replace(tmp_file, self.path)
+
+
+def replay(reproducers, builds, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, memory_mb=DEFAULT_MEMORY_MB,
+           cache=None, rerun=False):
+    """
+    Runs every reproducer with every build; returns ({(issue, build name): result}, runs done).
+    `reproducers` are (issue, title, source), `builds` (name, binary path).
+    """
+    cache = cache if cache is not None else ResultCache(None)
+    build_hashes, memory_limits = {}, {}
+    for name, binary in builds:
+        info = build_info(binary)
+        build_hashes[name] = build_hash(binary, info)
+        memory_limits[name] = memory_mb
+        if memory_mb and info["sanitizer"]:
+            print(f"{name} is a sanitizer build: running it without the {memory_mb} MB address space limit.")
+            memory_limits[name] = 0
+    results, pending = {}, []
+    for issue, _, source in reproducers:
+        source_hash = text_hash(source)
+        for name, binary in builds:
+            key = cache.key(source_hash, build_hashes[name], timeout, memory_limits[name])
+            cached = None if rerun else cache.get(key)
+            if cached is not None:
+                results[issue, name] = cached
+            else:
+                pending.append((issue, name, binary, source, key))
+    if pending:
+        print(f"Running {len(pending)} reproducer/build pairs ({len(results)} cached) with {workers} workers...")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_reproducer, binary, source, timeout, memory_limits[name]):
+                       (issue, name, key) for issue, name, binary, source, key in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                issue, name, key = futures[future]
+                result = future.result()
+                results[issue, name] = result
+                if result["outcome"] != HARNESS_ERROR:  # Would fail the same way until the setup is fixed
+                    cache.put(key, result)
+                print(f"  [{done}/{len(pending)}] #{issue} on {name}: {result['outcome']} ({result['seconds']:.1f}s)")
+        cache.save()
+    return results, len(pending)
+
+
+def write_matrix(reproducers, builds, results, output_file=OUTPUT_FILE):
+    names = [name for name, _ in builds]
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Issue #", "Title"] + names)
+        for issue, title, _ in reproducers:
+            writer.writerow([issue, title] + [results[issue, name]["outcome"] for name in names])
+    os.replace(tmp_file, output_file)
+
+
+def print_matrix(reproducers, builds, results):
+    names = [name for name, _ in builds]
+    widths = [max(len(name), 11) for name in names]
+    print("\n" + f"{'issue':>8}  " + "  ".join(f"{name:<{width}}" for name, width in zip(names, widths)))
+    for issue, _, _ in reproducers:
+        print(f"{issue:>8}  " + "  ".join(f"{results[issue, name]['outcome']:<{width}}"
+                                          for name, width in zip(names, widths)))
+    for name in names:
+        crashing = sum(results[issue, name]["outcome"] in CRASHES for issue, _, _ in reproducers)
+        failed = sum(results[issue, name]["outcome"] == HARNESS_ERROR for issue, _, _ in reproducers)
+        print(f"{name}: {crashing} of {len(reproducers)} reproducers still crash"
+              + (f", {failed} couldn't be run (harness errors)" if failed else ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-run the issues' reproducers against local CPython builds.")
+    parser.add_argument("--python", action="append", required=True, metavar="[NAME=]PATH",
+                        help="Interpreter to test; repeat for several builds.")
+    parser.add_argument("--issues", type=int, nargs="+", help="Only these issues (open or not).")
+    parser.add_argument("--all", action="store_true", help="Every issue with a reproducer, not only open ones.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Reproducers run at once (default: {DEFAULT_WORKERS}).")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds before a run is killed (default: {DEFAULT_TIMEOUT:g}).")
+    parser.add_argument("--memory", type=int, default=DEFAULT_MEMORY_MB,
+                        help=f"Address space limit per run in MB, 0 for none (default: {DEFAULT_MEMORY_MB}).")
+    parser.add_argument("--output", default=OUTPUT_FILE, help=f"Status matrix CSV (default: {OUTPUT_FILE}).")
+    parser.add_argument("--cache-file", default=CACHE_FILE)
+    parser.add_argument("--rerun", action="store_true",
+                        help="Ignore cached results, e.g. after changing the pure Python stdlib of a build.")
+    parser.add_argument("--scripts-dir", help="Also write each reproducer to DIR/<issue>.py.")
+    args = parser.parse_args(argv)
+
+    try:
+        builds = [parse_build(spec) for spec in args.python]
+    except ValueError as e:
+        parser.error(str(e))
+    reproducers = load_reproducers(open_only=not args.all, issues=set(args.issues or ()))
+    print(f"Found {len(reproducers)} reproducers to run with {len(builds)} builds.")
+    if args.scripts_dir:
+        os.makedirs(args.scripts_dir, exist_ok=True)
+        for issue, _, source in reproducers:
+            with open(os.path.join(args.scripts_dir, f"{issue}.py"), 'w', encoding='utf-8') as f:
+                f.write(source)
+        print(f"Wrote the reproducers to '{args.scripts_dir}'")
+    if not reproducers:
+        return
+
+    start = time.perf_counter()
+    results, runs = replay(reproducers, builds, args.workers, args.timeout, args.memory,
+                           ResultCache(args.cache_file), args.rerun)
+    print_matrix(reproducers, builds, results)
+    write_matrix(reproducers, builds, results, args.output)
+    print(f"Saved the status matrix to '{args.output}' ({runs} runs in {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import os
+import re
+import csv
+import mmap
+import time
+import hashlib
+import sqlite3
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from backtrace_index import INDEX_FILE as CRASH_INDEX_FILE, CrashIndex, crash_signature, parse_backtrace, \
+    signature_frames
+from issue_classifier import classify
+
+# Ingestion of raw fusil session directories, before anything is filed on GitHub.
+#
+# Fusil keeps a directory per hit, named after what it matched, under one directory per
+# fuzzer instance: /home/fusil/python-61/gc-assertion-abort-2/ with the generated
+# source.py and the logs of its run (stdout, session.log...). ingest() walks the trees with
+# os.scandir (a directory holding a source.py is a session, and isn't descended into) and
+# stamps each session with the names, sizes and mtimes of its files. Only sessions whose
+# stamp is new or changed are scanned, in a process pool: each log is memory-mapped and
+# searched for the crash markers below, and only a window around the crash at the end of
+# the output is decoded, so multi-megabyte outputs cost a few rfind() calls. From that
+# window come the error message, the backtrace and its crash signature (backtrace_index.py,
+# so buckets match the crash index of the filed issues) and a Guessed Kind
+# (issue_classifier.py).
+#
+# Sessions are kept in SQLite by real path, so a tree is the same whichever way its root is
+# typed. A run only drops the deleted sessions under its own roots: sessions ingested from
+# other roots (or from a root that's missing, e.g. unmounted) are kept. The triage table
+# has one row per (signature, Guessed Kind) bucket, most hits first, with the known issues
+# sharing the signature when crash_index.sqlite3 exists, and is written as a CSV next to
+# the others.
+
+STATE_FILE = "fusil_sessions.sqlite3"
+TRIAGE_CSV_FILE = "fusil_session_triage.csv"
+SOURCE_FILE = "source.py"  # Marks a session directory; the generated code isn't scanned
+STATE_VERSION = 2  # Bump when scanning (or the stored paths) changes, so every session is scanned again
+WINDOW_BEFORE = 512  # Bytes decoded before the first crash marker (the tail of the error message)
+WINDOW_AFTER = 64 * 1024  # Bytes decoded after it (the backtrace)
+CHUNK_SIZE = 64  # Sessions per task sent to a worker
+TRIAGE_FIELDNAMES = ["Signature", "Guessed Kind", "Hits", "Error Message", "Top Frames", "Known Issues",
+                     "Instances", "First Seen", "Last Seen", "Example Session"]
+
+CRASH_MARKERS = (b"Fatal Python error", b": Assertion `", b"Assertion failed", b"AddressSanitizer", b"SystemError",
+                 b"Segmentation fault", b"\n#0 ", b"\n    #0 0x", b"Aborted")
+_ERROR_MESSAGE = re.compile(
+    r"^.*(?:Fatal Python error:.*|Assertion [`'].*failed.*|Assertion failed.*|AddressSanitizer:.*|"
+    r"\bSystemError\b:.*|Segmentation fault.*|Aborted.*)$", re.M)
+_MASKS = [
+    (re.compile(r"0x[0-9a-fA-F]+"), "0x?"),
+    (re.compile(r"==\d+=="), "==?=="),
+    (re.compile(r"\d+"), "N"),
+]
+
+
+def _stamp(entries):
+    """Digest of the (name, size, mtime) of a session's files: changes whenever one does."""
+    parts = sorted(f"{entry.name}:{stat.st_size}:{stat.st_mtime_ns}" for entry, stat in entries)
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def walk_sessions(roots):
+    """Yields (session real path, stamp, newest file mtime) of every session directory under `roots`."""
+    stack = [os.path.realpath(root) for root in roots]
+    while stack:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as iterator:
+                entries = list(iterator)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+        if any(entry.name == SOURCE_FILE for entry in entries):
+            files = [(entry, entry.stat()) for entry in entries if entry.is_file(follow_symlinks=False)]
+            yield path, _stamp(files), max(stat.st_mtime for _, stat in files)
+        else:
+            stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+
+
+def _crash_window(path):
+    """
+    Decoded text around the crash of a log file, or None. A crash ends the output, so the
+    window starts at the first of the last occurrences of the markers that are close to the end.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            positions = [position for position in map(mapped.rfind, CRASH_MARKERS) if position != -1]
+            if not positions:
+                return None
+            last = max(positions)
+            first = min(position for position in positions if position >= last - WINDOW_AFTER)
+            start = max(0, first - WINDOW_BEFORE)
+            return mapped[start:first + WINDOW_AFTER].decode("utf-8", "replace")
+
+
+def _normalize_message(message):
+    for regex, replacement in _MASKS:
+        message = regex.sub(replacement, message)
+    return message.strip()
+
+
+def scan_session(path):
+    """{"error", "top_frames", "signature", "kind"} of one session, from the crash in its logs."""
+    windows = []
+    with os.scandir(path) as iterator:
+        for entry in sorted(iterator, key=lambda entry: entry.name):
+            if entry.name != SOURCE_FILE and entry.is_file(follow_symlinks=False):
+                window = _crash_window(entry.path)
+                if window:
+                    windows.append(window)
+    text = "\n".join(windows)
+    message = _ERROR_MESSAGE.search(text)
+    error = message.group(0).strip()[:300] if message else ""
+    frames = parse_backtrace(text)
+    signature = crash_signature(frames)
+    if signature is None and error:  # No frames and no assertion site: bucket by the masked message
+        signature = "msg-" + hashlib.sha1(_normalize_message(error).encode("utf-8")).hexdigest()[:12]
+    name = os.path.basename(path)
+    return {
+        "error": error,
+        "top_frames": " | ".join(frame.function for frame in signature_frames(frames)),
+        "signature": signature or "",
+        "kind": classify(name.replace("-", " ").replace("_", " "), [], text).kind,
+    }
+
+
+def _is_under(path, roots):
+    return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in roots)
+
+
+def _scan_chunk(paths):
+    return [(path, scan_session(path)) for path in paths]
+
+
+class SessionStore:
+    """The scanned sessions, by path, with the stamp they were scanned at."""
+
+    def __init__(self, path=STATE_FILE):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS sessions (
+                path TEXT PRIMARY KEY,
+                stamp TEXT NOT NULL,
+                instance TEXT NOT NULL,
+                name TEXT NOT NULL,
+                modified REAL NOT NULL,
+                signature TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                error TEXT NOT NULL,
+                top_frames TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_by_signature ON sessions (signature, kind);
+        """)
+        stored = self.connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if stored is None or stored[0] != str(STATE_VERSION):
+            with self.connection:
+                self.connection.execute("DELETE FROM sessions")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                                        (str(STATE_VERSION),))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stamps(self):
+        return dict(self.connection.execute("SELECT path, stamp FROM sessions"))
+
+    def put_many(self, rows):
+        """Stores (path, stamp, modified, scan result) rows."""
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO sessions (path, stamp, instance, name, modified, signature, kind, error, "
+                "top_frames) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(path, stamp, os.path.basename(os.path.dirname(path)), os.path.basename(path), modified,
+                  result["signature"], result["kind"], result["error"], result["top_frames"])
+                 for path, stamp, modified, result in rows],
+            )
+
+    def remove_many(self, paths):
+        with self.connection:
+            self.connection.executemany("DELETE FROM sessions WHERE path = ?", [(path,) for path in paths])
+
+    def buckets(self):
+        """Triage rows: one per (signature, kind), most hits first."""
+        return self.connection.execute("""
+            SELECT signature, kind, COUNT(*) AS hits, MIN(error), MAX(top_frames),
+                   GROUP_CONCAT(DISTINCT instance), MIN(modified), MAX(modified), MIN(path)
+            FROM sessions GROUP BY signature, kind ORDER BY hits DESC, signature, kind
+        """).fetchall()
+
+
+def ingest(roots, state_file=STATE_FILE, workers=None):
+    """Scans the new and changed sessions under `roots`; returns (sessions, scanned, removed)."""
+    roots = [os.path.realpath(root) for root in roots]
+    for root in roots:
+        if not os.path.isdir(root):
+            print(f"Warning: '{root}' is not a directory; keeping the sessions ingested from it.")
+    roots = [root for root in roots if os.path.isdir(root)]
+    with SessionStore(state_file) as store:
+        known = store.stamps()
+        found, pending = set(), []
+        for path, stamp, modified in walk_sessions(roots):
+            found.add(path)
+            if known.get(path) != stamp:
+                pending.append((path, stamp, modified))
+        removed = [path for path in known if path not in found and _is_under(path, roots)]
+        store.remove_many(removed)
+
+        workers = workers or os.cpu_count() or 1
+        chunks = [pending[start:start + CHUNK_SIZE] for start in range(0, len(pending), CHUNK_SIZE)]
+        paths = ([path for path, _, _ in chunk] for chunk in chunks)
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(chunks) > 1 else None
+        try:
+            scanned = executor.map(_scan_chunk, paths) if executor else map(_scan_chunk, paths)
+            for chunk, results in zip(chunks, scanned):  # Stored chunk by chunk, in walk order
+                store.put_many((path, stamp, modified, result)
+                               for (path, stamp, modified), (_, result) in zip(chunk, results))
+        finally:
+            if executor:
+                executor.shutdown()
+    return len(found), len(pending), len(removed)
+
+
+def write_triage(state_file=STATE_FILE, output_file=TRIAGE_CSV_FILE, crash_index_file=CRASH_INDEX_FILE):
+    """Writes the triage table CSV; returns its rows."""
+    with SessionStore(state_file) as store:
+        buckets = store.buckets()
+    crash_index = CrashIndex(crash_index_file) if crash_index_file and os.path.exists(crash_index_file) else None
+    rows = []
+    for signature, kind, hits, error, top_frames, instances, first_seen, last_seen, example in buckets:
+        known = crash_index.issues_with_signature(signature) if crash_index and signature else []
+        rows.append({
+            "Signature": signature, "Guessed Kind": kind, "Hits": hits, "Error Message": error,
+            "Top Frames": top_frames, "Known Issues": ";".join(map(str, known)),
+            "Instances": ";".join(sorted(instances.split(","))),
+            "First Seen": time.strftime("%Y-%m-%d", time.localtime(first_seen)),
+            "Last Seen": time.strftime("%Y-%m-%d", time.localtime(last_seen)),
+            "Example Session": example,
+        })
+    if crash_index:
+        crash_index.close()
+    tmp_file = output_file + ".tmp"
+    with open(tmp_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=TRIAGE_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_file, output_file)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest fusil session directories into a crash triage table.")
+    parser.add_argument("roots", nargs="+", help="Directories holding fusil sessions (searched recursively).")
+    parser.add_argument("--state", default=STATE_FILE, help=f"Scanned sessions database (default: {STATE_FILE}).")
+    parser.add_argument("--output", default=TRIAGE_CSV_FILE, help=f"Triage CSV (default: {TRIAGE_CSV_FILE}).")
+    parser.add_argument("--crash-index", default=CRASH_INDEX_FILE,
+                        help="Crash index of the filed issues (backtrace_index.py), to list known issues.")
+    parser.add_argument("--workers", type=int, help="Scanning processes (default: one per CPU).")
+    parser.add_argument("--top", type=int, default=20, help="Buckets to print (default: 20).")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    sessions, scanned, removed = ingest(args.roots, args.state, args.workers)
+    ingest_time = time.perf_counter() - start
+    rows = write_triage(args.state, args.output, args.crash_index)
+    print(f"{sessions} sessions: scanned {scanned} new or changed, dropped {removed} in {ingest_time:.2f}s; "
+          f"{len(rows)} buckets saved to '{args.output}'")
+    for row in rows[:args.top]:
+        known = f" (known: {row['Known Issues']})" if row["Known Issues"] else ""
+        print(f"{row['Hits']:>7}  {row['Guessed Kind'] or '?':<20} {row['Top Frames'] or row['Error Message']}{known}")
+
+
+if __name__ == "__main__":
+    main()